@@ -0,0 +1,397 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Benchmarks for the calculator and the web service routes.
+
+Each benchmark reports its throughput and latency percentiles. Results are
+written as JSON and can be compared against a baseline written by an
+earlier run, failing when a benchmark's median latency regressed past a
+threshold::
+
+    $ python benchmarks/benchmark.py --output baseline.json
+    $ python benchmarks/benchmark.py --baseline baseline.json --threshold 0.2
+
+The sky transitions cache is disabled unless ``HELIOS_CACHE_SIZE`` is set,
+so the routes measure the calculations rather than cache lookups.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+import datetime
+import itertools
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import time
+from typing import Any
+
+os.environ.setdefault("HELIOS_CACHE_SIZE", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from helios import __version__  # noqa: E402
+from helios.main import app  # noqa: E402
+from helios.solar_calculator import SolarCalculator  # noqa: E402
+
+LATITUDES = (-60.0, -35.0, 0.0, 23.5, 40.8939, 55.0, 65.0)
+"""Latitudes (degrees) of the calculator benchmark locations."""
+
+SEASONS = (
+    datetime.date(2026, 3, 20),
+    datetime.date(2026, 6, 21),
+    datetime.date(2026, 9, 22),
+    datetime.date(2026, 12, 21),
+)
+"""Dates of the calculator benchmark locations."""
+
+LOCATION = {"lat": 40.8939, "lon": -83.8917, "tz": "America/New_York"}
+"""Location used by the route benchmarks."""
+
+Request = tuple[str, str, dict[str, Any] | None, Any]
+"""HTTP method, path, query parameters and JSON body of a route request."""
+
+
+def route_requests() -> dict[str, Callable[[int], Request]]:
+    """Build the requests for each route benchmark.
+
+    Returns
+    -------
+    dict
+        A function per route building the request for an iteration. The
+        date changes each iteration to avoid repeating a calculation.
+    """
+    start = datetime.datetime(2026, 1, 1, 12, tzinfo=datetime.UTC)
+
+    def cdatetime(i: int) -> float:
+        return (start + datetime.timedelta(days=i % 365)).timestamp()
+
+    def day(i: int) -> str:
+        return (start.date() + datetime.timedelta(days=i % 365)).isoformat()
+
+    timer = {"checktime": "04:00:00", "offtime": "23:00:00", "onrange": "00:15:00", "offrange": "00:15:00"}
+    return {
+        "root": lambda i: ("GET", "/", None, None),
+        "status": lambda i: ("GET", "/status", None, None),
+        "favicon": lambda i: ("GET", "/favicon.ico", None, None),
+        "sky_transitions": lambda i: (
+            "GET",
+            "/sky_transitions",
+            {**LOCATION, "cdatetime": cdatetime(i)},
+            None,
+        ),
+        "sky_transitions_batch": lambda i: (
+            "POST",
+            "/sky_transitions/batch",
+            None,
+            [{**LOCATION, "lat": latitude, "cdatetime": cdatetime(i)} for latitude in LATITUDES],
+        ),
+        "sky_transitions_range": lambda i: (
+            "GET",
+            "/sky_transitions/range",
+            {**LOCATION, "start": day(i), "end": day(i + 30)},
+            None,
+        ),
+        "sky_transitions_export": lambda i: (
+            "POST",
+            "/sky_transitions/export",
+            None,
+            {"sites": [LOCATION], "start": day(i), "end": day(i + 30)},
+        ),
+        "day_information": lambda i: ("GET", "/day_information", LOCATION, None),
+        "timer_information": lambda i: (
+            "GET",
+            "/timer_information",
+            {**LOCATION, **timer, "cdatetime": cdatetime(i)},
+            None,
+        ),
+    }
+
+
+def summarize(durations: Sequence[float]) -> dict[str, float]:
+    """Summarize the durations of a benchmark's iterations.
+
+    Parameters
+    ----------
+    durations : Sequence
+        The duration of each iteration in seconds.
+
+    Returns
+    -------
+    dict
+        The iteration count, throughput (per second) and latency mean and
+        percentiles (milliseconds).
+    """
+    milliseconds = np.asarray(durations) * 1000.0
+    return {
+        "iterations": len(durations),
+        "throughput": len(durations) / float(np.sum(durations)),
+        "mean": float(np.mean(milliseconds)),
+        "p50": float(np.percentile(milliseconds, 50)),
+        "p95": float(np.percentile(milliseconds, 95)),
+        "p99": float(np.percentile(milliseconds, 99)),
+    }
+
+
+def measure(func: Callable[[int], Any], iterations: int, warm_up: int) -> dict[str, float]:
+    """Time the iterations of a benchmark.
+
+    Parameters
+    ----------
+    func : Callable
+        The function run each iteration, given the iteration number.
+    iterations : int
+        The number of timed iterations.
+    warm_up : int
+        The number of untimed iterations run first.
+
+    Returns
+    -------
+    dict
+        The summary of the timed iterations.
+    """
+    for i in range(warm_up):
+        func(i)
+    durations = []
+    for i in range(iterations):
+        begin = time.perf_counter()
+        func(i)
+        durations.append(time.perf_counter() - begin)
+    return summarize(durations)
+
+
+async def measure_async(
+    func: Callable[[int], Awaitable[Any]], iterations: int, warm_up: int
+) -> dict[str, float]:
+    """Time the iterations of an asynchronous benchmark.
+
+    Parameters
+    ----------
+    func : Callable
+        The coroutine function run each iteration, given the iteration
+        number.
+    iterations : int
+        The number of timed iterations.
+    warm_up : int
+        The number of untimed iterations run first.
+
+    Returns
+    -------
+    dict
+        The summary of the timed iterations.
+    """
+    for i in range(warm_up):
+        await func(i)
+    durations = []
+    for i in range(iterations):
+        begin = time.perf_counter()
+        await func(i)
+        durations.append(time.perf_counter() - begin)
+    return summarize(durations)
+
+
+def calculator_benchmarks(
+    iterations: int, warm_up: int, pattern: str = ""
+) -> Iterator[tuple[str, dict[str, float]]]:
+    """Run the calculator benchmarks.
+
+    Parameters
+    ----------
+    iterations : int
+        The number of timed iterations per benchmark.
+    warm_up : int
+        The number of untimed iterations per benchmark.
+    pattern : str
+        Only benchmarks whose name contains this are run.
+
+    Yields
+    ------
+    tuple
+        The name and summary of each benchmark.
+    """
+    if pattern in "calculator.construct":
+        yield "calculator.construct", measure(lambda i: SolarCalculator(), max(iterations // 10, 5), 1)
+
+    h = SolarCalculator()
+    cases = list(itertools.product(LATITUDES, SEASONS))
+    for engine in h.engines:
+        name = f"calculator.sky_transitions.{engine.value}"
+        if pattern not in name:
+            continue
+
+        def sky_transitions(i: int, engine: Any = engine) -> Any:
+            latitude, day = cases[i % len(cases)]
+            cdatetime = datetime.datetime.combine(day, datetime.time(12), tzinfo=datetime.UTC)
+            return h.sky_transitions(latitude, -83.8917, cdatetime.timestamp(), "UTC", engine)
+
+        yield name, measure(sky_transitions, iterations, warm_up)
+
+
+def route_benchmarks(
+    iterations: int, warm_up: int, pattern: str = ""
+) -> Iterator[tuple[str, dict[str, float]]]:
+    """Run the route benchmarks through the test client.
+
+    Parameters
+    ----------
+    iterations : int
+        The number of timed iterations per benchmark.
+    warm_up : int
+        The number of untimed iterations per benchmark.
+    pattern : str
+        Only benchmarks whose name contains this are run.
+
+    Yields
+    ------
+    tuple
+        The name and summary of each benchmark.
+    """
+    with TestClient(app) as client:
+        for name, build in route_requests().items():
+            if pattern not in f"testclient.{name}":
+                continue
+
+            def call(i: int, build: Callable[[int], Request] = build) -> None:
+                method, path, params, body = build(i)
+                client.request(method, path, params=params, json=body).raise_for_status()
+
+            yield f"testclient.{name}", measure(call, iterations, warm_up)
+
+
+async def asgi_benchmarks(
+    iterations: int, warm_up: int, pattern: str = ""
+) -> list[tuple[str, dict[str, float]]]:
+    """Run the route benchmarks through an in-process ASGI client.
+
+    Parameters
+    ----------
+    iterations : int
+        The number of timed iterations per benchmark.
+    warm_up : int
+        The number of untimed iterations per benchmark.
+    pattern : str
+        Only benchmarks whose name contains this are run.
+
+    Returns
+    -------
+    list
+        The name and summary of each benchmark.
+    """
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://helios") as client,
+    ):
+        for name, build in route_requests().items():
+            if pattern not in f"asgi.{name}":
+                continue
+
+            async def call(i: int, build: Callable[[int], Request] = build) -> None:
+                method, path, params, body = build(i)
+                response = await client.request(method, path, params=params, json=body)
+                response.raise_for_status()
+
+            results.append((f"asgi.{name}", await measure_async(call, iterations, warm_up)))
+    return results
+
+
+def regressions(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """Find the benchmarks that got slower than their baseline.
+
+    Parameters
+    ----------
+    results : dict
+        The summaries of this run.
+    baseline : dict
+        The summaries of the baseline run.
+    threshold : float
+        The allowed fractional increase of the median latency.
+
+    Returns
+    -------
+    list
+        A description of each regression.
+    """
+    found = []
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        previous = baseline[name]["p50"]
+        if summary["p50"] > previous * (1.0 + threshold):
+            found.append(f"{name}: p50 {summary['p50']:.3f} ms vs {previous:.3f} ms baseline")
+    return found
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the benchmarks.
+
+    Parameters
+    ----------
+    argv : Sequence, optional
+        The command line arguments, those of the process if not given.
+
+    Returns
+    -------
+    int
+        The exit status, 1 if a benchmark regressed.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the calculator and the web service routes.")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed iterations per benchmark.")
+    parser.add_argument("--warm-up", type=int, default=3, help="Untimed iterations per benchmark.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--output", type=Path, help="File to write the results to as JSON.")
+    parser.add_argument("--baseline", type=Path, help="Results of an earlier run to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed fractional increase of a median latency over the baseline (default: %(default)s).",
+    )
+    args = parser.parse_args(argv)
+
+    results: dict[str, dict[str, float]] = {}
+    suites = itertools.chain(
+        calculator_benchmarks(args.iterations, args.warm_up, args.filter),
+        route_benchmarks(args.iterations, args.warm_up, args.filter),
+        asyncio.run(asgi_benchmarks(args.iterations, args.warm_up, args.filter)),
+    )
+    print(f"{'benchmark':48} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, summary in suites:
+        results[name] = summary
+        print(
+            f"{name:48} {summary['throughput']:9.1f} {summary['p50']:9.3f} "
+            f"{summary['p95']:9.3f} {summary['p99']:9.3f}"
+        )
+
+    if args.output is not None:
+        document = {
+            "version": __version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": datetime.datetime.now(datetime.UTC).isoformat(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        found = regressions(results, baseline, args.threshold)
+        for regression in found:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
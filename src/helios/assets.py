@@ -0,0 +1,280 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for serving static assets from memory."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import gzip
+import hashlib
+from importlib.resources.abc import Traversable
+import mimetypes
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+__all__ = ["Asset", "StaticAssets", "build_variants", "choose_encoding"]
+
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+"""File name suffix of each precompressed variant, preferred first."""
+
+MINIMUM_SAVING = 0.1
+"""Fraction of an asset's size its compression must save to be shipped."""
+
+HASH_LENGTH = 12
+"""Number of hex digits of the content hash put in asset URLs."""
+
+
+@dataclass(frozen=True)
+class Asset:
+    """A static file held in memory along with its compressed variants."""
+
+    path: str
+    """The path relative to the static directory."""
+    hashed_path: str
+    """The path with the content hash before the suffix."""
+    media_type: str
+    """The media type of the file."""
+    body: bytes
+    """The file contents."""
+    etag: str
+    """The quoted entity tag of the file contents."""
+    variants: dict[str, bytes]
+    """The compressed contents keyed by content coding."""
+
+
+class StaticAssets:
+    """Static files loaded into memory once.
+
+    Each file is served under its own path and under a path holding a hash
+    of its contents, which changes whenever the contents do and so can be
+    cached for good. Compressed variants written ahead of time by
+    `build_variants` sit next to their file and are loaded with it.
+
+    Parameters
+    ----------
+    directory : Traversable
+        The static directory.
+    """
+
+    def __init__(self, directory: Traversable) -> None:
+        self._assets: dict[str, Asset] = {}
+        self._hashed: dict[str, Asset] = {}
+        for path, resource, parent in _walk(directory):
+            if path.suffix in ENCODINGS.values():
+                continue
+            asset = _load(path, resource, parent)
+            self._assets[asset.path] = asset
+            self._hashed[asset.hashed_path] = asset
+
+    def __len__(self) -> int:
+        """Return the number of assets."""
+        return len(self._assets)
+
+    def get(self, path: str) -> tuple[Asset, bool] | None:
+        """Look up an asset by its plain or hashed path.
+
+        Parameters
+        ----------
+        path : str
+            The path relative to the static directory.
+
+        Returns
+        -------
+        tuple or None
+            The asset and whether the path was the hashed one, None if
+            there is no such asset.
+        """
+        path = path.lstrip("/")
+        if path in self._hashed:
+            return self._hashed[path], True
+        if path in self._assets:
+            return self._assets[path], False
+        return None
+
+    def hashed_path(self, path: str) -> str:
+        """Find the content-hashed path of an asset.
+
+        Parameters
+        ----------
+        path : str
+            The path relative to the static directory.
+
+        Returns
+        -------
+        str
+            The hashed path relative to the static directory.
+
+        Raises
+        ------
+        KeyError
+            Raised if there is no such asset.
+        """
+        return self._assets[path.lstrip("/")].hashed_path
+
+
+def choose_encoding(accept_encoding: str | None, encodings: Iterable[str]) -> str | None:
+    """Pick the preferred content coding a client accepts.
+
+    Parameters
+    ----------
+    accept_encoding : str or None
+        The ``Accept-Encoding`` header, None if the request has none.
+    encodings : Iterable
+        The codings available, most preferred first.
+
+    Returns
+    -------
+    str or None
+        The coding to serve, None for the identity.
+    """
+    accepted = {}
+    for coding in (accept_encoding or "").split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        parameter = parameters.replace(" ", "")
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0.0:
+            return encoding
+    return None
+
+
+def build_variants(directory: Path, minimum_saving: float = MINIMUM_SAVING) -> list[Path]:
+    """Write the precompressed variants of the files in a static directory.
+
+    The gzip variants are written without a timestamp, so rebuilding an
+    unchanged file gives the same bytes. The brotli variants are only
+    written if the ``brotli`` package is installed. Variants saving less
+    than ``minimum_saving`` of a file's size are not written, and stale
+    ones are removed.
+
+    Parameters
+    ----------
+    directory : Path
+        The static directory.
+    minimum_saving : float
+        The fraction of a file's size its compression must save.
+
+    Returns
+    -------
+    list
+        The variant files written.
+    """
+    written = []
+    for path, _, _ in _walk(directory):
+        if path.suffix in ENCODINGS.values():
+            continue
+        source = directory / path
+        body = source.read_bytes()
+        for encoding, suffix in ENCODINGS.items():
+            variant = source.with_name(source.name + suffix)
+            compressed = _compress(encoding, body)
+            if compressed is None:
+                continue
+            if len(compressed) > (1.0 - minimum_saving) * len(body):
+                variant.unlink(missing_ok=True)
+                continue
+            variant.write_bytes(compressed)
+            written.append(variant)
+    return written
+
+
+def _compress(encoding: str, body: bytes) -> bytes | None:
+    """Compress a file with a content coding.
+
+    Parameters
+    ----------
+    encoding : str
+        The content coding.
+    body : bytes
+        The file contents.
+
+    Returns
+    -------
+    bytes or None
+        The compressed contents, None if the coding is not available.
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    compressed: bytes = brotli.compress(body, quality=11)
+    return compressed
+
+
+def _load(path: PurePosixPath, resource: Traversable, parent: Traversable) -> Asset:
+    """Load a static file and its variants.
+
+    Parameters
+    ----------
+    path : PurePosixPath
+        The path relative to the static directory.
+    resource : Traversable
+        The file.
+    parent : Traversable
+        The directory holding the file and its variants.
+
+    Returns
+    -------
+    Asset
+        The loaded asset.
+    """
+    body = resource.read_bytes()
+    digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+    variants = {}
+    for encoding, suffix in ENCODINGS.items():
+        variant = parent.joinpath(resource.name + suffix)
+        if not variant.is_file():
+            continue
+        compressed = variant.read_bytes()
+        # A variant left over from older contents is skipped.
+        if encoding == "gzip" and gzip.decompress(compressed) != body:
+            continue
+        variants[encoding] = compressed
+    stem = path.name[: -len(path.suffix)] if path.suffix else path.name
+    hashed = path.with_name(f"{stem}.{digest}{path.suffix}")
+    return Asset(
+        path=path.as_posix(),
+        hashed_path=hashed.as_posix(),
+        media_type=media_type,
+        body=body,
+        etag=f'"{digest}"',
+        variants=variants,
+    )
+
+
+def _walk(directory: Any, prefix: PurePosixPath | None = None) -> Iterable[tuple[PurePosixPath, Any, Any]]:
+    """List the files below a directory.
+
+    Parameters
+    ----------
+    directory : Traversable or Path
+        The directory.
+    prefix : PurePosixPath, optional
+        The path of the directory relative to the top one.
+
+    Yields
+    ------
+    tuple
+        The path relative to the top directory, the file and the directory
+        holding it.
+    """
+    for entry in sorted(directory.iterdir(), key=lambda entry: entry.name):
+        path = prefix / entry.name if prefix is not None else PurePosixPath(entry.name)
+        if entry.is_dir():
+            yield from _walk(entry, path)
+        elif entry.is_file():
+            yield path, entry, directory
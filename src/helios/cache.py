@@ -0,0 +1,170 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for caching sky transitions."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date, datetime
+import threading
+import time
+
+from .models import CacheStatus
+
+__all__ = ["CacheKey", "TransitionCache"]
+
+CacheKey = tuple[float, float, date, str, str]
+"""Cache key of rounded latitude, rounded longitude, local date, zone and
+engine."""
+
+
+class TransitionCache:
+    """Bounded in-memory cache of sky transitions.
+
+    Entries are evicted least recently used first once the cache is full and
+    expire after a fixed lifetime. The cache is safe to share across threads.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of entries held.
+    ttl : float
+        The lifetime of an entry in seconds.
+    precision : int
+        The number of decimal places latitude and longitude are rounded to
+        when building a key.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 86400.0, precision: int = 4) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[CacheKey, tuple[float, dict[str, datetime]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of entries held."""
+        return len(self._entries)
+
+    def key(
+        self, latitude: float, longitude: float, local_date: date, location_timezone: str, engine: str
+    ) -> CacheKey:
+        """Build the key for a location's day.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        local_date : date
+            The calendar date at the location.
+        location_timezone : str
+            The timezone for the location.
+        engine : str
+            The name of the engine calculating the sky transitions.
+
+        Returns
+        -------
+        CacheKey
+            The key for the location's day.
+        """
+        return (
+            round(latitude, self.precision),
+            round(longitude, self.precision),
+            local_date,
+            location_timezone,
+            engine,
+        )
+
+    def get(self, key: CacheKey) -> dict[str, datetime] | None:
+        """Look up the sky transitions for a key.
+
+        Parameters
+        ----------
+        key : CacheKey
+            The key for the location's day.
+
+        Returns
+        -------
+        dict or None
+            A copy of the cached sky transitions, None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def peek(self, key: CacheKey) -> dict[str, datetime] | None:
+        """Look up the sky transitions for a key without counting a use.
+
+        The entry is neither moved up for eviction nor counted as a hit or
+        miss, as when consulted for a hint rather than an answer.
+
+        Parameters
+        ----------
+        key : CacheKey
+            The key for the location's day.
+
+        Returns
+        -------
+        dict or None
+            A copy of the cached sky transitions, None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return dict(entry[1])
+
+    def put(self, key: CacheKey, sky_transitions: dict[str, datetime]) -> None:
+        """Store the sky transitions for a key.
+
+        Parameters
+        ----------
+        key : CacheKey
+            The key for the location's day.
+        sky_transitions : dict
+            The sky transitions to store.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(sky_transitions))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> CacheStatus:
+        """Report the cache usage.
+
+        Returns
+        -------
+        CacheStatus
+            The current cache usage.
+        """
+        return CacheStatus(
+            size=len(self._entries),
+            max_size=self.max_size,
+            ttl=self.ttl,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
@@ -0,0 +1,429 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for the command line interface."""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from datetime import date
+from importlib.resources import files
+import json
+from pathlib import Path
+import sys
+
+from .assets import MINIMUM_SAVING, build_variants
+from .config import config
+from .engines import EngineName
+from .ephemeris import DATA_PATH, EPHEMERIS_TARGETS, trim_ephemeris
+from .grid import TransitionGrid
+from .loadtest import ROUTE_MIX, LoadTest, build_requests, generate_sites, local_server, run_load
+from .precompute import PrecomputeJob, precompute, read_sites
+from .solar_calculator import SolarCalculator
+from .startup import run_startup_report
+
+__all__ = ["main"]
+
+
+def build_grid(args: argparse.Namespace) -> int:
+    """Build a precomputed transitions grid.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    engine = SolarCalculator().get_engine(args.engine)
+
+    def progress(done: int, total: int) -> None:
+        print(f"\rDay {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    grid = TransitionGrid.build(
+        engine,
+        min_latitude=-args.max_latitude,
+        max_latitude=args.max_latitude,
+        latitude_step=args.latitude_step,
+        longitude_step=args.longitude_step,
+        tolerance=args.tolerance,
+        progress=progress if not args.quiet else None,
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    grid.save(args.path)
+    return 0
+
+
+def trim(args: argparse.Namespace) -> int:
+    """Write a trimmed excerpt of the ephemeris.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    if args.end_year < args.start_year:
+        print("The end year is before the start year.", file=sys.stderr)
+        return 1
+    trim_ephemeris(args.source, args.path, args.start_year, args.end_year, args.targets)
+    return 0
+
+
+def run_precompute(args: argparse.Namespace) -> int:
+    """Precompute the sky transitions of a site list.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    if args.end_date < args.start_date:
+        print("The end date is before the start date.", file=sys.stderr)
+        return 1
+    job = PrecomputeJob(
+        start_date=args.start_date,
+        end_date=args.end_date,
+        engine=args.engine,
+        output=args.output,
+        store_path=args.store,
+        ephemeris_path=args.ephemeris,
+        store_max_entries=args.store_max_entries,
+        store_precision=args.precision,
+    )
+
+    def progress(done: int, total: int) -> None:
+        print(f"\rSite {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    try:
+        precompute(
+            job,
+            read_sites(args.sites),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            progress=progress if not args.quiet else None,
+        )
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(file=sys.stderr)
+    return 0
+
+
+def write_openapi(args: argparse.Namespace) -> int:
+    """Write the prebuilt OpenAPI schema.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    from .main import build_schema
+
+    args.path.write_text(json.dumps(build_schema(), separators=(",", ":")))
+    return 0
+
+
+def report_startup(args: argparse.Namespace) -> int:
+    """Report the time spent in each stage of starting the application.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    try:
+        timings = run_startup_report()
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(timings))
+        return 0
+    for stage, seconds in timings.items():
+        print(f"{stage:<15}{seconds * 1000.0:10.1f} ms")
+    print(f"{'total':<15}{sum(timings.values()) * 1000.0:10.1f} ms")
+    return 0
+
+
+def run_loadtest(args: argparse.Namespace) -> int:
+    """Load test the application and report the measurements as JSON.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    try:
+        mix = {route: float(share) for route, share in (entry.split("=", 1) for entry in args.mix)}
+        settings = LoadTest(
+            concurrency=args.concurrency,
+            requests=args.requests,
+            warmup=args.warmup,
+            sites=args.sites,
+            seed=args.seed,
+            mix=mix or dict(ROUTE_MIX),
+        )
+        requests = build_requests(
+            generate_sites(settings.sites, settings.seed),
+            settings.warmup + settings.requests,
+            settings.mix,
+            settings.seed,
+        )
+    except ValueError as error:
+        print(f"Bad route mix: {error}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.url is not None:
+            report = run_load(args.url, requests, settings)
+        else:
+            with local_server(args.workers) as url:
+                report = run_load(url, requests, settings)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    report = {"workers": args.workers if args.url is None else None, "seed": settings.seed, **report}
+    output = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def build_assets(args: argparse.Namespace) -> int:
+    """Write the precompressed variants of the static files.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    for path in build_variants(args.directory, args.minimum_saving):
+        print(path)
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """Create the command line parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser for all subcommands.
+    """
+    parser = argparse.ArgumentParser(prog="helios", description="Helios sun information tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    grid = commands.add_parser("grid", help="Build a precomputed transitions grid.")
+    grid.add_argument("path", type=Path, help="Directory to write the grid to.")
+    grid.add_argument(
+        "--engine",
+        type=EngineName,
+        choices=[EngineName.analytic, EngineName.skyfield],
+        default=EngineName.analytic,
+        help="Engine searching the grid nodes (default: %(default)s).",
+    )
+    grid.add_argument(
+        "--max-latitude",
+        type=float,
+        default=60.0,
+        help="Latitude (degrees) the grid covers North and South (default: %(default)s).",
+    )
+    grid.add_argument(
+        "--latitude-step",
+        type=float,
+        default=1.0,
+        help="Distance between latitude nodes in degrees (default: %(default)s).",
+    )
+    grid.add_argument(
+        "--longitude-step",
+        type=float,
+        default=30.0,
+        help="Distance between longitude nodes in degrees (default: %(default)s).",
+    )
+    grid.add_argument(
+        "--tolerance",
+        type=float,
+        default=10.0,
+        help="Largest interpolation error in seconds a node is kept with (default: %(default)s).",
+    )
+    grid.add_argument("--quiet", action="store_true", help="Do not report progress.")
+    grid.set_defaults(func=build_grid)
+
+    ephemeris = commands.add_parser("ephemeris", help="Write a trimmed excerpt of the ephemeris.")
+    ephemeris.add_argument("path", type=Path, help="SPK file to write the excerpt to.")
+    ephemeris.add_argument(
+        "--source",
+        type=Path,
+        default=Path(str(DATA_PATH)),
+        help="SPK file to trim (default: the packaged DE421 ephemeris).",
+    )
+    ephemeris.add_argument("--start-year", type=int, required=True, help="First year to keep.")
+    ephemeris.add_argument("--end-year", type=int, required=True, help="Last year to keep.")
+    ephemeris.add_argument(
+        "--targets",
+        type=int,
+        nargs="+",
+        default=list(EPHEMERIS_TARGETS),
+        help="NAIF codes of the segment targets to keep (default: %(default)s).",
+    )
+    ephemeris.set_defaults(func=trim)
+
+    bulk = commands.add_parser("precompute", help="Precompute the sky transitions of a site list.")
+    bulk.add_argument("sites", type=Path, help="CSV or JSON file of the sites, with lat, lon and tz fields.")
+    destination = bulk.add_mutually_exclusive_group(required=True)
+    destination.add_argument("--output", type=Path, help="Directory to write the columnar parts to.")
+    destination.add_argument("--store", type=Path, help="Transition store to write the days to.")
+    bulk.add_argument(
+        "--start-date", type=date.fromisoformat, required=True, help="First local date (YYYY-MM-DD)."
+    )
+    bulk.add_argument(
+        "--end-date", type=date.fromisoformat, required=True, help="Last local date (YYYY-MM-DD)."
+    )
+    bulk.add_argument(
+        "--engine",
+        type=EngineName,
+        choices=[EngineName.analytic, EngineName.skyfield],
+        default=EngineName.skyfield,
+        help="Engine searching for the transitions (default: %(default)s).",
+    )
+    bulk.add_argument(
+        "--store-max-entries",
+        type=int,
+        default=config.store_max_entries,
+        help="Number of location days the store keeps, as HELIOS_STORE_MAX_ENTRIES (default: %(default)s).",
+    )
+    bulk.add_argument(
+        "--precision",
+        type=int,
+        default=config.cache_precision,
+        help="Decimal places of the store keys, as HELIOS_CACHE_PRECISION (default: %(default)s).",
+    )
+    bulk.add_argument("--ephemeris", type=Path, help="SPK file loaded instead of the packaged one.")
+    bulk.add_argument("--workers", type=int, help="Number of worker processes (default: one per CPU).")
+    bulk.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50,
+        help="Number of sites written at a time, keep it when resuming (default: %(default)s).",
+    )
+    bulk.add_argument("--quiet", action="store_true", help="Do not report progress.")
+    bulk.set_defaults(func=run_precompute)
+
+    openapi = commands.add_parser("openapi", help="Write the prebuilt OpenAPI schema.")
+    openapi.add_argument("path", type=Path, help="JSON file to write the schema to.")
+    openapi.set_defaults(func=write_openapi)
+
+    startup = commands.add_parser(
+        "startup", help="Report the time spent starting the application in a fresh interpreter."
+    )
+    startup.add_argument("--json", action="store_true", help="Print the stage timings as JSON.")
+    startup.set_defaults(func=report_startup)
+
+    load = commands.add_parser("loadtest", help="Load test the application on a local uvicorn server.")
+    load.add_argument(
+        "--workers", type=int, default=1, help="Number of uvicorn worker processes (default: %(default)s)."
+    )
+    load.add_argument("--url", help="Load test an already running server instead of starting one.")
+    load.add_argument(
+        "--concurrency", type=int, default=16, help="Number of requests in flight (default: %(default)s)."
+    )
+    load.add_argument(
+        "--requests", type=int, default=2000, help="Number of requests measured (default: %(default)s)."
+    )
+    load.add_argument(
+        "--warmup",
+        type=int,
+        default=100,
+        help="Number of requests sent before measuring (default: %(default)s).",
+    )
+    load.add_argument(
+        "--sites", type=int, default=500, help="Number of generated sites (default: %(default)s)."
+    )
+    load.add_argument(
+        "--seed", type=int, default=0, help="Seed of the sites and requests (default: %(default)s)."
+    )
+    load.add_argument(
+        "--mix",
+        nargs="+",
+        default=[],
+        metavar="ROUTE=SHARE",
+        help="Share of each route, e.g. sky_transitions=3 day_information=1 (default: "
+        + " ".join(f"{route}={share}" for route, share in ROUTE_MIX.items())
+        + ").",
+    )
+    load.add_argument("--output", type=Path, help="JSON file to write the report to instead of printing it.")
+    load.set_defaults(func=run_loadtest)
+
+    assets = commands.add_parser("assets", help="Write the precompressed variants of the static files.")
+    assets.add_argument(
+        "directory",
+        type=Path,
+        nargs="?",
+        default=Path(str(files("helios.data").joinpath("static"))),
+        help="Static directory (default: the packaged one).",
+    )
+    assets.add_argument(
+        "--minimum-saving",
+        type=float,
+        default=MINIMUM_SAVING,
+        help="Fraction of a file's size its compression must save (default: %(default)s).",
+    )
+    assets.set_defaults(func=build_assets)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command line interface.
+
+    Parameters
+    ----------
+    argv : Sequence, optional
+        The command line arguments, those of the process if not given.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    args = make_parser().parse_args(argv)
+    status: int = args.func(args)
+    return status
@@ -0,0 +1,75 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for sharing identical concurrent calculations."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight:
+    """Share one in-flight calculation between callers with the same key.
+
+    The first caller for a key starts the calculation, and callers arriving
+    while it runs await the same result instead of starting their own. The
+    calculation runs as a task, so it completes for the remaining callers
+    even if the caller that started it is cancelled. Once it finishes, the
+    next caller for the key starts a new calculation.
+    """
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+        self._in_flight: dict[Hashable, asyncio.Future[Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of calculations in flight."""
+        return len(self._in_flight)
+
+    async def run(self, key: Hashable, calculate: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a calculation unless one with the same key is in flight.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key identifying the calculation.
+        calculate : Callable
+            Returns the awaitable calculation, only called when no
+            calculation with the key is in flight.
+
+        Returns
+        -------
+        Any
+            The result of the calculation. Errors are raised for every
+            caller sharing it.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            self.leaders += 1
+            future = asyncio.ensure_future(calculate())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        """Forget a finished calculation.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key identifying the calculation.
+        future : asyncio.Future
+            The finished calculation.
+        """
+        self._in_flight.pop(key, None)
+        if not future.cancelled():
+            # Mark the error retrieved in case every caller was cancelled.
+            future.exception()
@@ -0,0 +1,129 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for HTTP caching of location day responses."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time, timedelta
+import hashlib
+import math
+import zoneinfo
+
+from . import __version__
+
+__all__ = ["cache_headers", "day_etag", "next_midnight", "none_match"]
+
+
+def day_etag(
+    latitude: float,
+    longitude: float,
+    local_date: date,
+    location_timezone: str,
+    engine: str,
+    precision: int | None = None,
+) -> str:
+    """Build the strong entity tag of a location's day.
+
+    The tag is derived from the same rounded key as the cached results, so
+    all locations sharing a cached body share its tag. The tag also covers
+    the package version, so a new release with a changed representation
+    does not match older tags.
+
+    Parameters
+    ----------
+    latitude : float
+        The latitude (decimal degrees) of the location.
+    longitude : float
+        The longitude (decimal degrees) of the location.
+    local_date : date
+        The calendar date at the location.
+    location_timezone : str
+        The timezone for the location.
+    engine : str
+        The name and version of the engine calculating the sky transitions.
+    precision : int, optional
+        The number of decimal places latitude and longitude are rounded to,
+        as in the cache keys. They are not rounded if not given.
+
+    Returns
+    -------
+    str
+        The quoted entity tag.
+    """
+    if precision is not None:
+        latitude, longitude = round(latitude, precision), round(longitude, precision)
+    key = "|".join(
+        (repr(latitude), repr(longitude), local_date.isoformat(), location_timezone, engine, __version__)
+    )
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def cache_headers(etag: str, location_timezone: str, now: datetime | None = None) -> dict[str, str]:
+    """Build the caching headers of a location's day.
+
+    Responses may be cached until the next local midnight, when the current
+    day changes.
+
+    Parameters
+    ----------
+    etag : str
+        The entity tag of the response.
+    location_timezone : str
+        The timezone for the location.
+    now : datetime, optional
+        The current date/time, taken from the clock if not given.
+
+    Returns
+    -------
+    dict
+        The ``ETag`` and ``Cache-Control`` headers.
+    """
+    now = now or datetime.now(UTC)
+    max_age = max(math.ceil(next_midnight(location_timezone, now).timestamp() - now.timestamp()), 1)
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+
+def next_midnight(location_timezone: str, now: datetime) -> datetime:
+    """Find the local midnight ending the current day.
+
+    Parameters
+    ----------
+    location_timezone : str
+        The timezone for the location.
+    now : datetime
+        The current date/time.
+
+    Returns
+    -------
+    datetime
+        The next local midnight.
+    """
+    zone = zoneinfo.ZoneInfo(location_timezone)
+    return datetime.combine(now.astimezone(zone).date() + timedelta(days=1), time(), tzinfo=zone)
+
+
+def none_match(if_none_match: str | None, etag: str) -> bool:
+    """Check an ``If-None-Match`` header against an entity tag.
+
+    The weak comparison is used, as required for ``If-None-Match``.
+
+    Parameters
+    ----------
+    if_none_match : str or None
+        The header value, None if the request has none.
+    etag : str
+        The entity tag of the current response.
+
+    Returns
+    -------
+    bool
+        True if the client already holds the response.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in tags
@@ -0,0 +1,238 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for application configuration."""
+
+from __future__ import annotations
+
+from enum import Enum
+from pathlib import Path
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .engines import EngineName
+
+__all__ = ["Config", "EngineName", "ExecutorType", "config"]
+
+
+class ExecutorType(str, Enum):
+    """Kind of executor running the calculations."""
+
+    thread = "thread"
+    process = "process"
+
+
+class Config(BaseSettings):
+    """Configuration for the application.
+
+    All settings can be given through environment variables with a
+    ``HELIOS_`` prefix, e.g. ``HELIOS_EXECUTOR_WORKERS=8``.
+    """
+
+    engine: EngineName = Field(
+        EngineName.skyfield,
+        title="Solar engine",
+        description="Engine searching for sky transitions when a request does not ask for one.",
+    )
+
+    ephemeris_path: Path | None = Field(
+        None,
+        title="Ephemeris path",
+        description="SPK file to load instead of the packaged DE421 ephemeris, e.g. a trimmed excerpt.",
+    )
+
+    grid_path: Path | None = Field(
+        None,
+        title="Grid path",
+        description="Directory of a precomputed transitions grid enabling the grid engine.",
+    )
+
+    openapi_path: Path | None = Field(
+        None,
+        title="OpenAPI path",
+        description="Prebuilt OpenAPI schema served instead of building it on the first request for it.",
+    )
+
+    executor_type: ExecutorType = Field(
+        ExecutorType.thread,
+        title="Executor type",
+        description="Run calculations in a thread pool or a process pool.",
+    )
+
+    executor_workers: int = Field(
+        4,
+        ge=1,
+        title="Executor workers",
+        description="Number of threads or processes running calculations.",
+    )
+
+    executor_backlog: int = Field(
+        64,
+        ge=0,
+        title="Executor backlog",
+        description="Number of calculations allowed to wait for a worker before requests are rejected.",
+    )
+
+    cache_size: int = Field(
+        4096,
+        ge=0,
+        title="Cache size",
+        description="Number of location days kept in the sky transitions cache. Zero disables the cache.",
+    )
+
+    cache_ttl: float = Field(
+        86400.0,
+        gt=0,
+        title="Cache lifetime",
+        description="Number of seconds a sky transitions cache entry is kept.",
+    )
+
+    cache_precision: int = Field(
+        4,
+        ge=0,
+        title="Cache precision",
+        description="Number of decimal places latitude and longitude are rounded to for cache keys.",
+    )
+
+    incremental: bool = Field(
+        False,
+        title="Incremental search",
+        description="Refine sky transitions near those of a cached neighboring day when possible.",
+    )
+
+    page_cache_size: int = Field(
+        256,
+        ge=0,
+        title="Page cache size",
+        description="Number of rendered /day_information pages kept. Zero disables the cache.",
+    )
+
+    page_cache_gzip: bool = Field(
+        True,
+        title="Page cache compression",
+        description="Keep a gzip compressed variant of each cached page.",
+    )
+
+    feed_max_subscribers: int = Field(
+        10000,
+        ge=0,
+        title="Feed subscribers",
+        description="Number of /sky_transitions/events subscriptions a worker process holds at once.",
+    )
+
+    feed_heartbeat: float = Field(
+        15.0,
+        gt=0,
+        title="Feed heartbeat",
+        description="Number of seconds between keep-alive comments sent to feed subscribers.",
+    )
+
+    store_path: Path | None = Field(
+        None,
+        title="Store path",
+        description="SQLite file persisting calculated sky transitions across workers and restarts.",
+    )
+
+    store_max_entries: int = Field(
+        1_000_000,
+        ge=1,
+        title="Store size",
+        description="Number of location days kept in the store, the oldest are removed first.",
+    )
+
+    batch_max_items: int = Field(
+        1000,
+        ge=1,
+        title="Batch size limit",
+        description="Maximum number of items in a batch sky transitions request.",
+    )
+
+    range_max_days: int = Field(
+        366,
+        ge=1,
+        title="Date range limit",
+        description="Maximum number of days in a sky transitions date range request.",
+    )
+
+    export_max_sites: int = Field(
+        1000,
+        ge=1,
+        title="Export size limit",
+        description="Maximum number of sites in a sky transitions export request.",
+    )
+
+    export_chunk_days: int = Field(
+        31,
+        ge=1,
+        title="Export chunk size",
+        description="Number of days of a site calculated at a time by a streaming export.",
+    )
+
+    raster_max_pixels: int = Field(
+        259_200,
+        ge=1,
+        title="Raster size limit",
+        description="Maximum number of pixels in a raster request.",
+    )
+
+    positions_max_samples: int = Field(
+        10_000,
+        ge=1,
+        title="Sun positions limit",
+        description="Maximum number of samples in a sun positions response that is not streamed.",
+    )
+
+    positions_stream_max_samples: int = Field(
+        527_040,
+        ge=1,
+        title="Streamed sun positions limit",
+        description="Maximum number of samples in a streamed sun positions response.",
+    )
+
+    positions_chunk_samples: int = Field(
+        1440,
+        ge=1,
+        title="Sun positions chunk size",
+        description="Number of samples calculated at a time by a streamed sun positions response.",
+    )
+
+    metrics_enabled: bool = Field(
+        False,
+        title="Metrics enabled",
+        description="Record request and calculation stage timings and serve them on /metrics.",
+    )
+
+    profiling_directory: Path | None = Field(
+        None,
+        title="Profiling directory",
+        description="Directory the request profiles are written to. Profiling is disabled if not set.",
+    )
+
+    profiling_sample_rate: float = Field(
+        0.0,
+        ge=0.0,
+        le=1.0,
+        title="Profiling sample rate",
+        description="Fraction of requests profiled.",
+    )
+
+    profiling_header: str = Field(
+        "X-Helios-Profile",
+        title="Profiling header",
+        description="Request header asking for the request to be profiled.",
+    )
+
+    profiling_max_files: int = Field(
+        100,
+        ge=1,
+        title="Profiling file limit",
+        description="Number of request profiles kept, the oldest are removed first.",
+    )
+
+    model_config = SettingsConfigDict(env_prefix="HELIOS_")
+
+
+config = Config()
+"""Configuration for the application."""
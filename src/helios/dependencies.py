@@ -0,0 +1,126 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for application dependencies."""
+
+from __future__ import annotations
+
+import threading
+
+from .config import config
+from .executor import CalculationExecutor
+from .solar_calculator import SolarCalculator
+
+__all__ = [
+    "CalculatorDependency",
+    "ExecutorDependency",
+    "calculator_dependency",
+    "executor_dependency",
+]
+
+
+class CalculatorDependency:
+    """Provide a process-wide solar calculator.
+
+    The calculator is normally created and warmed up by the application
+    lifespan hook. If a route is hit before that happens (for instance when
+    the application runs without its lifespan), the calculator is created on
+    first use.
+    """
+
+    def __init__(self) -> None:
+        self._calculator: SolarCalculator | None = None
+        self._lock = threading.Lock()
+
+    async def __call__(self) -> SolarCalculator:
+        """Return the shared calculator.
+
+        Returns
+        -------
+        SolarCalculator
+            The process-wide calculator instance.
+        """
+        return self.calculator
+
+    @property
+    def calculator(self) -> SolarCalculator:
+        """The shared calculator, created on first access."""
+        if self._calculator is None:
+            with self._lock:
+                if self._calculator is None:
+                    self._calculator = SolarCalculator.from_config(config)
+        return self._calculator
+
+    def initialize(self, warm_up: bool = True) -> None:
+        """Create the shared calculator.
+
+        Parameters
+        ----------
+        warm_up : bool
+            Run a throwaway calculation so the first request is not slow.
+        """
+        calculator = self.calculator
+        if warm_up:
+            calculator.warm_up()
+
+    def close(self) -> None:
+        """Release the shared calculator."""
+        with self._lock:
+            self._calculator = None
+
+
+calculator_dependency = CalculatorDependency()
+"""The dependency that provides the shared solar calculator."""
+
+
+class ExecutorDependency:
+    """Provide the process-wide calculation executor.
+
+    The executor is built from the application configuration by the lifespan
+    hook, or on first use if the lifespan has not run.
+    """
+
+    def __init__(self) -> None:
+        self._executor: CalculationExecutor | None = None
+        self._lock = threading.Lock()
+
+    async def __call__(self) -> CalculationExecutor:
+        """Return the shared executor.
+
+        Returns
+        -------
+        CalculationExecutor
+            The process-wide executor instance.
+        """
+        return self.executor
+
+    @property
+    def executor(self) -> CalculationExecutor:
+        """The shared executor, created on first access."""
+        if self._executor is None:
+            self.initialize()
+        assert self._executor is not None
+        return self._executor
+
+    def initialize(self) -> None:
+        """Create the shared executor from the application configuration."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = CalculationExecutor(
+                    lambda: calculator_dependency.calculator,
+                    executor_type=config.executor_type,
+                    workers=config.executor_workers,
+                    backlog=config.executor_backlog,
+                )
+
+    def close(self) -> None:
+        """Shut down the shared executor."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = None
+
+
+executor_dependency = ExecutorDependency()
+"""The dependency that provides the shared calculation executor."""
@@ -0,0 +1,553 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for the engines searching for sky transitions."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+from enum import Enum
+import math
+import time
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import numpy as np
+import numpy.typing as npt
+
+from .ephemeris import EPHEMERIS_TARGETS
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from skyfield.timelib import Timescale
+
+__all__ = ["AnalyticEngine", "EngineName", "SkyfieldEngine", "SolarEngine", "Transitions"]
+
+Transitions = tuple[int, list[datetime], list[int]]
+"""The dark/twilight/day value at the start of a search window, followed by
+the UTC date/times of the changes and the values after each change."""
+
+JULIAN_DAY_ORDINAL = 1721424.5
+"""Julian day of the midnight starting proleptic Gregorian ordinal day 0."""
+
+TWILIGHT_ALTITUDES = (-18.0, -12.0, -6.0, -0.8333)
+"""Sun altitudes (degrees) separating the dark, twilight and day values."""
+
+
+class EngineName(str, Enum):
+    """Name of an engine searching for sky transitions."""
+
+    skyfield = "skyfield"
+    analytic = "analytic"
+    grid = "grid"
+
+
+class SolarEngine(ABC):
+    """Interface for searching sky transitions.
+
+    An engine finds when the Sun crosses the twilight altitudes. The value
+    of the dark/twilight/day function follows ``skyfield.almanac``: 0 is dark
+    of night, 1 to 3 are astronomical, nautical and civil twilight and 4 is
+    the Sun being up.
+    """
+
+    name: ClassVar[EngineName]
+    """The name of the engine."""
+
+    version: ClassVar[str]
+    """The version of the engine's algorithm, bumped when results change."""
+
+    @abstractmethod
+    def search(
+        self,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        starts: Sequence[datetime],
+        ends: Sequence[datetime],
+    ) -> list[Transitions]:
+        """Search for the changes of the dark/twilight/day function.
+
+        Parameters
+        ----------
+        latitudes : Sequence
+            The latitude (decimal degrees) of each location.
+        longitudes : Sequence
+            The longitude (decimal degrees) of each location.
+        starts : Sequence
+            The aware date/time starting each search window.
+        ends : Sequence
+            The aware date/time ending each search window.
+
+        Returns
+        -------
+        list
+            The transitions found in each search window.
+        """
+
+    def refine(
+        self, latitude: float, longitude: float, start: datetime, end: datetime, guesses: Transitions
+    ) -> Transitions | None:
+        """Find the changes in a window near guessed ones.
+
+        The guesses usually come from the same location on a neighboring
+        day. Engines without a faster way than a full search return None.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        start : datetime
+            The aware date/time starting the search window.
+        end : datetime
+            The aware date/time ending the search window.
+        guesses : Transitions
+            The guessed transitions in the window.
+
+        Returns
+        -------
+        Transitions or None
+            The transitions found, None if the guesses do not hold and a
+            full search is needed.
+        """
+        return None
+
+    def coverage(self) -> tuple[date, date] | None:
+        """Find the UTC dates the engine can search.
+
+        Returns
+        -------
+        tuple or None
+            The first and last UTC dates wholly covered, None if the engine
+            is not limited.
+        """
+        return None
+
+
+class SkyfieldEngine(SolarEngine):
+    """Search for sky transitions with skyfield root-finding.
+
+    Parameters
+    ----------
+    timescale : Timescale
+        The skyfield timescale.
+    ephemeris : SpiceKernel
+        The ephemeris containing the Sun and Earth.
+    """
+
+    name = EngineName.skyfield
+    version = "1"
+
+    def __init__(self, timescale: Timescale, ephemeris: Any) -> None:
+        self.timescale = timescale
+        self.ephemeris = ephemeris
+        self.refined = 0
+        self.refine_fallbacks = 0
+        self._coverage: tuple[date, date] | None = None
+
+    def coverage(self) -> tuple[date, date] | None:
+        """Find the UTC dates the ephemeris covers.
+
+        Returns
+        -------
+        tuple
+            The first and last UTC dates wholly covered by every segment the
+            search needs.
+        """
+        if self._coverage is None:
+            segments = [
+                segment.spk_segment
+                for segment in self.ephemeris.segments
+                if segment.target in EPHEMERIS_TARGETS
+            ]
+            start = max(segment.start_jd for segment in segments) - JULIAN_DAY_ORDINAL
+            end = min(segment.end_jd for segment in segments) - JULIAN_DAY_ORDINAL
+            self._coverage = (date.fromordinal(math.ceil(start)), date.fromordinal(math.floor(end) - 1))
+        return self._coverage
+
+    def search(
+        self,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        starts: Sequence[datetime],
+        ends: Sequence[datetime],
+    ) -> list[Transitions]:
+        """Search for the changes of the dark/twilight/day function.
+
+        A single window is searched with ``almanac.find_discrete``. Several
+        windows are searched together, evaluating all of the locations in a
+        single vectorized call per search step.
+
+        With metrics enabled, the time spent evaluating the dark/twilight/day
+        function and the rest of the root-finding are recorded as the
+        ``dark_twilight_day`` and ``find_discrete`` stages.
+
+        Parameters
+        ----------
+        latitudes : Sequence
+            The latitude (decimal degrees) of each location.
+        longitudes : Sequence
+            The longitude (decimal degrees) of each location.
+        starts : Sequence
+            The aware date/time starting each search window.
+        ends : Sequence
+            The aware date/time ending each search window.
+
+        Returns
+        -------
+        list
+            The transitions found in each search window.
+        """
+        # Skyfield is loaded on first use, keeping it out of the
+        # application import.
+        from skyfield import almanac
+        from skyfield.api import wgs84
+
+        from .searches import dark_twilight_day_sites, find_discrete_sites
+
+        if len(starts) == 1:
+            t0 = self.timescale.from_datetime(starts[0])
+            t1 = self.timescale.from_datetime(ends[0])
+            location = wgs84.latlon(latitudes[0], longitudes[0])
+            f = almanac.dark_twilight_day(self.ephemeris, location)
+            begin = time.perf_counter()
+            f, evaluation = _timed_function(f)
+            times, events = almanac.find_discrete(t0, t1, f)
+            _observe_search(begin, evaluation)
+            return [(f(t0).item(), list(times.utc_datetime()), events.tolist())]
+
+        t0 = self.timescale.from_datetimes(list(starts))
+        t1 = self.timescale.from_datetimes(list(ends))
+        f = dark_twilight_day_sites(self.ephemeris, latitudes, longitudes)
+        begin = time.perf_counter()
+        f, evaluation = _timed_function(f)
+        initial, changes = find_discrete_sites(self.timescale, t0.tt, t1.tt, f)
+        _observe_search(begin, evaluation)
+        transitions = []
+        for previous_e, (jd, events) in zip(initial.tolist(), changes, strict=True):
+            times = list(self.timescale.tt_jd(jd).utc_datetime()) if len(jd) else []
+            transitions.append((previous_e, times, events.tolist()))
+        return transitions
+
+    def refine(
+        self, latitude: float, longitude: float, start: datetime, end: datetime, guesses: Transitions
+    ) -> Transitions | None:
+        """Find the changes in a window near guessed ones.
+
+        The guesses are checked against the same samples as a full search,
+        then the Sun's altitude is solved near each of them. See
+        ``searches.refine_dark_twilight_day``.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        start : datetime
+            The aware date/time starting the search window.
+        end : datetime
+            The aware date/time ending the search window.
+        guesses : Transitions
+            The guessed transitions in the window.
+
+        Returns
+        -------
+        Transitions or None
+            The transitions found, None if the guesses do not hold and a
+            full search is needed.
+        """
+        from .searches import refine_dark_twilight_day
+
+        initial, times, events = guesses
+        jd = None
+        if times:
+            jd = refine_dark_twilight_day(
+                self.timescale,
+                self.ephemeris,
+                latitude,
+                longitude,
+                self.timescale.from_datetime(start).tt,
+                self.timescale.from_datetime(end).tt,
+                self.timescale.from_datetimes(times).tt,
+                np.array(events),
+                initial,
+            )
+        if jd is None:
+            self.refine_fallbacks += 1
+            return None
+        self.refined += 1
+        return (initial, list(self.timescale.tt_jd(jd).utc_datetime()), list(events))
+
+
+class AnalyticEngine(SolarEngine):
+    """Search for sky transitions with the NOAA sunrise equations.
+
+    The Sun's declination and the equation of time come from the low
+    precision formulae used by the NOAA solar calculator. The crossings of
+    each twilight altitude are then found from the hour angle around local
+    solar noon, for all locations and days at once with NumPy.
+
+    Up to 60 degrees of latitude, results agree with the skyfield engine to
+    better than 30 seconds. Closer to the poles the Sun can graze a twilight
+    altitude, where small position errors turn into large time errors.
+    """
+
+    name = EngineName.analytic
+    version = "1"
+
+    iterations = 2
+    """Number of times event times are refined with the Sun's position at
+    the previous estimate."""
+
+    def search(
+        self,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        starts: Sequence[datetime],
+        ends: Sequence[datetime],
+    ) -> list[Transitions]:
+        """Search for the changes of the dark/twilight/day function.
+
+        Parameters
+        ----------
+        latitudes : Sequence
+            The latitude (decimal degrees) of each location.
+        longitudes : Sequence
+            The longitude (decimal degrees) of each location.
+        starts : Sequence
+            The aware date/time starting each search window.
+        ends : Sequence
+            The aware date/time ending each search window.
+
+        Returns
+        -------
+        list
+            The transitions found in each search window.
+        """
+        start = np.array([t.timestamp() for t in starts])
+        end = np.array([t.timestamp() for t in ends])
+        initial, windows, times, values = self.find_events(
+            np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float), start, end
+        )
+        splits = np.searchsorted(windows, np.arange(1, len(start)))
+        transitions = []
+        for previous_e, window_times, window_values in zip(
+            initial.tolist(), np.split(times, splits), np.split(values, splits), strict=True
+        ):
+            transitions.append(
+                (
+                    previous_e,
+                    [datetime.fromtimestamp(t, UTC) for t in window_times.tolist()],
+                    window_values.tolist(),
+                )
+            )
+        return transitions
+
+    def find_events(
+        self,
+        latitudes: npt.NDArray[np.float64],
+        longitudes: npt.NDArray[np.float64],
+        start: npt.NDArray[np.float64],
+        end: npt.NDArray[np.float64],
+    ) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.int_], npt.NDArray[np.float64], npt.NDArray[np.int_]]:
+        """Search for the changes of the dark/twilight/day function as arrays.
+
+        This is the search without building date/times, for callers working
+        on many windows with NumPy.
+
+        Parameters
+        ----------
+        latitudes : numpy.ndarray
+            The latitude (decimal degrees) of each location.
+        longitudes : numpy.ndarray
+            The longitude (decimal degrees) of each location.
+        start : numpy.ndarray
+            The UNIX timestamp starting each search window.
+        end : numpy.ndarray
+            The UNIX timestamp ending each search window.
+
+        Returns
+        -------
+        tuple
+            The dark/twilight/day value at the start of each window, then
+            the window, UNIX timestamp and new value of every change, sorted
+            by window and time.
+        """
+        latitude = np.radians(latitudes)
+        longitude = longitudes
+
+        # Every UTC day whose solar noon can have crossings in the window.
+        first = np.floor(start / 86400.0).astype(int) - 1
+        counts = np.floor(end / 86400.0).astype(int) + 2 - first
+        windows = np.repeat(np.arange(len(start)), counts)
+        days = first[windows] + np.arange(len(windows)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        noon = days * 86400.0 + 43200.0 - longitude[windows] * 240.0
+        for _ in range(self.iterations):
+            noon = days * 86400.0 + 43200.0 - (longitude[windows] + _equation_of_time(noon)) * 240.0
+
+        event_windows = []
+        event_times = []
+        event_values = []
+        for value, altitude in enumerate(TWILIGHT_ALTITUDES):
+            for direction, new_value in ((-1.0, value + 1), (1.0, value)):
+                time = noon.copy()
+                for _ in range(self.iterations):
+                    declination = _declination(time)
+                    hour_angle = _hour_angle(latitude[windows], declination, altitude)
+                    time = (
+                        days * 86400.0
+                        + 43200.0
+                        - (longitude[windows] + _equation_of_time(time)) * 240.0
+                        + direction * hour_angle * 240.0
+                    )
+                found = ~np.isnan(time) & (time >= start[windows]) & (time < end[windows])
+                event_windows.append(windows[found])
+                event_times.append(time[found])
+                event_values.append(np.full(found.sum(), new_value))
+
+        all_windows = np.concatenate(event_windows)
+        all_times = np.concatenate(event_times)
+        all_values = np.concatenate(event_values)
+        order = np.lexsort((all_times, all_windows))
+        initial = _dark_twilight_day(latitude, longitude, start)
+        return initial, all_windows[order], all_times[order], all_values[order]
+
+
+def _timed_function(f: Any) -> tuple[Any, list[float]]:
+    """Wrap a function to add up the time spent in it.
+
+    The function is returned unchanged while metrics are disabled.
+
+    Parameters
+    ----------
+    f : Callable
+        The function to time. Its ``step_days`` attribute is kept for
+        ``skyfield`` searches.
+
+    Returns
+    -------
+    tuple
+        The function to call instead and a list holding the total seconds
+        spent in it.
+    """
+    total = [0.0]
+    if not metrics.enabled:
+        return f, total
+
+    def timed(*args: Any) -> Any:
+        begin = time.perf_counter()
+        try:
+            return f(*args)
+        finally:
+            total[0] += time.perf_counter() - begin
+
+    timed.step_days = getattr(f, "step_days", None)  # type: ignore[attr-defined]
+    return timed, total
+
+
+def _observe_search(begin: float, evaluation: list[float]) -> None:
+    """Record the stages of a root-finding search.
+
+    Parameters
+    ----------
+    begin : float
+        The performance counter value when the search started.
+    evaluation : list
+        The total seconds spent evaluating the discrete function.
+    """
+    if metrics.enabled:
+        metrics.observe_stage("dark_twilight_day", evaluation[0])
+        metrics.observe_stage("find_discrete", time.perf_counter() - begin - evaluation[0])
+
+
+def _sun_parameters(
+    timestamp: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Calculate the low precision solar coordinates used by NOAA.
+
+    Parameters
+    ----------
+    timestamp : numpy.ndarray
+        The UNIX timestamps in UTC.
+
+    Returns
+    -------
+    tuple
+        The Sun's apparent longitude, the obliquity of the ecliptic and the
+        equation of time, all in degrees.
+    """
+    t = (timestamp / 86400.0 + 2440587.5 - 2451545.0) / 36525.0
+    mean_longitude = np.mod(280.46646 + t * (36000.76983 + t * 0.0003032), 360.0)
+    mean_anomaly = np.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    center = (
+        np.sin(mean_anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+        + np.sin(2.0 * mean_anomaly) * (0.019993 - 0.000101 * t)
+        + np.sin(3.0 * mean_anomaly) * 0.000289
+    )
+    omega = np.radians(125.04 - 1934.136 * t)
+    apparent_longitude = mean_longitude + center - 0.00569 - 0.00478 * np.sin(omega)
+    mean_obliquity = 23.0 + (26.0 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60.0) / 60.0
+    obliquity = mean_obliquity + 0.00256 * np.cos(omega)
+
+    y = np.tan(np.radians(obliquity) / 2.0) ** 2
+    l0 = np.radians(mean_longitude)
+    equation_of_time = np.degrees(
+        y * np.sin(2.0 * l0)
+        - 2.0 * eccentricity * np.sin(mean_anomaly)
+        + 4.0 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2.0 * l0)
+        - 0.5 * y * y * np.sin(4.0 * l0)
+        - 1.25 * eccentricity * eccentricity * np.sin(2.0 * mean_anomaly)
+    )
+    return apparent_longitude, obliquity, equation_of_time
+
+
+def _declination(timestamp: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Calculate the Sun's declination in radians."""
+    apparent_longitude, obliquity, _ = _sun_parameters(timestamp)
+    declination: npt.NDArray[np.float64] = np.arcsin(
+        np.sin(np.radians(obliquity)) * np.sin(np.radians(apparent_longitude))
+    )
+    return declination
+
+
+def _equation_of_time(timestamp: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Calculate the equation of time in degrees."""
+    return _sun_parameters(timestamp)[2]
+
+
+def _hour_angle(
+    latitude: npt.NDArray[np.float64], declination: npt.NDArray[np.float64], altitude: float
+) -> npt.NDArray[np.float64]:
+    """Calculate the hour angle (degrees) where the Sun is at an altitude.
+
+    The hour angle is NaN where the Sun never reaches the altitude.
+    """
+    cos_hour_angle = (np.sin(np.radians(altitude)) - np.sin(latitude) * np.sin(declination)) / (
+        np.cos(latitude) * np.cos(declination)
+    )
+    with np.errstate(invalid="ignore"):
+        hour_angle: npt.NDArray[np.float64] = np.degrees(np.arccos(cos_hour_angle))
+    return hour_angle
+
+
+def _dark_twilight_day(
+    latitude: npt.NDArray[np.float64], longitude: npt.NDArray[np.float64], timestamp: npt.NDArray[np.float64]
+) -> npt.NDArray[np.int_]:
+    """Calculate the dark/twilight/day value at each location and time."""
+    declination = _declination(timestamp)
+    solar_minutes = np.mod(timestamp, 86400.0) / 60.0 + 4.0 * (longitude + _equation_of_time(timestamp))
+    hour_angle = np.radians(solar_minutes / 4.0 - 180.0)
+    altitude = np.degrees(
+        np.arcsin(
+            np.sin(latitude) * np.sin(declination)
+            + np.cos(latitude) * np.cos(declination) * np.cos(hour_angle)
+        )
+    )
+    values: npt.NDArray[np.int_] = np.searchsorted(np.array(TWILIGHT_ALTITUDES), altitude, side="right")
+    return values
@@ -0,0 +1,86 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for loading and trimming the ephemeris."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date
+from importlib.resources import files
+from pathlib import Path
+from typing import Any
+
+__all__ = ["DATA_PATH", "EPHEMERIS_TARGETS", "load_ephemeris", "trim_ephemeris"]
+
+DATA_PATH = files("helios.data.skyfield").joinpath("de421.bsp")
+"""The full ephemeris shipped with the package."""
+
+EPHEMERIS_TARGETS = (3, 5, 6, 10, 399)
+"""NAIF codes of the segments needed for the apparent Sun seen from the
+Earth: the Earth-Moon barycenter, the Sun and the Earth, along with the
+Jupiter and Saturn barycenters skyfield uses for light deflection."""
+
+
+def load_ephemeris(path: Path | None = None) -> Any:
+    """Load an ephemeris.
+
+    The segments are memory mapped by ``jplephem``, so only the pages a
+    calculation touches are read and processes loading the same file share
+    them through the page cache.
+
+    Parameters
+    ----------
+    path : Path, optional
+        The SPK file to load, the packaged ephemeris if not given.
+
+    Returns
+    -------
+    SpiceKernel
+        The loaded ephemeris.
+    """
+    from skyfield.api import load_file
+
+    return load_file(path if path is not None else DATA_PATH)
+
+
+def trim_ephemeris(
+    source: Path,
+    output: Path,
+    start_year: int,
+    end_year: int,
+    targets: Iterable[int] = EPHEMERIS_TARGETS,
+) -> None:
+    """Write an excerpt of an ephemeris covering only some segments and years.
+
+    Parameters
+    ----------
+    source : Path
+        The SPK file to trim.
+    output : Path
+        The SPK file to write.
+    start_year : int
+        The first year covered by the excerpt.
+    end_year : int
+        The last year covered by the excerpt.
+    targets : Iterable
+        The NAIF codes of the segment targets to keep.
+    """
+    from jplephem.excerpter import write_excerpt
+    from jplephem.spk import SPK
+
+    start_jd = date(start_year, 1, 1).toordinal() + 1721424.5
+    end_jd = date(end_year + 1, 1, 1).toordinal() + 1721424.5
+    wanted = set(targets)
+    spk = SPK.open(str(source))
+    try:
+        summaries = [
+            summary
+            for summary, segment in zip(spk.daf.summaries(), spk.segments, strict=True)
+            if segment.target in wanted
+        ]
+        with output.open("w+b") as output_file:
+            write_excerpt(spk, output_file, start_jd, end_jd, summaries)
+    finally:
+        spk.close()
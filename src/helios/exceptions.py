@@ -6,10 +6,28 @@
 
 from __future__ import annotations
 
-__all__ = ["BadTimezone"]
+__all__ = ["BadTimezone", "DateOutOfRange", "EngineUnavailable", "ExecutorBusy"]
 
 
 class BadTimezone(Exception):
     """Exception for bad timezone."""
 
     pass
+
+
+class DateOutOfRange(Exception):
+    """Exception for dates an engine cannot calculate."""
+
+    pass
+
+
+class EngineUnavailable(Exception):
+    """Exception for an engine the calculator was not set up with."""
+
+    pass
+
+
+class ExecutorBusy(Exception):
+    """Exception for a calculation backlog that is full."""
+
+    pass
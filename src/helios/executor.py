@@ -0,0 +1,206 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for running calculations off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+import functools
+from typing import Any
+
+from .coalescing import SingleFlight
+from .config import ExecutorType, config
+from .engines import EngineName
+from .exceptions import ExecutorBusy
+from .metrics import metrics
+from .models import ExecutorStatus
+from .profiling import profiled
+from .solar_calculator import SolarCalculator
+
+__all__ = ["CalculationExecutor"]
+
+_worker_calculator: SolarCalculator | None = None
+"""The calculator owned by a process pool worker."""
+
+
+def _initialize_worker() -> None:
+    """Load and warm up the calculator in a process pool worker."""
+    global _worker_calculator
+    _worker_calculator = SolarCalculator.from_config(config)
+    _worker_calculator.warm_up()
+
+
+def _run_in_worker(method: str, metrics_enabled: bool, *args: Any) -> tuple[Any, list[tuple[str, float]]]:
+    """Run a calculator method in a process pool worker.
+
+    Parameters
+    ----------
+    method : str
+        The name of the calculator method to run.
+    metrics_enabled : bool
+        Time the stages of the calculation.
+    *args : Any
+        The arguments for the calculator method.
+
+    Returns
+    -------
+    tuple
+        The result of the calculator method and the stage names and times
+        for the parent process to record.
+    """
+    if _worker_calculator is None:
+        _initialize_worker()
+    metrics.enabled = metrics_enabled
+    with metrics.collect_stages() as stages:
+        result = getattr(_worker_calculator, method)(*args)
+    return result, stages
+
+
+class CalculationExecutor:
+    """Run calculator methods on a bounded pool of workers.
+
+    Calculations are handed to a thread or process pool so the event loop
+    stays responsive. Once more than ``backlog`` calculations are waiting for
+    a worker, new calculations are rejected. Thread pool calculations made
+    by a profiled request are added to its profile.
+
+    Concurrent ``sky_transitions`` calls for the same location, local date,
+    timezone and engine share a single calculation.
+
+    Parameters
+    ----------
+    calculator_factory : Callable
+        Returns the calculator used by the threads of a thread pool.
+    executor_type : ExecutorType
+        Run calculations in a thread pool or a process pool.
+    workers : int
+        The number of threads or processes.
+    backlog : int
+        The number of calculations allowed to wait for a worker.
+    """
+
+    def __init__(
+        self,
+        calculator_factory: Callable[[], SolarCalculator],
+        executor_type: ExecutorType = ExecutorType.thread,
+        workers: int = 4,
+        backlog: int = 64,
+    ) -> None:
+        self.calculator_factory = calculator_factory
+        self.executor_type = executor_type
+        self.workers = workers
+        self.backlog = backlog
+        self._in_flight = 0
+        self._rejected = 0
+        self._single_flight = SingleFlight()
+        self._executor: Executor
+        if executor_type == ExecutorType.process:
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="helios")
+
+    @property
+    def queued(self) -> int:
+        """The number of calculations waiting for a worker."""
+        return max(self._in_flight - self.workers, 0)
+
+    def status(self) -> ExecutorStatus:
+        """Report the executor load.
+
+        Returns
+        -------
+        ExecutorStatus
+            The current executor load.
+        """
+        return ExecutorStatus(
+            executor_type=self.executor_type.value,
+            workers=self.workers,
+            backlog=self.backlog,
+            running=min(self._in_flight, self.workers),
+            queued=self.queued,
+            saturation=min(self._in_flight, self.workers) / self.workers,
+            rejected=self._rejected,
+            coalesced=self._single_flight.coalesced,
+        )
+
+    async def run(self, method: str, *args: Any) -> Any:
+        """Run a calculator method on a worker.
+
+        Parameters
+        ----------
+        method : str
+            The name of the calculator method to run.
+        *args : Any
+            The arguments for the calculator method.
+
+        Returns
+        -------
+        Any
+            The result of the calculator method.
+
+        Raises
+        ------
+        ExecutorBusy
+            Raised if the backlog of waiting calculations is full.
+        """
+        if self._in_flight >= self.workers + self.backlog:
+            self._rejected += 1
+            raise ExecutorBusy
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            if self.executor_type == ExecutorType.process:
+                worker_call = functools.partial(_run_in_worker, method, metrics.enabled, *args)
+                result, stages = await loop.run_in_executor(self._executor, worker_call)
+                for name, seconds in stages:
+                    metrics.observe_stage(name, seconds)
+                return result
+            call = profiled(functools.partial(getattr(self.calculator_factory(), method), *args))
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self._in_flight -= 1
+
+    async def sky_transitions(
+        self,
+        latitude: float,
+        longitude: float,
+        current_datetime: float,
+        location_timezone: str,
+        engine: EngineName | None = None,
+    ) -> dict[str, datetime]:
+        """Calculate sky transitions on a worker.
+
+        Callers asking for the same location, local date, timezone and engine
+        while a calculation is running await that calculation. See
+        `SolarCalculator.sky_transitions` for the parameters.
+
+        Returns
+        -------
+        dict
+            A copy of the sky transitions.
+
+        Raises
+        ------
+        BadTimezone
+            Raised if the timezone is unknown.
+        ExecutorBusy
+            Raised if the backlog of waiting calculations is full.
+        """
+        local_date = SolarCalculator.local_date(current_datetime, location_timezone)
+        key = (latitude, longitude, local_date, location_timezone, engine)
+        sky_transitions = await self._single_flight.run(
+            key,
+            lambda: self.run(
+                "sky_transitions", latitude, longitude, current_datetime, location_timezone, engine
+            ),
+        )
+        return dict(sky_transitions)
+
+    def shutdown(self) -> None:
+        """Stop the workers once the running calculations finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,260 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for streaming exports."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+import csv
+from datetime import date, timedelta
+from enum import Enum
+import io
+import json
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .engines import EngineName
+from .exceptions import ExecutorBusy
+from .executor import CalculationExecutor
+from .formatters import key_format
+from .models import Site, SunPositions
+from .solar_calculator import TRANSITION_NAMES
+
+__all__ = [
+    "EXPORT_FIELDS",
+    "POSITION_DECIMALS",
+    "ExportFormat",
+    "export_lines",
+    "export_positions",
+    "export_records",
+    "sun_positions_model",
+]
+
+EXPORT_FIELDS = ("lat", "lon", "tz", "date", *(key_format(name) for name in TRANSITION_NAMES))
+"""The fields of each exported record in order."""
+
+EXPORT_BUSY = "The calculation backlog is full, the export stopped here."
+"""Error reported when the executor turns away an export's calculation."""
+
+POSITION_DECIMALS = 4
+"""Number of decimal places the Sun's altitude and azimuth are rounded to."""
+
+
+class ExportFormat(str, Enum):
+    """Format of a sky transitions export."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """The media type of the format."""
+        return {"ndjson": "application/x-ndjson", "csv": "text/csv"}[self.value]
+
+    @classmethod
+    def from_accept(cls, accept: str) -> ExportFormat:
+        """Pick the format from an Accept header.
+
+        Parameters
+        ----------
+        accept : str
+            The Accept header of the request.
+
+        Returns
+        -------
+        ExportFormat
+            CSV if the header asks for it, NDJSON otherwise.
+        """
+        return cls.csv if cls.csv.media_type in accept else cls.ndjson
+
+
+async def export_records(
+    executor: CalculationExecutor,
+    sites: Iterable[Site],
+    start_date: date,
+    end_date: date,
+    chunk_days: int = 31,
+    engine: EngineName | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Calculate the sky transitions of many sites and days as records.
+
+    The date range of each site is calculated a chunk at a time, so only one
+    chunk of results is held in memory however large the export is.
+
+    Parameters
+    ----------
+    executor : CalculationExecutor
+        The executor running the calculations.
+    sites : Iterable
+        The sites to export.
+    start_date : date
+        The first local date of the export.
+    end_date : date
+        The last local date of the export, included in the results.
+    chunk_days : int
+        The number of days calculated at a time.
+    engine : EngineName, optional
+        The engine calculating the sky transitions.
+
+    Yields
+    ------
+    dict
+        The record for a single site and day.
+    """
+    for site in sites:
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+            st_range = await executor.run(
+                "sky_transitions_range", site.lat, site.lon, chunk_start, chunk_end, site.tz, engine
+            )
+            for day, st in st_range.items():
+                record: dict[str, Any] = {
+                    "lat": site.lat,
+                    "lon": site.lon,
+                    "tz": site.tz,
+                    "date": day.isoformat(),
+                }
+                for name, value in st.items():
+                    record[key_format(name)] = value.timestamp() if value is not None else None
+                yield record
+            chunk_start = chunk_end + timedelta(days=1)
+
+
+async def export_positions(
+    executor: CalculationExecutor,
+    latitude: float,
+    longitude: float,
+    start: float,
+    count: int,
+    step: float,
+    chunk_samples: int = 1440,
+) -> AsyncIterator[str]:
+    """Calculate Sun positions a chunk of samples at a time.
+
+    Parameters
+    ----------
+    executor : CalculationExecutor
+        The executor running the calculations.
+    latitude : float
+        The latitude (decimal degrees) of the location.
+    longitude : float
+        The longitude (decimal degrees) of the location.
+    start : float
+        The UNIX timestamp of the first sample.
+    count : int
+        The number of samples.
+    step : float
+        The time between samples in seconds.
+    chunk_samples : int
+        The number of samples calculated at a time.
+
+    Yields
+    ------
+    str
+        A line holding the columns of a chunk as JSON, including the newline.
+    """
+    for offset in range(0, count, chunk_samples):
+        chunk_start = start + offset * step
+        altitude, azimuth = await executor.run(
+            "sun_positions", latitude, longitude, chunk_start, min(chunk_samples, count - offset), step
+        )
+        yield sun_positions_model(chunk_start, step, altitude, azimuth).model_dump_json() + "\n"
+
+
+def sun_positions_model(
+    start: float, step: float, altitude: npt.NDArray[np.float64], azimuth: npt.NDArray[np.float64]
+) -> SunPositions:
+    """Build the columns of a Sun positions time series.
+
+    Parameters
+    ----------
+    start : float
+        The UNIX timestamp of the first sample.
+    step : float
+        The time between samples in seconds.
+    altitude : numpy.ndarray
+        The altitude (degrees) of each sample.
+    azimuth : numpy.ndarray
+        The azimuth (degrees) of each sample.
+
+    Returns
+    -------
+    SunPositions
+        The time series with the positions rounded.
+    """
+    return SunPositions(
+        start=start,
+        step=step,
+        altitude=np.round(altitude, POSITION_DECIMALS).tolist(),
+        azimuth=np.round(azimuth, POSITION_DECIMALS).tolist(),
+    )
+
+
+async def export_lines(
+    records: AsyncIterator[dict[str, Any]], export_format: ExportFormat
+) -> AsyncIterator[str]:
+    """Serialize records a line at a time.
+
+    The headers are sent before the first record is calculated, so a
+    calculation failing midway is reported by a last line holding an
+    ``error`` record, in the CSV format a row starting with ``error``. A
+    full executor ends the export there, any other failure is raised again
+    once reported.
+
+    Parameters
+    ----------
+    records : AsyncIterator
+        The records to serialize.
+    export_format : ExportFormat
+        The format of the lines.
+
+    Yields
+    ------
+    str
+        A single line of the export, including the newline.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    if export_format == ExportFormat.csv:
+        writer.writeheader()
+        yield _drain(buffer)
+    try:
+        async for record in records:
+            if export_format == ExportFormat.ndjson:
+                yield json.dumps(record) + "\n"
+            else:
+                writer.writerow(record)
+                yield _drain(buffer)
+    except Exception as error:
+        message = EXPORT_BUSY if isinstance(error, ExecutorBusy) else f"Export failed: {error!r}"
+        if export_format == ExportFormat.ndjson:
+            yield json.dumps({"error": message}) + "\n"
+        else:
+            csv.writer(buffer, lineterminator="\n").writerow(["error", message])
+            yield _drain(buffer)
+        if not isinstance(error, ExecutorBusy):
+            raise
+
+
+def _drain(buffer: io.StringIO) -> str:
+    """Take the contents out of a text buffer.
+
+    Parameters
+    ----------
+    buffer : io.StringIO
+        The buffer to empty.
+
+    Returns
+    -------
+    str
+        The contents of the buffer.
+    """
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
@@ -0,0 +1,260 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for pushing sky transitions to subscribers as they happen."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import heapq
+import itertools
+import json
+import time
+from typing import Any
+
+from .models import FeedStatus
+
+__all__ = ["FeedFull", "Message", "Subscription", "TransitionFeed", "sse_event"]
+
+Message = tuple[str | None, Any]
+"""Event name and data delivered to a subscriber. A ``None`` name is a
+keep-alive."""
+
+KEEP_ALIVE: Message = (None, None)
+"""Message delivered to every subscriber on each heartbeat."""
+
+
+class FeedFull(Exception):
+    """Raised when the feed has as many subscribers as allowed."""
+
+
+class Subscription:
+    """A subscriber's queue of delivered messages.
+
+    Messages are only put on the queue by the feed, once their time has
+    come, so a subscriber waiting on an empty queue costs no timer.
+    """
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[Message] = asyncio.Queue()
+        self.closed = False
+        self.pending = 0
+
+    async def get(self) -> Message:
+        """Wait for the next message.
+
+        Returns
+        -------
+        Message
+            The event name and data.
+        """
+        return await self.queue.get()
+
+
+class TransitionFeed:
+    """Shared schedule of the messages due to all subscribers.
+
+    Every pending message sits in a single heap ordered by due time, and a
+    single loop timer is armed for the earliest one. When it fires, all of
+    the messages due are delivered and the timer is armed again, so the
+    cost of an idle subscriber is its heap entries. Another timer delivers
+    a keep-alive to every subscriber on each heartbeat. Messages of closed
+    subscriptions are dropped when due, or all at once when they make up
+    most of the heap.
+
+    The feed attaches to the running event loop on first use.
+
+    Parameters
+    ----------
+    max_subscribers : int
+        The number of subscriptions allowed at once.
+    heartbeat : float
+        The seconds between keep-alives.
+    clock : Callable
+        Returns the current UNIX timestamp.
+    """
+
+    def __init__(
+        self,
+        max_subscribers: int = 10000,
+        heartbeat: float = 15.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.clock = clock
+        self.delivered = 0
+        self._subscriptions: set[Subscription] = set()
+        self._heap: list[tuple[float, int, Subscription, Message]] = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_due = 0.0
+        self._heartbeat_timer: asyncio.TimerHandle | None = None
+
+    def __len__(self) -> int:
+        """Return the number of subscriptions."""
+        return len(self._subscriptions)
+
+    def full(self) -> bool:
+        """Check whether the feed has as many subscribers as allowed.
+
+        Returns
+        -------
+        bool
+            True if a new subscription would be refused.
+        """
+        return len(self._subscriptions) >= self.max_subscribers
+
+    def subscribe(self) -> Subscription:
+        """Open a subscription.
+
+        Returns
+        -------
+        Subscription
+            The new subscription.
+
+        Raises
+        ------
+        FeedFull
+            Raised if the feed has as many subscribers as allowed.
+        """
+        if self.full():
+            raise FeedFull()
+        self._attach()
+        subscription = Subscription()
+        self._subscriptions.add(subscription)
+        if self._heartbeat_timer is None and self._loop is not None:
+            self._heartbeat_timer = self._loop.call_later(self.heartbeat, self._beat)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a subscription, dropping its pending messages.
+
+        Parameters
+        ----------
+        subscription : Subscription
+            The subscription to close.
+        """
+        if subscription.closed:
+            return
+        subscription.closed = True
+        self._subscriptions.discard(subscription)
+        self._cancelled += subscription.pending
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].closed]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        if not self._subscriptions:
+            self.close()
+
+    def schedule(self, subscription: Subscription, due: float, message: Message) -> None:
+        """Deliver a message to a subscription at a given time.
+
+        Parameters
+        ----------
+        subscription : Subscription
+            The subscription receiving the message.
+        due : float
+            The UNIX timestamp to deliver the message at.
+        message : Message
+            The event name and data.
+        """
+        if subscription.closed:
+            return
+        self._attach()
+        heapq.heappush(self._heap, (due, next(self._counter), subscription, message))
+        subscription.pending += 1
+        if self._timer is None or due < self._timer_due:
+            self._arm()
+
+    def close(self) -> None:
+        """Stop the timers and drop all pending messages."""
+        for timer in (self._timer, self._heartbeat_timer):
+            if timer is not None:
+                timer.cancel()
+        self._timer = self._heartbeat_timer = None
+        self._heap.clear()
+        self._cancelled = 0
+        self._loop = None
+
+    def status(self) -> FeedStatus:
+        """Report the feed usage.
+
+        Returns
+        -------
+        FeedStatus
+            The current feed usage.
+        """
+        return FeedStatus(
+            subscribers=len(self._subscriptions),
+            max_subscribers=self.max_subscribers,
+            scheduled=len(self._heap) - self._cancelled,
+            delivered=self.delivered,
+        )
+
+    def _attach(self) -> None:
+        """Attach to the running event loop, moving over from another."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        for timer in (self._timer, self._heartbeat_timer):
+            if timer is not None:
+                timer.cancel()
+        self._timer = self._heartbeat_timer = None
+        self._loop = loop
+        if self._heap:
+            self._arm()
+
+    def _arm(self) -> None:
+        """Arm the timer for the earliest pending message."""
+        assert self._loop is not None
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_due = self._heap[0][0]
+        self._timer = self._loop.call_later(max(self._timer_due - self.clock(), 0.0), self._fire)
+
+    def _fire(self) -> None:
+        """Deliver the messages that are due."""
+        self._timer = None
+        now = self.clock()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, subscription, message = heapq.heappop(self._heap)
+            subscription.pending -= 1
+            if subscription.closed:
+                self._cancelled -= 1
+                continue
+            subscription.queue.put_nowait(message)
+            self.delivered += 1
+        if self._heap:
+            self._arm()
+
+    def _beat(self) -> None:
+        """Deliver a keep-alive to every subscriber."""
+        assert self._loop is not None
+        for subscription in self._subscriptions:
+            subscription.queue.put_nowait(KEEP_ALIVE)
+        self._heartbeat_timer = self._loop.call_later(self.heartbeat, self._beat)
+
+
+def sse_event(event: str | None, data: Any = None) -> str:
+    """Format a server-sent event.
+
+    Parameters
+    ----------
+    event : str or None
+        The event name, None for a keep-alive comment.
+    data : Any
+        The event data, serialized as JSON.
+
+    Returns
+    -------
+    str
+        The event in the ``text/event-stream`` format.
+    """
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
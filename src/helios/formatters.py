@@ -44,6 +44,22 @@ def day_length_format(length: timedelta) -> str:
     return f"{hours} hours, {minutes} minutes and {seconds} seconds"
 
 
+def key_format(name: str) -> str:
+    """Format sky transition name to a lower case key.
+
+    Parameters
+    ----------
+    name : str
+        The sky transition name, e.g. Astronomical Dawn.
+
+    Returns
+    -------
+    str
+        The formatted key, e.g. astronomical_dawn.
+    """
+    return name.replace(" ", "_").lower()
+
+
 def time_format(time: datetime) -> str:
     """Format time to Hours(24):Minutes(zero padded).
 
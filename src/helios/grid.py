@@ -0,0 +1,448 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for the precomputed sky transitions grid."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime
+import json
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from .engines import EngineName, SolarEngine, Transitions
+
+__all__ = ["GridEngine", "GridMetadata", "TransitionGrid"]
+
+TROPICAL_YEAR = 365.24219
+"""Length of the tropical year in days."""
+
+J2000 = 946727935.816
+"""UNIX timestamp of the J2000.0 epoch (2000-01-01T12:00:00 TT)."""
+
+REFERENCE_START = datetime(2024, 1, 1, tzinfo=UTC).timestamp()
+"""UNIX timestamp of the UTC midnight starting the year the grid is built
+for."""
+
+GRID_VALUES = (1, 2, 3, 4, 3, 2, 1, 0)
+"""Dark/twilight/day value after each of the eight transitions."""
+
+MIDNIGHT_MARGIN = 3600.0
+"""Transitions closer than this (seconds) to local mean midnight are not
+stored, since neighbouring nodes can place them on different days."""
+
+METADATA_FILE = "metadata.json"
+"""Name of the grid metadata file."""
+
+OFFSETS_FILE = "offsets.npy"
+"""Name of the grid offsets file."""
+
+
+@dataclass
+class GridMetadata:
+    """Description of the grid axes.
+
+    Latitude and longitude nodes run from the minimum to the maximum in
+    steps. The day axis holds one node per local mean noon of the reference
+    year.
+    """
+
+    min_latitude: float
+    max_latitude: float
+    latitude_step: float
+    min_longitude: float
+    max_longitude: float
+    longitude_step: float
+    num_days: int
+    engine: str
+
+    @property
+    def latitudes(self) -> npt.NDArray[np.float64]:
+        """The latitude nodes in degrees."""
+        return _axis(self.min_latitude, self.max_latitude, self.latitude_step)
+
+    @property
+    def longitudes(self) -> npt.NDArray[np.float64]:
+        """The longitude nodes in degrees."""
+        return _axis(self.min_longitude, self.max_longitude, self.longitude_step)
+
+
+class TransitionGrid:
+    """Precomputed grid of sky transition times.
+
+    The grid holds the eight transitions of each mean solar day as float32
+    offsets in seconds from local mean noon, over latitude, longitude and
+    day of the tropical year. Transitions that do not happen are NaN. The
+    offsets are memory mapped, so worker processes share the pages.
+
+    Times come from trilinear interpolation. Nodes where the curvature along
+    latitude would make the interpolation worse than the build tolerance are
+    dropped, so lookups stay within about 10 seconds of the engine the grid
+    was built with for the default 1 degree latitude step and tolerance.
+
+    Parameters
+    ----------
+    metadata : GridMetadata
+        The description of the grid axes.
+    offsets : numpy.ndarray
+        The offsets with shape (latitude, longitude, day, transition).
+    """
+
+    def __init__(self, metadata: GridMetadata, offsets: npt.NDArray[np.float32]) -> None:
+        self.metadata = metadata
+        self.offsets = offsets
+        self.latitudes = metadata.latitudes
+        self.longitudes = metadata.longitudes
+
+    @classmethod
+    def load(cls, path: Path) -> TransitionGrid:
+        """Load a grid, memory mapping the offsets.
+
+        Parameters
+        ----------
+        path : Path
+            The directory holding the grid.
+
+        Returns
+        -------
+        TransitionGrid
+            The loaded grid.
+        """
+        metadata = GridMetadata(**json.loads((path / METADATA_FILE).read_text()))
+        offsets = np.load(path / OFFSETS_FILE, mmap_mode="r")
+        return cls(metadata, offsets)
+
+    @classmethod
+    def build(
+        cls,
+        engine: SolarEngine,
+        min_latitude: float = -60.0,
+        max_latitude: float = 60.0,
+        latitude_step: float = 1.0,
+        min_longitude: float = -180.0,
+        max_longitude: float = 180.0,
+        longitude_step: float = 30.0,
+        tolerance: float = 10.0,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> TransitionGrid:
+        """Build a grid by searching every node with an engine.
+
+        Parameters
+        ----------
+        engine : SolarEngine
+            The engine searching for the transitions.
+        min_latitude : float
+            The southern edge of the grid in degrees.
+        max_latitude : float
+            The northern edge of the grid in degrees.
+        latitude_step : float
+            The distance between latitude nodes in degrees.
+        min_longitude : float
+            The western edge of the grid in degrees.
+        max_longitude : float
+            The eastern edge of the grid in degrees.
+        longitude_step : float
+            The distance between longitude nodes in degrees.
+        tolerance : float
+            The largest interpolation error (seconds) estimated from the
+            curvature along latitude that a node is kept with.
+        progress : Callable, optional
+            Called with the number of days done and the total after each day.
+
+        Returns
+        -------
+        TransitionGrid
+            The grid held in memory.
+        """
+        metadata = GridMetadata(
+            min_latitude=min_latitude,
+            max_latitude=max_latitude,
+            latitude_step=latitude_step,
+            min_longitude=min_longitude,
+            max_longitude=max_longitude,
+            longitude_step=longitude_step,
+            num_days=int(np.ceil(TROPICAL_YEAR)),
+            engine=engine.name.value,
+        )
+        latitudes, longitudes = np.meshgrid(metadata.latitudes, metadata.longitudes, indexing="ij")
+        offsets = np.full((*latitudes.shape, metadata.num_days, len(GRID_VALUES)), np.nan, dtype=np.float32)
+        nodes = offsets.reshape(-1, metadata.num_days, len(GRID_VALUES))
+        for day in range(metadata.num_days):
+            noons = REFERENCE_START + day * 86400.0 + 43200.0 - longitudes.ravel() * 240.0
+            starts = [datetime.fromtimestamp(noon - 43200.0, UTC) for noon in noons]
+            ends = [datetime.fromtimestamp(noon + 43200.0, UTC) for noon in noons]
+            found = engine.search(latitudes.ravel().tolist(), longitudes.ravel().tolist(), starts, ends)
+            for node, (noon, transitions) in enumerate(zip(noons, found, strict=True)):
+                for slot, t in _slots(transitions):
+                    offset = t.timestamp() - noon
+                    if abs(offset) < 43200.0 - MIDNIGHT_MARGIN:
+                        nodes[node, day, slot] = offset
+            if progress is not None:
+                progress(day + 1, metadata.num_days)
+        _drop_curved(offsets, tolerance)
+        return cls(metadata, offsets)
+
+    def save(self, path: Path) -> None:
+        """Write the grid to a directory.
+
+        Parameters
+        ----------
+        path : Path
+            The directory to hold the grid. It is created if needed.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / OFFSETS_FILE, np.asarray(self.offsets, dtype=np.float32))
+        (path / METADATA_FILE).write_text(json.dumps(asdict(self.metadata)))
+
+    def covers(self, latitude: float, longitude: float) -> bool:
+        """Check that a location is inside the grid.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+
+        Returns
+        -------
+        bool
+            True if the location is inside the grid.
+        """
+        return bool(
+            self.latitudes[0] <= latitude <= self.latitudes[-1]
+            and self.longitudes[0] <= longitude <= self.longitudes[-1]
+        )
+
+    def interpolate(
+        self, latitude: float, longitude: float, noons: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        """Interpolate the transitions of mean solar days.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location, inside the grid.
+        longitude : float
+            The longitude (decimal degrees) of the location, inside the grid.
+        noons : numpy.ndarray
+            The UNIX timestamps of the local mean noons of the days.
+
+        Returns
+        -------
+        numpy.ndarray
+            The offsets (seconds) of the eight transitions from each noon,
+            shape (day, transition). NaN if a transition does not happen at
+            any of the surrounding nodes.
+        """
+        lat_index, lat_weight = _locate(self.latitudes, latitude)
+        lon_index, lon_weight = _locate(self.longitudes, longitude)
+        phase = np.mod((noons - J2000) / 86400.0, TROPICAL_YEAR)
+        result = np.zeros((len(noons), len(GRID_VALUES)))
+        for i, wi in ((lat_index, 1.0 - lat_weight), (lat_index + 1, lat_weight)):
+            for j, wj in ((lon_index, 1.0 - lon_weight), (lon_index + 1, lon_weight)):
+                if wi == 0.0 or wj == 0.0:
+                    continue
+                # The day axis of each longitude node starts at that node's
+                # first mean noon of the reference year.
+                first_noon = REFERENCE_START + 43200.0 - self.longitudes[j] * 240.0
+                day = np.mod(phase - (first_noon - J2000) / 86400.0, TROPICAL_YEAR)
+                day_index = np.floor(day).astype(int)
+                day_weight = (day - day_index)[:, np.newaxis]
+                # The last node is followed by the first one, a fraction of
+                # a day later.
+                span = np.where(day_index >= self.metadata.num_days - 1, TROPICAL_YEAR - day_index, 1.0)
+                day_weight = day_weight / span[:, np.newaxis]
+                lower = self.offsets[i, j, day_index % self.metadata.num_days]
+                upper = self.offsets[i, j, (day_index + 1) % self.metadata.num_days]
+                result += wi * wj * ((1.0 - day_weight) * lower + day_weight * upper)
+        return result
+
+
+class GridEngine(SolarEngine):
+    """Search for sky transitions by interpolating in a precomputed grid.
+
+    Windows that the grid cannot answer reliably are searched by a fallback
+    engine: locations outside the grid (including the polar regions), days
+    missing a transition at any of the surrounding nodes and transitions
+    close to the window edges, where a small error could move them into the
+    neighbouring day.
+
+    Parameters
+    ----------
+    grid : TransitionGrid
+        The precomputed grid.
+    fallback : SolarEngine
+        The engine searching the windows the grid cannot answer.
+    margin : float
+        The closest (seconds) an interpolated transition can come to a
+        window edge.
+    """
+
+    name = EngineName.grid
+    version = "1"
+
+    def __init__(self, grid: TransitionGrid, fallback: SolarEngine, margin: float = 600.0) -> None:
+        self.grid = grid
+        self.fallback = fallback
+        self.margin = margin
+        self.lookups = 0
+        self.fallbacks = 0
+
+    def coverage(self) -> tuple[date, date] | None:
+        """Find the UTC dates the fallback engine can search.
+
+        Returns
+        -------
+        tuple or None
+            The dates covered by the fallback engine, None if it is not
+            limited.
+        """
+        return self.fallback.coverage()
+
+    def search(
+        self,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        starts: Sequence[datetime],
+        ends: Sequence[datetime],
+    ) -> list[Transitions]:
+        """Search for the changes of the dark/twilight/day function.
+
+        Parameters
+        ----------
+        latitudes : Sequence
+            The latitude (decimal degrees) of each location.
+        longitudes : Sequence
+            The longitude (decimal degrees) of each location.
+        starts : Sequence
+            The aware date/time starting each search window.
+        ends : Sequence
+            The aware date/time ending each search window.
+
+        Returns
+        -------
+        list
+            The transitions found in each search window.
+        """
+        results: list[Transitions | None] = []
+        for latitude, longitude, start, end in zip(latitudes, longitudes, starts, ends, strict=True):
+            results.append(self._lookup(latitude, longitude, start.timestamp(), end.timestamp()))
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        self.lookups += len(results) - len(missing)
+        self.fallbacks += len(missing)
+        if missing:
+            found = self.fallback.search(
+                [latitudes[index] for index in missing],
+                [longitudes[index] for index in missing],
+                [starts[index] for index in missing],
+                [ends[index] for index in missing],
+            )
+            for index, transitions in zip(missing, found, strict=True):
+                results[index] = transitions
+        return [result for result in results if result is not None]
+
+    def _lookup(self, latitude: float, longitude: float, start: float, end: float) -> Transitions | None:
+        """Interpolate the transitions of a window.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        start : float
+            The UNIX timestamp starting the window.
+        end : float
+            The UNIX timestamp ending the window.
+
+        Returns
+        -------
+        Transitions or None
+            The transitions in the window, None if the grid cannot answer.
+        """
+        if not self.grid.covers(latitude, longitude):
+            return None
+        mean_noon = 43200.0 - longitude * 240.0
+        first = np.floor((start - mean_noon) / 86400.0) - 1
+        last = np.ceil((end - mean_noon) / 86400.0) + 1
+        noons = mean_noon + np.arange(first, last + 1) * 86400.0
+        offsets = self.grid.interpolate(latitude, longitude, noons)
+        if np.isnan(offsets).any():
+            return None
+        times = (noons[:, np.newaxis] + offsets).ravel()
+        if (np.abs(times - start) < self.margin).any() or (np.abs(times - end) < self.margin).any():
+            return None
+        values = np.tile(GRID_VALUES, len(noons))
+        inside = (times >= start) & (times < end)
+        previous_e = int(values[np.flatnonzero(times < start)[-1]])
+        return (
+            previous_e,
+            [datetime.fromtimestamp(t, UTC) for t in times[inside].tolist()],
+            values[inside].tolist(),
+        )
+
+
+def _axis(minimum: float, maximum: float, step: float) -> npt.NDArray[np.float64]:
+    """Build the nodes of a grid axis."""
+    nodes = minimum + step * np.arange(int(round((maximum - minimum) / step)) + 1, dtype=np.float64)
+    return np.asarray(nodes, dtype=np.float64)
+
+
+def _locate(nodes: npt.NDArray[np.float64], value: float) -> tuple[int, float]:
+    """Find the node below a value and the weight of the node above it."""
+    index = int(np.clip(np.searchsorted(nodes, value, side="right") - 1, 0, len(nodes) - 2))
+    weight = float((value - nodes[index]) / (nodes[index + 1] - nodes[index]))
+    return index, weight
+
+
+def _drop_curved(offsets: npt.NDArray[np.float32], tolerance: float) -> None:
+    """Remove the nodes where linear interpolation along latitude is poor.
+
+    Halfway between nodes, linear interpolation is off by about an eighth of
+    the second difference. Nodes beyond the tolerance, or next to a missing
+    node where transitions change fastest, are set to NaN so lookups around
+    them fall back.
+
+    Parameters
+    ----------
+    offsets : numpy.ndarray
+        The grid offsets, updated in place.
+    tolerance : float
+        The largest interpolation error (seconds) kept.
+    """
+    curvature = np.full(offsets.shape, np.inf, dtype=np.float32)
+    curvature[1:-1] = np.abs(offsets[:-2] - 2.0 * offsets[1:-1] + offsets[2:]) / 8.0
+    curvature[0] = curvature[1]
+    curvature[-1] = curvature[-2]
+    with np.errstate(invalid="ignore"):
+        offsets[~(curvature <= tolerance)] = np.nan
+
+
+def _slots(transitions: Transitions) -> list[tuple[int, datetime]]:
+    """Assign a mean solar day's transitions to the grid's transition slots.
+
+    Parameters
+    ----------
+    transitions : Transitions
+        The transitions found for a local mean midnight to midnight window.
+
+    Returns
+    -------
+    list
+        The slot (astronomical dawn is 0, astronomical dusk is 7) and time of
+        each transition.
+    """
+    previous_e, times, events = transitions
+    slots = []
+    for t, e in zip(times, events, strict=True):
+        slot = e - 1 if e > previous_e else len(GRID_VALUES) - 1 - e
+        slots.append((slot, t))
+        previous_e = e
+    return slots
@@ -12,13 +12,16 @@ import random
 __all__ = ["get_time_variation"]
 
 
-def get_time_variation(span: str) -> timedelta:
+def get_time_variation(span: str, rng: random.Random | None = None) -> timedelta:
     """Get a random chuck of time to add to a time.
 
     Parameters
     ----------
     span : str
         The format in HH:MM:SS for the time range.
+    rng : random.Random, optional
+        The random number generator to draw from, the module's shared one if
+        not given. A seeded generator makes the variation reproducible.
 
     Returns
     -------
@@ -27,5 +30,6 @@ def get_time_variation(span: str) -> timedelta:
     """
     span_time = datetime.strptime(span, "%H:%M:%S").time()
     time_range = timedelta(seconds=span_time.second, minutes=span_time.minute, hours=span_time.hour)
-    value = random.randrange(-time_range.seconds, time_range.seconds)
+    randrange = random.randrange if rng is None else rng.randrange
+    value = randrange(-time_range.seconds, time_range.seconds)
     return timedelta(seconds=value)
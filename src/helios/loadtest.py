@@ -0,0 +1,346 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for load testing the application on a local server."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import http.client
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+from .models import Site
+
+__all__ = ["LoadTest", "build_requests", "generate_sites", "local_server", "run_load"]
+
+ROUTE_MIX = {"sky_transitions": 0.6, "day_information": 0.25, "timer_information": 0.15}
+"""Default share of each route in the replayed requests."""
+
+START_TIMESTAMP = datetime(2025, 1, 1, tzinfo=UTC).timestamp()
+"""UNIX timestamp starting the year the request dates are drawn from."""
+
+PERCENTILES = (50, 95, 99)
+"""Latency percentiles reported."""
+
+APPLICATION = "helios.main:app"
+"""The application served by the local server."""
+
+Request = tuple[str, str]
+"""Route name and path with query of a replayed request."""
+
+
+@dataclass(frozen=True)
+class LoadTest:
+    """Settings of a load test run."""
+
+    concurrency: int = 16
+    """The number of requests in flight at once."""
+    requests: int = 2000
+    """The number of requests measured."""
+    warmup: int = 100
+    """The number of requests sent before measuring."""
+    sites: int = 500
+    """The number of generated sites the requests are spread over."""
+    seed: int = 0
+    """Seed making the sites and requests reproducible."""
+    mix: Mapping[str, float] = field(default_factory=lambda: dict(ROUTE_MIX))
+    """Share of each route in the requests."""
+    timeout: float = 30.0
+    """Seconds a single request may take."""
+
+
+def generate_sites(count: int, seed: int = 0) -> list[Site]:
+    """Generate sites spread over the inhabited latitudes.
+
+    Each site's timezone is the whole-hour ``Etc`` zone nearest its
+    longitude, so local dates and times are realistic without a timezone
+    database lookup.
+
+    Parameters
+    ----------
+    count : int
+        The number of sites.
+    seed : int
+        Seed making the sites reproducible.
+
+    Returns
+    -------
+    list
+        The sites.
+    """
+    rng = random.Random(seed)
+    sites = []
+    for _ in range(count):
+        latitude = round(rng.uniform(-60.0, 60.0), 4)
+        longitude = round(rng.uniform(-180.0, 180.0), 4)
+        # Etc zones count hours West of UTC as positive.
+        offset = -round(longitude / 15.0)
+        tz = f"Etc/GMT{offset:+d}" if offset else "Etc/GMT"
+        sites.append(Site(lat=latitude, lon=longitude, tz=tz))
+    return sites
+
+
+def build_requests(
+    sites: Sequence[Site], count: int, mix: Mapping[str, float] = ROUTE_MIX, seed: int = 0
+) -> list[Request]:
+    """Draw a reproducible mix of requests.
+
+    Each request picks a route by its share of the mix, then a site and a
+    time during a year.
+
+    Parameters
+    ----------
+    sites : Sequence
+        The sites the requests are spread over.
+    count : int
+        The number of requests.
+    mix : Mapping
+        The share of each route.
+    seed : int
+        Seed making the requests reproducible.
+
+    Returns
+    -------
+    list
+        The route name and path of each request.
+
+    Raises
+    ------
+    ValueError
+        Raised if the mix names an unknown route.
+    """
+    unknown = set(mix) - set(ROUTE_MIX)
+    if unknown:
+        raise ValueError(f"Unknown routes in the mix: {', '.join(sorted(unknown))}")
+    rng = random.Random(seed)
+    routes = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    requests = []
+    for route in routes:
+        site = rng.choice(sites)
+        query: dict[str, Any] = {
+            "cdatetime": round(START_TIMESTAMP + rng.uniform(0.0, 365.0 * 86400.0), 3),
+            "tz": site.tz,
+            "lat": site.lat,
+            "lon": site.lon,
+        }
+        if route == "timer_information":
+            query.update(checktime="15:00:00", offtime="23:00:00", onrange="00:15:00", offrange="00:15:00")
+        requests.append((route, f"/{route}?{urlencode(query)}"))
+    return requests
+
+
+def run_load(base_url: str, requests: Sequence[Request], settings: LoadTest) -> dict[str, Any]:
+    """Replay requests against a server and measure them.
+
+    Each of ``settings.concurrency`` threads holds a keep-alive connection
+    and sends the next request as soon as its previous one completes. The
+    first ``settings.warmup`` requests are sent but not measured.
+
+    Parameters
+    ----------
+    base_url : str
+        The URL of the server, e.g. ``http://127.0.0.1:8000``.
+    requests : Sequence
+        The route name and path of each request, warmup ones first.
+    settings : LoadTest
+        The settings of the run.
+
+    Returns
+    -------
+    dict
+        The report of throughput, latency percentiles (milliseconds) and
+        error rate, overall and by route.
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname or "127.0.0.1", url.port or 80
+    warmup, measured = requests[: settings.warmup], requests[settings.warmup :]
+
+    def replay(batch: Sequence[Request]) -> tuple[list[tuple[str, int, float]], float]:
+        queue = iter(batch)
+        lock = threading.Lock()
+        results: list[tuple[str, int, float]] = []
+
+        def work() -> None:
+            connection = http.client.HTTPConnection(host, port, timeout=settings.timeout)
+            try:
+                while True:
+                    with lock:
+                        request = next(queue, None)
+                    if request is None:
+                        return
+                    results.append((request[0], *_send(connection, request[1])))
+            finally:
+                connection.close()
+
+        begin = time.perf_counter()
+        with ThreadPoolExecutor(settings.concurrency) as pool:
+            for future in [pool.submit(work) for _ in range(settings.concurrency)]:
+                future.result()
+        return results, time.perf_counter() - begin
+
+    replay(warmup)
+    results, elapsed = replay(measured)
+    report: dict[str, Any] = {
+        "concurrency": settings.concurrency,
+        "duration": elapsed,
+        "throughput": len(results) / elapsed if elapsed else 0.0,
+        **_summarize(results),
+        "routes": {
+            route: _summarize([result for result in results if result[0] == route])
+            for route in sorted({result[0] for result in results})
+        },
+    }
+    return report
+
+
+@contextmanager
+def local_server(workers: int = 1, environment: Mapping[str, str] | None = None) -> Iterator[str]:
+    """Serve the application with uvicorn on a free localhost port.
+
+    Parameters
+    ----------
+    workers : int
+        The number of uvicorn worker processes.
+    environment : Mapping, optional
+        Extra environment variables of the server, e.g. ``HELIOS_`` settings.
+
+    Yields
+    ------
+    str
+        The URL of the server once it answers.
+
+    Raises
+    ------
+    RuntimeError
+        Raised if the server does not start.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    command = [sys.executable, "-m", "uvicorn", APPLICATION, "--host", "127.0.0.1", "--port", str(port)]
+    command += ["--workers", str(workers), "--no-access-log", "--log-level", "warning"]
+    server = subprocess.Popen(command, env={**os.environ, **(environment or {})})
+    try:
+        _wait_for_server("127.0.0.1", port, server)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        try:
+            server.wait(10.0)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def _send(connection: http.client.HTTPConnection, path: str) -> tuple[int, float]:
+    """Send a GET request on a keep-alive connection.
+
+    Parameters
+    ----------
+    connection : http.client.HTTPConnection
+        The connection, reopened if the server closed it.
+    path : str
+        The path with query.
+
+    Returns
+    -------
+    tuple
+        The status code, zero if the request failed, and the latency in
+        seconds.
+    """
+    begin = time.perf_counter()
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        response.read()
+        status = response.status
+    except (OSError, http.client.HTTPException):
+        connection.close()
+        status = 0
+    return status, time.perf_counter() - begin
+
+
+def _summarize(results: Sequence[tuple[str, int, float]]) -> dict[str, Any]:
+    """Summarize measured requests.
+
+    Parameters
+    ----------
+    results : Sequence
+        The route, status code and latency (seconds) of each request.
+
+    Returns
+    -------
+    dict
+        The request and error counts, error rate and latency statistics in
+        milliseconds.
+    """
+    errors = sum(1 for _, status, _ in results if not 200 <= status < 400)
+    latency = np.array([seconds for _, _, seconds in results]) * 1000.0
+    summary: dict[str, Any] = {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+    }
+    if len(latency):
+        summary["latency_ms"] = {
+            **{
+                f"p{p}": float(value)
+                for p, value in zip(PERCENTILES, np.percentile(latency, PERCENTILES), strict=True)
+            },
+            "mean": float(latency.mean()),
+            "max": float(latency.max()),
+        }
+    return summary
+
+
+def _wait_for_server(host: str, port: int, server: subprocess.Popen[bytes], timeout: float = 60.0) -> None:
+    """Wait until a server answers its status route.
+
+    Parameters
+    ----------
+    host : str
+        The server host.
+    port : int
+        The server port.
+    server : subprocess.Popen
+        The server process.
+    timeout : float
+        Seconds allowed for the server to start.
+
+    Raises
+    ------
+    RuntimeError
+        Raised if the server exits or does not answer in time.
+    """
+    deadline = time.monotonic() + timeout
+    for delay in itertools.chain([0.1] * 20, itertools.repeat(0.5)):
+        if server.poll() is not None:
+            raise RuntimeError(f"The server exited with status {server.returncode}.")
+        connection = http.client.HTTPConnection(host, port, timeout=5.0)
+        try:
+            connection.request("GET", "/status")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            connection.close()
+        if time.monotonic() > deadline:
+            raise RuntimeError("The server did not start in time.")
+        time.sleep(delay)
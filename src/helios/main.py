@@ -6,37 +6,146 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
+from collections.abc import AsyncGenerator, AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, time, timedelta
+import functools
 from importlib.resources import files
+import json
 import math
-from typing import Any
+import random
+from typing import TYPE_CHECKING, Any
 import zoneinfo
 
-from fastapi import FastAPI, HTTPException, Query, Request, status
-from fastapi.openapi.utils import get_openapi
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 
 from . import __version__
-from .exceptions import BadTimezone
-from .formatters import date_format, day_length_format, time_format
+from .assets import Asset, StaticAssets, choose_encoding
+from .conditional import cache_headers, day_etag, next_midnight, none_match
+from .config import EngineName, config
+from .dependencies import calculator_dependency, executor_dependency
+from .exceptions import BadTimezone, DateOutOfRange, EngineUnavailable, ExecutorBusy
+from .executor import CalculationExecutor
+from .exporters import ExportFormat, export_lines, export_positions, export_records, sun_positions_model
+from .feed import FeedFull, Subscription, TransitionFeed, sse_event
+from .formatters import date_format, day_length_format, key_format, time_format
 from .helpers import get_time_variation
-from .models import TimerInformation
+from .metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from .models import (
+    ExportRequest,
+    ProfileSummary,
+    ServiceStatus,
+    SkyTransitionsDay,
+    SkyTransitionsRequest,
+    SunPositions,
+    TimerInformation,
+)
+from .pages import PageCache, RenderedPage, accepts_gzip
+from .profiling import ProfilingMiddleware, RequestProfiler
+from .raster import MEDIA_TYPE as RASTER_MEDIA_TYPE
+from .raster import RASTER_BANDS, raster_axis, to_npy
 from .solar_calculator import SolarCalculator
 
-__all__ = ["app"]
+if TYPE_CHECKING:
+    from fastapi.templating import Jinja2Templates
+    from starlette.types import Receive, Scope, Send
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory=str(files("helios.data").joinpath("static"))), name="static")
-templates = Jinja2Templates(directory=str(files("helios.data").joinpath("templates")))
+__all__ = ["app", "build_schema"]
 
 
-def set_schema() -> dict[str, Any]:
-    if app.openapi_schema:
-        return app.openapi_schema
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    get_assets()
+    calculator_dependency.initialize()
+    executor_dependency.initialize()
+    yield
+    feed.close()
+    executor_dependency.close()
+    calculator_dependency.close()
+
+
+metrics.enabled = config.metrics_enabled
+profiler = (
+    RequestProfiler(
+        config.profiling_directory,
+        config.profiling_sample_rate,
+        config.profiling_header,
+        config.profiling_max_files,
+    )
+    if config.profiling_directory is not None
+    else None
+)
+
+pages = (
+    PageCache(config.page_cache_size, config.page_cache_gzip, config.cache_precision)
+    if config.page_cache_size
+    else None
+)
+
+feed = TransitionFeed(config.feed_max_subscribers, config.feed_heartbeat)
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(ProfilingMiddleware, profiler=lambda: profiler)
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+"""Cache-Control of assets requested by their content-hashed path."""
+
+REVALIDATE = "public, no-cache"
+"""Cache-Control of assets requested by their plain path."""
+
+FAVICON_MAX_AGE = 86400
+"""Seconds the favicon may be cached without revalidating."""
+
+
+@functools.cache
+def get_assets() -> StaticAssets:
+    """Load the static files into memory on first use.
 
-    openapi_schema = get_openapi(
+    Returns
+    -------
+    StaticAssets
+        The static files.
+    """
+    return StaticAssets(files("helios.data").joinpath("static"))
+
+
+@functools.cache
+def get_templates() -> Jinja2Templates:
+    """Load the page templates on first use.
+
+    Jinja2 is only needed once a page is rendered, so it is kept out of the
+    application import.
+
+    Returns
+    -------
+    Jinja2Templates
+        The page templates.
+    """
+    from fastapi.templating import Jinja2Templates
+
+    templates = Jinja2Templates(directory=str(files("helios.data").joinpath("templates")))
+    templates.env.globals["static_path"] = get_assets().hashed_path
+    return templates
+
+
+def build_schema() -> dict[str, Any]:
+    """Build the OpenAPI schema of the application.
+
+    Returns
+    -------
+    dict
+        The OpenAPI schema.
+    """
+    from fastapi.openapi.utils import get_openapi
+
+    return get_openapi(
         title="Helios Web Service API",
         version=__version__,
         description=" ".join(
@@ -48,28 +157,108 @@ def set_schema() -> dict[str, Any]:
         ),
         routes=app.routes,
     )
-    app.openapi_schema = openapi_schema
+
+
+def set_schema() -> dict[str, Any]:
+    if app.openapi_schema:
+        return app.openapi_schema
+
+    openapi_schema = None
+    if config.openapi_path is not None and config.openapi_path.exists():
+        openapi_schema = json.loads(config.openapi_path.read_text())
+        # A schema written by another release may not match the routes.
+        if openapi_schema.get("info", {}).get("version") != __version__:
+            openapi_schema = None
+    app.openapi_schema = openapi_schema or build_schema()
     return app.openapi_schema
 
 
 app.openapi = set_schema  # type: ignore
 
 
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request: Request, exc: ExecutorBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many calculations waiting, try again later."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(DateOutOfRange)
+async def date_out_of_range_handler(request: Request, exc: DateOutOfRange) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": str(exc)},
+    )
+
+
+@app.exception_handler(EngineUnavailable)
+async def engine_unavailable_handler(request: Request, exc: EngineUnavailable) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": f"Engine not available: {exc}"},
+    )
+
+
 @app.get("/")
 async def root() -> dict[str, str]:
     return {"msg": "This is a web service, nothing to see here."}
 
 
-@app.get("/favicon.ico")
-async def favicon() -> FileResponse:
-    file_name = "helios.png"
-    file_path = str(files("helios.data.static").joinpath(file_name))
-    return FileResponse(
-        path=file_path,
-        headers={"Content-Disposition": f"attachment; filename={file_name}"},
+@app.get("/status")
+async def service_status(
+    calculator: SolarCalculator = Depends(calculator_dependency),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> ServiceStatus:
+    cache = calculator.cache.status() if calculator.cache is not None else None
+    store = calculator.store.status() if calculator.store is not None else None
+    page_cache = pages.status() if pages is not None else None
+    return ServiceStatus(
+        executor=executor.status(), cache=cache, store=store, pages=page_cache, feed=feed.status()
     )
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def service_metrics() -> PlainTextResponse:
+    if not metrics.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled.")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/profiles/summary")
+async def profiles_summary(
+    limit: int = Query(20, ge=1, le=500, title="limit", description="The number of functions reported."),
+) -> ProfileSummary:
+    if profiler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled.")
+    return profiler.summary(limit)
+
+
+@app.get("/favicon.ico")
+async def favicon(
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    found = get_assets().get("helios.png")
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return _asset_response(found[0], f"public, max-age={FAVICON_MAX_AGE}", accept_encoding, if_none_match)
+
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], name="static", include_in_schema=False)
+async def static(
+    path: str,
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    found = get_assets().get(path)
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    asset, hashed = found
+    return _asset_response(asset, IMMUTABLE if hashed else REVALIDATE, accept_encoding, if_none_match)
+
+
 @app.get("/sky_transitions")
 async def sky_transitions(
     cdatetime: float = Query(
@@ -90,19 +279,219 @@ async def sky_transitions(
         title="longitude",
         description="The location's longtude coordinate. East is positive. West is negative.",
     ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    if_none_match: str | None = Header(None),
+    calculator: SolarCalculator = Depends(calculator_dependency),
+    executor: CalculationExecutor = Depends(executor_dependency),
 ) -> Any:
-    h = SolarCalculator()
     try:
-        st = h.sky_transitions(lat, lon, cdatetime, tz)
+        local_date = SolarCalculator.local_date(cdatetime, tz)
+        engine_version = calculator.engine_version(engine)
+        etag = day_etag(lat, lon, local_date, tz, engine_version, _key_precision(calculator))
+        headers = cache_headers(etag, tz)
+        if none_match(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        st = await executor.sky_transitions(lat, lon, cdatetime, tz, engine)
     except BadTimezone:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"Bad time zone given: {tz}",
         ) from None
-    output = {k.replace(" ", "_").lower(): v.timestamp() for k, v in st.items()}
+    output = {key_format(k): v.timestamp() for k, v in st.items()}
+    return JSONResponse(output, headers=headers)
+
+
+@app.post("/sky_transitions/batch")
+async def sky_transitions_batch(
+    requests: list[SkyTransitionsRequest],
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> list[dict[str, float | str]]:
+    if len(requests) > config.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Too many batch items given: {len(requests)} > {config.batch_max_items}",
+        )
+    results = await executor.run(
+        "sky_transitions_batch",
+        [(request.lat, request.lon, request.cdatetime, request.tz) for request in requests],
+        engine,
+    )
+    output: list[dict[str, float | str]] = []
+    for request, st in zip(requests, results, strict=True):
+        if isinstance(st, BadTimezone):
+            output.append({"detail": f"Bad time zone given: {request.tz}"})
+        elif isinstance(st, DateOutOfRange):
+            output.append({"detail": str(st)})
+        else:
+            output.append({key_format(k): v.timestamp() for k, v in st.items()})
     return output
 
 
+@app.get("/sky_transitions/range")
+async def sky_transitions_range(
+    start: date = Query(
+        title="start_date",
+        description="The first local date of the range in YYYY-MM-DD.",
+    ),
+    end: date = Query(
+        title="end_date",
+        description="The last local date of the range in YYYY-MM-DD, included in the results.",
+    ),
+    tz: str = Query(
+        title="timezone",
+        description="The time zone associated with the location.",
+    ),
+    lat: float = Query(
+        le=math.fabs(90.0),
+        title="latitude",
+        description="The location's latitude coordinate. North is positive. South is negative",
+    ),
+    lon: float = Query(
+        le=math.fabs(180.0),
+        title="longitude",
+        description="The location's longtude coordinate. East is positive. West is negative.",
+    ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> list[SkyTransitionsDay]:
+    num_days = (end - start).days + 1
+    if not 0 < num_days <= config.range_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Date range must cover 1 to {config.range_max_days} days, not {num_days}",
+        )
+    try:
+        st_range = await executor.run("sky_transitions_range", lat, lon, start, end, tz, engine)
+    except BadTimezone:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Bad time zone given: {tz}",
+        ) from None
+    return [
+        SkyTransitionsDay(
+            date=day,
+            **{key_format(k): v.timestamp() if v is not None else None for k, v in st.items()},
+        )
+        for day, st in st_range.items()
+    ]
+
+
+@app.post("/sky_transitions/export", response_class=StreamingResponse)
+async def sky_transitions_export(
+    request: Request,
+    export: ExportRequest,
+    export_format: ExportFormat | None = Query(
+        None,
+        alias="format",
+        title="format",
+        description="The export format. Overrides the Accept header, which defaults to NDJSON.",
+    ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    calculator: SolarCalculator = Depends(calculator_dependency),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> StreamingResponse:
+    if export.end < export.start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Export end date is before the start date",
+        )
+    num_days = (export.end - export.start).days + 1
+    if num_days > config.range_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Export must cover 1 to {config.range_max_days} days, not {num_days}",
+        )
+    if len(export.sites) > config.export_max_sites:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Too many export sites given: {len(export.sites)} > {config.export_max_sites}",
+        )
+    coverage = calculator.date_coverage(engine)
+    if coverage is not None and not coverage[0] <= export.start <= export.end <= coverage[1]:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Export dates must be from {coverage[0].isoformat()} to {coverage[1].isoformat()}",
+        )
+    for site in export.sites:
+        try:
+            zoneinfo.ZoneInfo(site.tz)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Bad time zone given: {site.tz}",
+            ) from None
+    if export_format is None:
+        export_format = ExportFormat.from_accept(request.headers.get("accept", ""))
+    records = export_records(
+        executor, export.sites, export.start, export.end, config.export_chunk_days, engine
+    )
+    return StreamingResponse(export_lines(records, export_format), media_type=export_format.media_type)
+
+
+@app.get("/sky_transitions/events", response_class=StreamingResponse)
+async def sky_transitions_events(
+    tz: str = Query(
+        title="timezone",
+        description="The time zone of the location.",
+    ),
+    lat: float = Query(
+        le=math.fabs(90.0),
+        title="latitude",
+        description="The location's latitude coordinate. North is positive. South is negative",
+    ),
+    lon: float = Query(
+        le=math.fabs(180.0),
+        title="longitude",
+        description="The location's longtude coordinate. East is positive. West is negative.",
+    ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> StreamingResponse:
+    # A full feed is turned away before calculating, and again if it
+    # filled up during the calculation.
+    if feed.full():
+        raise _feed_full()
+    now = feed.clock()
+    try:
+        st = await executor.sky_transitions(lat, lon, now, tz, engine)
+    except BadTimezone:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Bad time zone given: {tz}",
+        ) from None
+    try:
+        subscription = feed.subscribe()
+    except FeedFull:
+        raise _feed_full() from None
+    return _FeedResponse(
+        subscription,
+        _feed_events(lat, lon, tz, engine, executor, subscription, now, st),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/day_information", response_class=HTMLResponse)
 async def day_information(
     request: Request,
@@ -120,26 +509,156 @@ async def day_information(
         title="longitude",
         description="The location's longtude coordinate. East is positive. West is negative.",
     ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    if_none_match: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+    calculator: SolarCalculator = Depends(calculator_dependency),
+    executor: CalculationExecutor = Depends(executor_dependency),
 ) -> Any:
-    h = SolarCalculator()
-    utctime = h.get_utc().timestamp()
-    localtime = h.get_localtime(tz, utctime)
+    utcnow = SolarCalculator.get_utc()
+    utctime = utcnow.timestamp()
+    compressed = pages is not None and pages.compress and accepts_gzip(accept_encoding)
     try:
-        st = h.sky_transitions(lat, lon, utctime, tz)
+        local_date = SolarCalculator.local_date(utctime, tz)
+        engine_version = calculator.engine_version(engine)
+        precision = pages.precision if pages is not None else _key_precision(calculator)
+        etag = day_etag(lat, lon, local_date, tz, engine_version, precision)
+        if compressed:
+            # Each content coding is a representation with its own tag.
+            etag = etag.removesuffix('"') + '-gzip"'
+        headers = cache_headers(etag, tz, utcnow)
+        if pages is not None:
+            headers["Vary"] = "Accept-Encoding"
+        if none_match(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        page_key = None
+        if pages is not None:
+            page_key = pages.key(str(request.base_url), lat, lon, local_date, tz, engine_version)
+            page = pages.get(page_key, utctime)
+            if page is not None:
+                return _page_response(page, compressed, headers)
+        st = await executor.sky_transitions(lat, lon, utctime, tz, engine)
     except BadTimezone:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"Bad time zone given: {tz}",
         ) from None
-    output = {k.replace(" ", "_").lower(): time_format(v) for k, v in st.items()}
-    day_length = st["Sunset"] - st["Sunrise"]
-    return templates.TemplateResponse(
-        request,
-        "day_information.html",
-        {
-            "date": date_format(localtime),
-            **output,
-            "day_length": day_length_format(day_length),
+    localtime = SolarCalculator.get_localtime(tz, utctime)
+    with metrics.stage("render"):
+        output = {key_format(k): time_format(v) for k, v in st.items()}
+        day_length = st["Sunset"] - st["Sunrise"]
+        response = get_templates().TemplateResponse(
+            request,
+            "day_information.html",
+            {
+                "date": date_format(localtime),
+                **output,
+                "day_length": day_length_format(day_length),
+            },
+            headers=headers,
+        )
+        if pages is None or page_key is None:
+            return response
+        page = pages.put(page_key, bytes(response.body), next_midnight(tz, utcnow).timestamp())
+        return _page_response(page, compressed, headers) if compressed else response
+
+
+@app.get("/sun_positions", response_model=SunPositions)
+async def sun_positions(
+    start: float = Query(title="start", description="The UNIX timestamp of the first sample."),
+    end: float = Query(
+        title="end", description="The UNIX timestamp ending the samples, included if on a step."
+    ),
+    lat: float = Query(
+        le=math.fabs(90.0),
+        title="latitude",
+        description="The location's latitude coordinate. North is positive. South is negative",
+    ),
+    lon: float = Query(
+        le=math.fabs(180.0),
+        title="longitude",
+        description="The location's longtude coordinate. East is positive. West is negative.",
+    ),
+    step: float = Query(60.0, gt=0.0, title="step", description="The time between samples in seconds."),
+    stream: bool = Query(
+        False,
+        title="stream",
+        description="Stream the samples as NDJSON, a line of columns per chunk of samples.",
+    ),
+    calculator: SolarCalculator = Depends(calculator_dependency),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> Any:
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Sun positions end is before the start",
+        )
+    count = math.floor((end - start) / step) + 1
+    if stream:
+        if end - start > config.range_max_days * 86400:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Streamed sun positions must cover at most {config.range_max_days} days",
+            )
+        if count > config.positions_stream_max_samples:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Too many sun positions asked for: {count} > {config.positions_stream_max_samples}",
+            )
+        # The stream cannot report an error once started.
+        calculator.check_positions(start, start + (count - 1) * step)
+        lines = export_positions(executor, lat, lon, start, count, step, config.positions_chunk_samples)
+        return StreamingResponse(lines, media_type=ExportFormat.ndjson.media_type)
+    if count > config.positions_max_samples:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Too many sun positions asked for: {count} > {config.positions_max_samples}",
+        )
+    altitude, azimuth = await executor.run("sun_positions", lat, lon, start, count, step)
+    return sun_positions_model(start, step, altitude, azimuth)
+
+
+@app.get("/raster", response_class=Response)
+async def raster(
+    day: date = Query(alias="date", title="date", description="The date of the raster in YYYY-MM-DD."),
+    resolution: float = Query(1.0, gt=0.0, title="resolution", description="The pixel size in degrees."),
+    min_lat: float = Query(
+        -90.0, ge=-90.0, le=90.0, title="min_latitude", description="The southern edge of the region."
+    ),
+    max_lat: float = Query(
+        90.0, ge=-90.0, le=90.0, title="max_latitude", description="The northern edge of the region."
+    ),
+    min_lon: float = Query(
+        -180.0, ge=-180.0, le=180.0, title="min_longitude", description="The western edge of the region."
+    ),
+    max_lon: float = Query(
+        180.0, ge=-180.0, le=180.0, title="max_longitude", description="The eastern edge of the region."
+    ),
+    engine: EngineName = Query(
+        EngineName.analytic,
+        title="engine",
+        description="The engine calculating the sky transitions.",
+    ),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> Response:
+    rows = len(raster_axis(min_lat, max_lat, resolution))
+    columns = len(raster_axis(min_lon, max_lon, resolution))
+    if not 0 < rows * columns <= config.raster_max_pixels:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Raster must have 1 to {config.raster_max_pixels} pixels, not {rows * columns}",
+        )
+    bands = await executor.run("day_raster", day, min_lat, max_lat, min_lon, max_lon, resolution, engine)
+    return Response(
+        to_npy(bands),
+        media_type=RASTER_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename=raster-{day.isoformat()}.npy",
+            "X-Helios-Raster-Bands": ",".join(RASTER_BANDS),
         },
     )
 
@@ -172,11 +691,89 @@ async def timer_information(
     offrange: str = Query(
         title="off_range", description="Half of time range to be added to the off time in HH:MM:SS"
     ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    executor: CalculationExecutor = Depends(executor_dependency),
 ) -> TimerInformation:
-    h = SolarCalculator()
-    localtime = h.get_localtime(tz, cdatetime)
+    localtime = SolarCalculator.get_localtime(tz, cdatetime)
+    try:
+        st = await executor.sky_transitions(lat, lon, cdatetime, tz, engine)
+    except BadTimezone:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Bad time zone given: {tz}",
+        ) from None
+
+    return _timer_entry(
+        localtime.date(),
+        st["Sunrise"],
+        st["Sunset"],
+        zoneinfo.ZoneInfo(tz),
+        checktime,
+        offtime,
+        get_time_variation(onrange),
+        get_time_variation(offrange),
+    )
+
+
+@app.get("/timer_schedule")
+async def timer_schedule(
+    cdatetime: float = Query(
+        title="current_datetime_timestamp",
+        description="The UNIX timestamp for the current date/time in UTC.",
+    ),
+    tz: str = Query(
+        title="timezone",
+        description="The time zone associated with the current date/time.",
+    ),
+    lat: float = Query(
+        le=math.fabs(90.0),
+        title="latitude",
+        description="The location's latitude coordinate. North is positive. South is negative",
+    ),
+    lon: float = Query(
+        le=math.fabs(180.0),
+        title="longitude",
+        description="The location's longtude coordinate. East is positive. West is negative.",
+    ),
+    checktime: str = Query(title="check_time", description="The local time for checking in HH:MM:SS"),
+    offtime: str = Query(title="off_time", description="The local time for the off time in HH:MM:SS"),
+    onrange: str = Query(
+        title="on_range", description="Half of time range to be added to the on time in HH:MM:SS"
+    ),
+    offrange: str = Query(
+        title="off_range", description="Half of time range to be added to the off time in HH:MM:SS"
+    ),
+    days: int = Query(
+        7,
+        ge=1,
+        title="days",
+        description="The number of days in the schedule, starting with the current local date.",
+    ),
+    seed: int | None = Query(
+        None,
+        title="seed",
+        description="Seed making the on and off time variations of each day reproducible.",
+    ),
+    engine: EngineName | None = Query(
+        None,
+        title="engine",
+        description="The engine calculating the sky transitions. Defaults to the deployment's engine.",
+    ),
+    executor: CalculationExecutor = Depends(executor_dependency),
+) -> list[TimerInformation]:
+    if days > config.range_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Schedule must cover 1 to {config.range_max_days} days, not {days}",
+        )
     try:
-        st = h.sky_transitions(lat, lon, cdatetime, tz)
+        start = SolarCalculator.local_date(cdatetime, tz)
+        end = start + timedelta(days=days - 1)
+        st_range = await executor.run("sky_transitions_range", lat, lon, start, end, tz, engine)
     except BadTimezone:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -184,27 +781,277 @@ async def timer_information(
         ) from None
 
     timezone = zoneinfo.ZoneInfo(tz)
-    next_day = localtime.date() + timedelta(days=1)
-    check_time = datetime.combine(next_day, datetime.strptime(checktime, "%H:%M:%S").time(), tzinfo=timezone)
-    off_time = datetime.combine(
-        localtime.date(), datetime.strptime(offtime, "%H:%M:%S").time(), tzinfo=timezone
+    schedule = []
+    for day, st in st_range.items():
+        sunrise, sunset = st["Sunrise"], st["Sunset"]
+        if sunrise is None or sunset is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"The sun does not rise and set on {day.isoformat()}",
+            )
+        # Seeding each day on its own keeps its variations the same in
+        # schedules starting on different days.
+        rng = random.Random(f"{seed}:{day.isoformat()}") if seed is not None else None
+        schedule.append(
+            _timer_entry(
+                day,
+                sunrise,
+                sunset,
+                timezone,
+                checktime,
+                offtime,
+                get_time_variation(onrange, rng),
+                get_time_variation(offrange, rng),
+            )
+        )
+    return schedule
+
+
+async def _feed_events(
+    latitude: float,
+    longitude: float,
+    location_timezone: str,
+    engine: EngineName | None,
+    executor: CalculationExecutor,
+    subscription: Subscription,
+    now: float,
+    st: Mapping[str, datetime],
+) -> AsyncGenerator[str, None]:
+    """Push a location's sky transitions to a subscriber as they happen.
+
+    Each local day starts with a ``schedule`` event listing its sky
+    transitions, followed by a ``transition`` event as each one arrives.
+    The transitions and the next local midnight, when the following day's
+    schedule is calculated, are delivered by the shared feed timer. The
+    subscription is closed once the stream ends.
+
+    Parameters
+    ----------
+    latitude : float
+        The latitude (decimal degrees) of the location.
+    longitude : float
+        The longitude (decimal degrees) of the location.
+    location_timezone : str
+        The timezone for the location.
+    engine : EngineName or None
+        The engine calculating the sky transitions.
+    executor : CalculationExecutor
+        The executor running the calculations.
+    subscription : Subscription
+        The subscription of the client.
+    now : float
+        The UNIX timestamp of the subscription.
+    st : Mapping
+        The sky transitions of the current local day.
+
+    Yields
+    ------
+    str
+        The server-sent events.
+    """
+    try:
+        while True:
+            midnight = next_midnight(location_timezone, datetime.fromtimestamp(now, UTC)).timestamp()
+            yield sse_event(
+                "schedule",
+                {
+                    "date": SolarCalculator.local_date(now, location_timezone).isoformat(),
+                    "transitions": {key_format(k): v.timestamp() for k, v in st.items()},
+                },
+            )
+            for name, t in st.items():
+                if t.timestamp() > now:
+                    transition = {"transition": key_format(name), "time": t.timestamp()}
+                    feed.schedule(subscription, t.timestamp(), ("transition", transition))
+            feed.schedule(subscription, midnight, ("midnight", None))
+
+            while True:
+                event, data = await subscription.get()
+                if event != "midnight":
+                    yield sse_event(event, data)
+                    continue
+                try:
+                    st = await executor.sky_transitions(
+                        latitude, longitude, midnight, location_timezone, engine
+                    )
+                except ExecutorBusy:
+                    feed.schedule(subscription, feed.clock() + 1.0, ("midnight", None))
+                    continue
+                now = midnight
+                break
+    finally:
+        feed.unsubscribe(subscription)
+
+
+def _feed_full() -> HTTPException:
+    """Build the error turning away a subscriber of a full feed.
+
+    Returns
+    -------
+    HTTPException
+        The 503 error asking the client to come back later.
+    """
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many feed subscribers, try again later.",
+        headers={"Retry-After": "60"},
     )
 
-    on_variation = get_time_variation(onrange)
-    off_variation = get_time_variation(offrange)
+
+class _FeedResponse(StreamingResponse):
+    """Stream of server-sent events holding a feed subscription.
+
+    The subscription is closed however the response ends, including when
+    the client leaves before the stream starts.
+
+    Parameters
+    ----------
+    subscription : Subscription
+        The subscription of the client.
+    *args, **kwargs
+        The arguments of `StreamingResponse`.
+    """
+
+    def __init__(self, subscription: Subscription, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.subscription = subscription
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Stream the events, then close the subscription."""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            feed.unsubscribe(self.subscription)
+
+
+def _asset_response(
+    asset: Asset, cache_control: str, accept_encoding: str | None, if_none_match: str | None
+) -> Response:
+    """Serve a static asset from memory.
+
+    Parameters
+    ----------
+    asset : Asset
+        The asset.
+    cache_control : str
+        The ``Cache-Control`` header of the response.
+    accept_encoding : str or None
+        The ``Accept-Encoding`` header of the request.
+    if_none_match : str or None
+        The ``If-None-Match`` header of the request.
+
+    Returns
+    -------
+    Response
+        The asset, its best compressed variant the client accepts, or a
+        304 response if the client already holds it.
+    """
+    encoding = choose_encoding(accept_encoding, asset.variants)
+    etag = f'{asset.etag[:-1]}-{encoding}"' if encoding is not None else asset.etag
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if asset.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if none_match(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding is None:
+        return Response(asset.body, media_type=asset.media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+
+def _key_precision(calculator: SolarCalculator) -> int | None:
+    """Find the rounding of the locations sharing the calculator's results.
+
+    Parameters
+    ----------
+    calculator : SolarCalculator
+        The calculator.
+
+    Returns
+    -------
+    int or None
+        The number of decimal places latitude and longitude are rounded to
+        by the cache or, without one, the store. None if neither is used.
+    """
+    if calculator.cache is not None:
+        return calculator.cache.precision
+    if calculator.store is not None:
+        return calculator.store.precision
+    return None
+
+
+def _page_response(page: RenderedPage, compressed: bool, headers: dict[str, str]) -> Response:
+    """Serve a rendered page.
+
+    Parameters
+    ----------
+    page : RenderedPage
+        The rendered page.
+    compressed : bool
+        Whether to serve the gzip compressed variant.
+    headers : dict
+        The caching headers of the response.
+
+    Returns
+    -------
+    Response
+        The response holding the page body as is.
+    """
+    if compressed and page.gzipped is not None:
+        return HTMLResponse(page.gzipped, headers={**headers, "Content-Encoding": "gzip"})
+    return HTMLResponse(page.body, headers=headers)
+
+
+def _timer_entry(
+    day: date,
+    sunrise: datetime,
+    sunset: datetime,
+    timezone: zoneinfo.ZoneInfo,
+    checktime: str,
+    offtime: str,
+    on_variation: timedelta,
+    off_variation: timedelta,
+) -> TimerInformation:
+    """Build the timer information of a local day.
+
+    Parameters
+    ----------
+    day : date
+        The local date.
+    sunrise : datetime
+        The local sunrise of the day.
+    sunset : datetime
+        The local sunset of the day.
+    timezone : zoneinfo.ZoneInfo
+        The timezone of the location.
+    checktime : str
+        The local time for checking in on the next day in HH:MM:SS.
+    offtime : str
+        The local time for the off time in HH:MM:SS.
+    on_variation : timedelta
+        The variation added to the sunset for the on time.
+    off_variation : timedelta
+        The variation added to the off time.
+
+    Returns
+    -------
+    TimerInformation
+        The timer information of the day.
+    """
+    next_day = day + timedelta(days=1)
+    check_time = datetime.combine(next_day, datetime.strptime(checktime, "%H:%M:%S").time(), tzinfo=timezone)
+    off_time = datetime.combine(day, datetime.strptime(offtime, "%H:%M:%S").time(), tzinfo=timezone)
 
     off_time += off_variation
-    on_time = st["Sunset"] + on_variation
+    on_time = sunset + on_variation
 
-    ti = TimerInformation(
-        date=date_format(localtime),
+    return TimerInformation(
+        date=date_format(datetime.combine(day, time())),
         check_time_utc=int(check_time.astimezone(UTC).timestamp()),
-        sunrise_usno=time_format(st["Sunrise"]),
-        sunset_usno=time_format(st["Sunset"]),
-        sunset_utc=int(st["Sunset"].astimezone(UTC).timestamp()),
+        sunrise_usno=time_format(sunrise),
+        sunset_usno=time_format(sunset),
         on_time_utc=int(on_time.astimezone(UTC).timestamp()),
         on_time=on_time.strftime("%H:%M:%S"),
         off_time_utc=int(off_time.astimezone(UTC).timestamp()),
         off_time=off_time.strftime("%H:%M:%S"),
     )
-    return ti
@@ -0,0 +1,355 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for service metrics in the Prometheus text format."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+import threading
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+__all__ = ["Counter", "Histogram", "Metrics", "MetricsMiddleware", "metrics"]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds (seconds) of the latency histogram buckets."""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Media type of the Prometheus text format."""
+
+Labels = tuple[str, ...]
+"""Label values of a single series."""
+
+
+class Counter:
+    """Counter with labelled series.
+
+    Parameters
+    ----------
+    name : str
+        The metric name.
+    documentation : str
+        The help text of the metric.
+    label_names : Sequence
+        The names of the labels distinguishing the series.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        """Increase a series.
+
+        Parameters
+        ----------
+        labels : tuple
+            The label values of the series.
+        amount : float
+            The amount to add.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, labels: Labels) -> float:
+        """Get the value of a series.
+
+        Parameters
+        ----------
+        labels : tuple
+            The label values of the series.
+
+        Returns
+        -------
+        float
+            The value, zero if the series was never increased.
+        """
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        """Render the counter in the Prometheus text format.
+
+        Returns
+        -------
+        list
+            The lines of the metric.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Histogram with labelled series.
+
+    Parameters
+    ----------
+    name : str
+        The metric name.
+    documentation : str
+        The help text of the metric.
+    label_names : Sequence
+        The names of the labels distinguishing the series.
+    buckets : Sequence
+        The upper bounds of the buckets in increasing order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """Record an observation.
+
+        Parameters
+        ----------
+        labels : tuple
+            The label values of the series.
+        value : float
+            The observed value.
+        """
+        with self._lock:
+            counts, total = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def count(self, labels: Labels) -> int:
+        """Get the number of observations of a series.
+
+        Parameters
+        ----------
+        labels : tuple
+            The label values of the series.
+
+        Returns
+        -------
+        int
+            The number of observations.
+        """
+        series = self._series.get(labels)
+        return sum(series[0]) if series is not None else 0
+
+    def render(self) -> list[str]:
+        """Render the histogram in the Prometheus text format.
+
+        Returns
+        -------
+        list
+            The lines of the metric.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    bucket_labels = _format_labels((*self.label_names, "le"), (*labels, le))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                series_labels = _format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{series_labels} {total[0]:g}")
+                lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """The service metrics.
+
+    Nothing is recorded until the metrics are enabled. Stage timers then
+    return a shared no-op context manager, so instrumented code costs a
+    single attribute check.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._collected: list[tuple[str, float]] | None = None
+        self.requests = Counter(
+            "helios_requests_total", "Number of HTTP requests handled.", ("route", "method", "status")
+        )
+        self.request_duration = Histogram(
+            "helios_request_duration_seconds", "Time spent handling HTTP requests.", ("route",)
+        )
+        self.stage_duration = Histogram(
+            "helios_stage_duration_seconds", "Time spent in each stage of a calculation.", ("stage",)
+        )
+
+    def stage(self, name: str) -> AbstractContextManager[Any]:
+        """Time a stage of a calculation.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+
+        Returns
+        -------
+        AbstractContextManager
+            The context manager timing the block it wraps.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        """Record the time spent in a block as a stage."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - begin)
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        """Record the time spent in a stage measured elsewhere.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        seconds : float
+            The time spent.
+        """
+        if self.enabled:
+            self._record(name, seconds)
+
+    @contextmanager
+    def collect_stages(self) -> Iterator[list[tuple[str, float]]]:
+        """Collect the stages recorded in a block.
+
+        Process pool workers use this to send their stage timings back to
+        the parent process, which serves the metrics.
+
+        Returns
+        -------
+        Iterator
+            Yields the list the stage names and times are appended to.
+        """
+        collected: list[tuple[str, float]] = []
+        previous, self._collected = self._collected, collected
+        try:
+            yield collected
+        finally:
+            self._collected = previous
+
+    def _record(self, name: str, seconds: float) -> None:
+        """Record the time spent in a stage."""
+        self.stage_duration.observe((name,), seconds)
+        if self._collected is not None:
+            self._collected.append((name, seconds))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format.
+
+        Returns
+        -------
+        str
+            The metrics exposition.
+        """
+        lines = [
+            *self.requests.render(),
+            *self.request_duration.render(),
+            *self.stage_duration.render(),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing requests per route.
+
+    Requests are labelled with the route's path template, so path
+    parameters do not create new series. Requests not matching a route are
+    labelled ``unmatched``.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        The application to wrap.
+    metrics : Metrics
+        The metrics to record into.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        begin = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.metrics.request_duration.observe((path,), time.perf_counter() - begin)
+            self.metrics.requests.inc((path, scope["method"], str(status_code)))
+
+
+_DISABLED: AbstractContextManager[Any] = nullcontext()
+"""Context manager returned by stage timers while metrics are disabled."""
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format the labels of a series.
+
+    Parameters
+    ----------
+    names : Sequence
+        The label names.
+    values : Sequence
+        The label values.
+
+    Returns
+    -------
+    str
+        The labels in braces, empty if there are none.
+    """
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics = Metrics()
+"""The service metrics."""
@@ -6,9 +6,28 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel
+import datetime
 
-__all__ = ["DayInformation", "SkyTransitions", "TimerInformation"]
+from pydantic import BaseModel, Field
+
+__all__ = [
+    "CacheStatus",
+    "DayInformation",
+    "ExecutorStatus",
+    "ExportRequest",
+    "FeedStatus",
+    "HotFunction",
+    "ProfileSummary",
+    "PageCacheStatus",
+    "ServiceStatus",
+    "SkyTransitions",
+    "SkyTransitionsDay",
+    "SkyTransitionsRequest",
+    "Site",
+    "StoreStatus",
+    "SunPositions",
+    "TimerInformation",
+]
 
 
 class SkyTransitions(BaseModel):
@@ -24,12 +43,100 @@ class SkyTransitions(BaseModel):
     astronomical_dusk: float
 
 
+class SkyTransitionsDay(BaseModel):
+    """Sky transition information for a single day model.
+
+    Transitions that do not happen on the day are null.
+    """
+
+    date: datetime.date
+    astronomical_dawn: float | None
+    nautical_dawn: float | None
+    civil_dawn: float | None
+    sunrise: float | None
+    sunset: float | None
+    civil_dusk: float | None
+    nautical_dusk: float | None
+    astronomical_dusk: float | None
+
+
+class SkyTransitionsRequest(BaseModel):
+    """Sky transitions request model."""
+
+    cdatetime: float = Field(
+        title="current_datetime_timestamp",
+        description="The UNIX timestamp for the current date/time.",
+    )
+    tz: str = Field(
+        title="timezone",
+        description="The time zone associated with the current date/time.",
+    )
+    lat: float = Field(
+        le=90.0,
+        ge=-90.0,
+        title="latitude",
+        description="The location's latitude coordinate. North is positive. South is negative",
+    )
+    lon: float = Field(
+        le=180.0,
+        ge=-180.0,
+        title="longitude",
+        description="The location's longtude coordinate. East is positive. West is negative.",
+    )
+
+
+class Site(BaseModel):
+    """Site location model."""
+
+    lat: float = Field(
+        le=90.0,
+        ge=-90.0,
+        title="latitude",
+        description="The location's latitude coordinate. North is positive. South is negative",
+    )
+    lon: float = Field(
+        le=180.0,
+        ge=-180.0,
+        title="longitude",
+        description="The location's longtude coordinate. East is positive. West is negative.",
+    )
+    tz: str = Field(
+        title="timezone",
+        description="The time zone associated with the location.",
+    )
+
+
+class ExportRequest(BaseModel):
+    """Sky transitions export request model."""
+
+    sites: list[Site] = Field(title="sites", description="The sites to export.")
+    start: datetime.date = Field(title="start_date", description="The first local date of the export.")
+    end: datetime.date = Field(
+        title="end_date", description="The last local date of the export, included in the results."
+    )
+
+
 class DayInformation(SkyTransitions):
     """Day information model."""
 
     day_length: float
 
 
+class SunPositions(BaseModel):
+    """Sun positions time series model.
+
+    The samples are stored as columns, the time of sample ``i`` being
+    ``start + i * step``.
+    """
+
+    start: float = Field(title="start", description="The UNIX timestamp of the first sample.")
+    step: float = Field(title="step", description="The time between samples in seconds.")
+    altitude: list[float] = Field(title="altitude", description="The Sun's altitude in degrees.")
+    azimuth: list[float] = Field(
+        title="azimuth", description="The Sun's azimuth in degrees, clockwise from North."
+    )
+
+
 class TimerInformation(BaseModel):
     """Timer information model."""
 
@@ -41,3 +148,83 @@ class TimerInformation(BaseModel):
     on_time: str
     off_time_utc: int
     off_time: str
+
+
+class ExecutorStatus(BaseModel):
+    """Calculation executor status model."""
+
+    executor_type: str
+    workers: int
+    backlog: int
+    running: int
+    queued: int
+    saturation: float
+    rejected: int
+    coalesced: int
+
+
+class CacheStatus(BaseModel):
+    """Sky transitions cache status model."""
+
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+
+
+class StoreStatus(BaseModel):
+    """Persistent sky transitions store status model."""
+
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    writes: int
+    evictions: int
+
+
+class PageCacheStatus(BaseModel):
+    """Rendered page cache status model."""
+
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class FeedStatus(BaseModel):
+    """Sky transitions feed status model."""
+
+    subscribers: int
+    max_subscribers: int
+    scheduled: int
+    delivered: int
+
+
+class ServiceStatus(BaseModel):
+    """Service status model."""
+
+    executor: ExecutorStatus
+    cache: CacheStatus | None
+    store: StoreStatus | None = None
+    pages: PageCacheStatus | None = None
+    feed: FeedStatus | None = None
+
+
+class HotFunction(BaseModel):
+    """Aggregated profile entry of a function model."""
+
+    function: str
+    calls: int
+    total_time: float
+    cumulative_time: float
+
+
+class ProfileSummary(BaseModel):
+    """Aggregated request profiles model."""
+
+    profiles: int
+    functions: list[HotFunction]
@@ -0,0 +1,203 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for caching rendered pages."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+import gzip
+import threading
+
+from .models import PageCacheStatus
+
+__all__ = ["PageCache", "PageKey", "RenderedPage", "accepts_gzip"]
+
+PageKey = tuple[str, float, float, date, str, str]
+"""Page key of base URL, rounded latitude, rounded longitude, local date, zone
+and engine."""
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """A rendered page body along with its compressed variant."""
+
+    body: bytes
+    """The page body."""
+    gzipped: bytes | None
+    """The gzip compressed page body, None if not compressed."""
+    expires: float
+    """The UNIX timestamp the page is outdated at."""
+
+
+class PageCache:
+    """Bounded in-memory cache of rendered pages.
+
+    A page shows a single local day, so each entry expires at the local
+    midnight ending that day. Entries are evicted least recently used first
+    once the cache is full. The cache is safe to share across threads.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of pages held.
+    compress : bool
+        Whether to keep a gzip compressed variant of each page.
+    precision : int
+        The number of decimal places latitude and longitude are rounded to
+        when building a key.
+    """
+
+    def __init__(self, max_size: int = 256, compress: bool = True, precision: int = 4) -> None:
+        self.max_size = max_size
+        self.compress = compress
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[PageKey, RenderedPage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of pages held."""
+        return len(self._entries)
+
+    def key(
+        self,
+        base_url: str,
+        latitude: float,
+        longitude: float,
+        local_date: date,
+        location_timezone: str,
+        engine: str,
+    ) -> PageKey:
+        """Build the key for a location's day page.
+
+        Parameters
+        ----------
+        base_url : str
+            The base URL of the request, as the page links to static files.
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        local_date : date
+            The calendar date at the location.
+        location_timezone : str
+            The timezone for the location.
+        engine : str
+            The name and version of the engine calculating the sky
+            transitions.
+
+        Returns
+        -------
+        PageKey
+            The key for the page.
+        """
+        return (
+            base_url,
+            round(latitude, self.precision),
+            round(longitude, self.precision),
+            local_date,
+            location_timezone,
+            engine,
+        )
+
+    def get(self, key: PageKey, now: float) -> RenderedPage | None:
+        """Look up a page.
+
+        Parameters
+        ----------
+        key : PageKey
+            The key for the page.
+        now : float
+            The current UNIX timestamp.
+
+        Returns
+        -------
+        RenderedPage or None
+            The rendered page, None if missing or outdated.
+        """
+        with self._lock:
+            page = self._entries.get(key)
+            if page is not None and page.expires <= now:
+                del self._entries[key]
+                self.evictions += 1
+                page = None
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key: PageKey, body: bytes, expires: float) -> RenderedPage:
+        """Store a page, compressing it if enabled.
+
+        Parameters
+        ----------
+        key : PageKey
+            The key for the page.
+        body : bytes
+            The page body.
+        expires : float
+            The UNIX timestamp the page is outdated at.
+
+        Returns
+        -------
+        RenderedPage
+            The stored page.
+        """
+        gzipped = gzip.compress(body, mtime=0) if self.compress else None
+        page = RenderedPage(body, gzipped, expires)
+        with self._lock:
+            self._entries[key] = page
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return page
+
+    def clear(self) -> None:
+        """Remove all pages."""
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> PageCacheStatus:
+        """Report the cache usage.
+
+        Returns
+        -------
+        PageCacheStatus
+            The current cache usage.
+        """
+        return PageCacheStatus(
+            size=len(self._entries),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Check whether a client accepts gzip compressed responses.
+
+    Parameters
+    ----------
+    accept_encoding : str or None
+        The ``Accept-Encoding`` header, None if the request has none.
+
+    Returns
+    -------
+    bool
+        True if gzip is listed and not refused with a zero quality.
+    """
+    for coding in (accept_encoding or "").split(","):
+        name, _, parameters = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            return parameters.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
@@ -0,0 +1,259 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for precomputing the sky transitions of many sites offline."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+from dataclasses import dataclass
+from datetime import date
+import os
+from pathlib import Path
+from typing import Any
+import zoneinfo
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import TypeAdapter
+
+from .config import config
+from .engines import EngineName
+from .formatters import key_format
+from .models import Site
+from .solar_calculator import TRANSITION_NAMES, SolarCalculator
+from .store import TransitionStore
+
+__all__ = ["PrecomputeJob", "load_parts", "precompute", "read_sites"]
+
+PART_SUFFIX = ".npz"
+"""File name suffix of the columnar parts."""
+
+_worker: tuple[PrecomputeJob, SolarCalculator] | None = None
+"""The job and calculator of a worker process."""
+
+
+@dataclass(frozen=True)
+class PrecomputeJob:
+    """Settings of a precompute run shared by all workers.
+
+    Exactly one of ``output`` and ``store_path`` is given.
+    """
+
+    start_date: date
+    """The first local date calculated for each site."""
+    end_date: date
+    """The last local date calculated for each site."""
+    engine: EngineName
+    """The engine searching for the transitions."""
+    output: Path | None = None
+    """Directory receiving one columnar part per chunk of sites."""
+    store_path: Path | None = None
+    """Transition store receiving the location days."""
+    ephemeris_path: Path | None = None
+    """The SPK file loaded by each worker, the packaged one if not given."""
+    store_max_entries: int = config.store_max_entries
+    """The number of location days kept in the store."""
+    store_precision: int = config.cache_precision
+    """Decimal places latitude and longitude are rounded to for store keys."""
+
+
+def read_sites(path: Path) -> list[Site]:
+    """Read a site list.
+
+    Parameters
+    ----------
+    path : Path
+        A CSV file with ``lat``, ``lon`` and ``tz`` columns or a JSON file
+        holding a list of objects with those keys.
+
+    Returns
+    -------
+    list
+        The validated sites.
+    """
+    adapter = TypeAdapter(list[Site])
+    if path.suffix.lower() == ".json":
+        return adapter.validate_json(path.read_bytes())
+    with path.open(newline="") as ifile:
+        return adapter.validate_python(list(csv.DictReader(ifile)))
+
+
+def precompute(
+    job: PrecomputeJob,
+    sites: Sequence[Site],
+    workers: int | None = None,
+    chunk_size: int = 50,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Calculate the sky transitions of many sites across processes.
+
+    The sites are split into chunks handed to a pool of worker processes,
+    each loading the ephemeris once. A chunk is written as a columnar part
+    renamed into place once complete, or to the store site by site, so an
+    interrupted run resumes by skipping the chunks already written. The site
+    list and chunk size must not change between runs. The store must hold
+    every day of the run, or the run would evict its own earlier days.
+
+    Parameters
+    ----------
+    job : PrecomputeJob
+        The settings of the run.
+    sites : Sequence
+        The sites to calculate.
+    workers : int, optional
+        The number of worker processes, one per CPU if not given.
+    chunk_size : int
+        The number of sites in a chunk.
+    progress : Callable, optional
+        Called with the number of sites done and the total as chunks finish.
+
+    Returns
+    -------
+    int
+        The number of chunks calculated, leaving out the ones skipped.
+
+    Raises
+    ------
+    ValueError
+        Raised if a site's timezone is unknown or the store holds fewer
+        location days than the run.
+    """
+    for site in sites:
+        try:
+            zoneinfo.ZoneInfo(site.tz)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Bad time zone given: {site.tz}") from None
+    if job.store_path is not None:
+        entries = len(sites) * ((job.end_date - job.start_date).days + 1)
+        if entries > job.store_max_entries:
+            raise ValueError(
+                f"The run writes {entries} location days, more than the {job.store_max_entries} "
+                "the store keeps."
+            )
+    if job.output is not None:
+        job.output.mkdir(parents=True, exist_ok=True)
+    chunks = [sites[i : i + chunk_size] for i in range(0, len(sites), chunk_size)]
+    done = calculated = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(job,)) as pool:
+        futures = {pool.submit(_run_chunk, index, chunk): len(chunk) for index, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            calculated += future.result()
+            done += futures[future]
+            if progress is not None:
+                progress(done, len(sites))
+    return calculated
+
+
+def load_parts(output: Path) -> dict[str, npt.NDArray[np.generic]]:
+    """Load the columnar parts of a precompute run.
+
+    Parameters
+    ----------
+    output : Path
+        The directory holding the parts.
+
+    Returns
+    -------
+    dict
+        Each column across all parts in chunk order. The transitions are
+        UNIX timestamps, NaN if one does not happen that day.
+    """
+    parts = [np.load(path) for path in sorted(output.glob(f"part-*{PART_SUFFIX}"))]
+    if not parts:
+        return {}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0].files}
+
+
+def _start_worker(job: PrecomputeJob) -> None:
+    """Load the ephemeris of a worker process.
+
+    Parameters
+    ----------
+    job : PrecomputeJob
+        The settings of the run.
+    """
+    global _worker
+    store = (
+        TransitionStore(job.store_path, job.store_max_entries, job.store_precision)
+        if job.store_path is not None
+        else None
+    )
+    _worker = (job, SolarCalculator(engine=job.engine, ephemeris_path=job.ephemeris_path, store=store))
+
+
+def _run_chunk(index: int, sites: Sequence[Site]) -> int:
+    """Calculate and write a chunk of sites unless already written.
+
+    Parameters
+    ----------
+    index : int
+        The position of the chunk.
+    sites : Sequence
+        The sites of the chunk.
+
+    Returns
+    -------
+    int
+        One if the chunk was calculated, zero if skipped.
+    """
+    assert _worker is not None
+    job, calculator = _worker
+    if job.output is not None:
+        part = job.output / f"part-{index:05d}{PART_SUFFIX}"
+        if part.exists():
+            return 0
+        _write_part(part, job, calculator, sites)
+    else:
+        # Sites are stored in order and the oldest days are evicted first, so
+        # the chunk is whole if its first and last days are both there.
+        assert calculator.store is not None
+        first, last = sites[0], sites[-1]
+        if (
+            calculator.recall(first.lat, first.lon, job.start_date, first.tz) is not None
+            and calculator.recall(last.lat, last.lon, job.end_date, last.tz) is not None
+        ):
+            return 0
+        for site in sites:
+            calculator.precompute_range(site.lat, site.lon, job.start_date, job.end_date, site.tz)
+    return 1
+
+
+def _write_part(part: Path, job: PrecomputeJob, calculator: SolarCalculator, sites: Sequence[Site]) -> None:
+    """Calculate a chunk of sites into a columnar part.
+
+    Parameters
+    ----------
+    part : Path
+        The file of the part.
+    job : PrecomputeJob
+        The settings of the run.
+    calculator : SolarCalculator
+        The calculator of the worker.
+    sites : Sequence
+        The sites of the chunk.
+    """
+    rows: list[tuple[float, float, str, date]] = []
+    times: list[list[float]] = []
+    for site in sites:
+        days = calculator.sky_transitions_range(site.lat, site.lon, job.start_date, job.end_date, site.tz)
+        for day, sky_transitions in days.items():
+            rows.append((site.lat, site.lon, site.tz, day))
+            times.append([t.timestamp() if t is not None else np.nan for t in sky_transitions.values()])
+    latitudes, longitudes, zones, dates = zip(*rows, strict=True)
+    transitions = np.array(times, dtype=np.float64).reshape(-1, len(TRANSITION_NAMES))
+    columns: dict[str, Any] = {
+        "lat": np.array(latitudes),
+        "lon": np.array(longitudes),
+        "tz": np.array(zones),
+        "date": np.array(dates, dtype="datetime64[D]"),
+    }
+    for i, name in enumerate(TRANSITION_NAMES):
+        columns[key_format(name)] = transitions[:, i]
+    temporary = part.with_suffix(".tmp")
+    with temporary.open("wb") as ofile:
+        np.savez(ofile, **columns)
+    os.replace(temporary, part)
@@ -0,0 +1,310 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for profiling sampled requests."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import contextvars
+import cProfile
+from pathlib import Path
+import pstats
+import random
+import re
+import time
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .models import HotFunction, ProfileSummary
+
+__all__ = ["ProfilingMiddleware", "RequestProfiler", "profiled"]
+
+PROFILE_SUFFIX = ".prof"
+"""File name suffix of the profiles."""
+
+_worker_profiles: contextvars.ContextVar[list[cProfile.Profile] | None] = contextvars.ContextVar(
+    "worker_profiles", default=None
+)
+"""Profiles of the worker calls made by the request being profiled."""
+
+
+class RequestProfiler:
+    """Profile requests into a bounded ring of files.
+
+    A request is profiled if it carries the trigger header or is picked by
+    the sample rate. Only one request is profiled at a time, as the standard
+    library profiler cannot nest; other requests interleaving on the event
+    loop show up in that profile. A server-sent events stream is only
+    profiled until it starts, so a long-lived subscription does not hold the
+    profiler. The profiles are aggregated and written on a worker thread,
+    and once the directory holds ``max_files`` profiles, the oldest are
+    removed.
+
+    Parameters
+    ----------
+    directory : Path
+        The directory holding the profiles. It is created if needed.
+    sample_rate : float
+        The fraction of requests profiled.
+    header : str
+        The request header that asks for a request to be profiled.
+    max_files : int
+        The number of profiles kept.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        sample_rate: float = 0.0,
+        header: str = "X-Helios-Profile",
+        max_files: int = 100,
+    ) -> None:
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode("latin-1")
+        self.max_files = max_files
+        self._active = False
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def wants(self, scope: Scope) -> bool:
+        """Decide whether to profile a request.
+
+        Parameters
+        ----------
+        scope : Scope
+            The ASGI scope of the request.
+
+        Returns
+        -------
+        bool
+            True if the request is to be profiled.
+        """
+        if self._active:
+            return False
+        if any(name == self.header for name, _ in scope["headers"]):
+            return True
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+    def profiles(self) -> list[Path]:
+        """List the profiles held, oldest first.
+
+        Returns
+        -------
+        list
+            The paths of the profiles.
+        """
+        return sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"))
+
+    def save(self, stats: pstats.Stats, method: str, path: str) -> Path:
+        """Write a profile and drop the oldest ones beyond the limit.
+
+        Parameters
+        ----------
+        stats : pstats.Stats
+            The profile statistics.
+        method : str
+            The HTTP method of the profiled request.
+        path : str
+            The path of the profiled request.
+
+        Returns
+        -------
+        Path
+            The path of the written profile.
+        """
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        output = self.directory / f"{time.time_ns()}-{method}-{slug}{PROFILE_SUFFIX}"
+        stats.dump_stats(output)
+        profiles = self.profiles()
+        for old in profiles[: max(len(profiles) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+        return output
+
+    def summary(self, limit: int = 20) -> ProfileSummary:
+        """Aggregate the profiles held into the hottest functions.
+
+        Parameters
+        ----------
+        limit : int
+            The number of functions reported.
+
+        Returns
+        -------
+        ProfileSummary
+            The functions with the largest own time across all profiles.
+        """
+        profiles = self.profiles()
+        if not profiles:
+            return ProfileSummary(profiles=0, functions=[])
+        stats = pstats.Stats(str(profiles[0]))
+        for profile in profiles[1:]:
+            try:
+                stats.add(str(profile))
+            except (OSError, EOFError):
+                # Removed or still being written by another worker.
+                continue
+        entries: dict[tuple[str, int, str], tuple[Any, ...]] = stats.stats  # type: ignore[attr-defined]
+        hottest = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return ProfileSummary(
+            profiles=len(profiles),
+            functions=[
+                HotFunction(
+                    function=f"{key[0]}:{key[1]}({key[2]})",
+                    calls=primitive_calls,
+                    total_time=total_time,
+                    cumulative_time=cumulative_time,
+                )
+                for key, (primitive_calls, _, total_time, cumulative_time, _) in hottest
+            ],
+        )
+
+    async def __call__(self, app: ASGIApp, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run a request under the profiler and save the profile.
+
+        Parameters
+        ----------
+        app : ASGIApp
+            The application handling the request.
+        scope : Scope
+            The ASGI scope of the request.
+        receive : Receive
+            The ASGI receive channel.
+        send : Send
+            The ASGI send channel.
+        """
+        self._active = True
+        workers: list[cProfile.Profile] = []
+        token = _worker_profiles.set(workers)
+        profile = cProfile.Profile()
+        finished = False
+
+        async def finish() -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            profile.disable()
+            self._active = False
+            await run_in_threadpool(self._write, profile, list(workers), scope["method"], scope["path"])
+
+        async def send_profiled(message: Message) -> None:
+            if message["type"] == "http.response.start" and _is_event_stream(message):
+                await finish()
+            await send(message)
+
+        profile.enable()
+        try:
+            await app(scope, receive, send_profiled)
+        finally:
+            _worker_profiles.reset(token)
+            await finish()
+
+    def _write(
+        self, profile: cProfile.Profile, workers: list[cProfile.Profile], method: str, path: str
+    ) -> Path:
+        """Aggregate a request's profiles and save them.
+
+        Parameters
+        ----------
+        profile : cProfile.Profile
+            The profile of the request on the event loop.
+        workers : list
+            The profiles of its calls on worker threads.
+        method : str
+            The HTTP method of the profiled request.
+        path : str
+            The path of the profiled request.
+
+        Returns
+        -------
+        Path
+            The path of the written profile.
+        """
+        stats = pstats.Stats(profile)
+        for worker in workers:
+            stats.add(worker)
+        return self.save(stats, method, path)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling sampled requests.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        The application to wrap.
+    profiler : Callable
+        Returns the request profiler, None while profiling is disabled.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: Callable[[], RequestProfiler | None]) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call."""
+        profiler = self.profiler() if scope["type"] == "http" else None
+        if profiler is None or not profiler.wants(scope):
+            await self.app(scope, receive, send)
+            return
+        await profiler(self.app, scope, receive, send)
+
+
+def _is_event_stream(message: Message) -> bool:
+    """Check whether a response starts a server-sent events stream.
+
+    Parameters
+    ----------
+    message : Message
+        The ``http.response.start`` message of the response.
+
+    Returns
+    -------
+    bool
+        True if the response is a ``text/event-stream``.
+    """
+    return any(
+        name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+        for name, value in message.get("headers", [])
+    )
+
+
+def profiled(call: Callable[[], Any]) -> Callable[[], Any]:
+    """Profile a call made on a worker thread for the current request.
+
+    The worker thread has its own profiler, whose results are added to the
+    request's profile. Calls made outside a profiled request are returned
+    unchanged.
+
+    Parameters
+    ----------
+    call : Callable
+        The call run on the worker thread.
+
+    Returns
+    -------
+    Callable
+        The call to run instead.
+    """
+    workers = _worker_profiles.get()
+    if workers is None:
+        return call
+
+    def run() -> Any:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler already covers every thread.
+            return call()
+        try:
+            return call()
+        finally:
+            profile.disable()
+            workers.append(profile)
+
+    return run
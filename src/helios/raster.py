@@ -0,0 +1,222 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for sunrise, sunset and day length rasters."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time
+import io
+
+import numpy as np
+import numpy.typing as npt
+
+from .engines import TWILIGHT_ALTITUDES, AnalyticEngine, SolarEngine
+
+__all__ = ["MEDIA_TYPE", "RASTER_BANDS", "day_raster", "raster_axis", "to_npy"]
+
+RASTER_BANDS = ("sunrise", "sunset", "day_length")
+"""The bands of a raster in order."""
+
+MEDIA_TYPE = "application/x-npy"
+"""Media type of a raster in the NumPy file format."""
+
+DAY = len(TWILIGHT_ALTITUDES)
+"""Dark/twilight/day value while the Sun is up."""
+
+SEARCH_CHUNK = 2048
+"""Number of locations searched at a time by engines working on
+date/times."""
+
+Events = tuple[npt.NDArray[np.int_], npt.NDArray[np.int_], npt.NDArray[np.float64], npt.NDArray[np.int_]]
+"""Value at the start of each window, then the window, UNIX timestamp and
+new value of each dark/twilight/day change."""
+
+
+def raster_axis(minimum: float, maximum: float, resolution: float) -> npt.NDArray[np.float64]:
+    """Find the pixel centers along an axis.
+
+    Parameters
+    ----------
+    minimum : float
+        The lower edge of the first pixel.
+    maximum : float
+        The upper edge of the last pixel, shortened to a whole pixel.
+    resolution : float
+        The pixel size.
+
+    Returns
+    -------
+    numpy.ndarray
+        The pixel centers in increasing order.
+    """
+    count = max(int(np.floor((maximum - minimum) / resolution + 1e-9)), 0)
+    return np.asarray(minimum + (np.arange(count) + 0.5) * resolution, dtype=np.float64)
+
+
+def day_raster(
+    engine: SolarEngine,
+    day: date,
+    latitudes: npt.NDArray[np.float64],
+    longitudes: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float32]:
+    """Calculate sunrise, sunset and day length over a grid of locations.
+
+    Each location's day runs from its local mean solar midnight, so a
+    location sees the sunrise and sunset nearest to its noon on the date.
+    The analytic engine is evaluated for all locations in one vectorized
+    pass, other engines a chunk of locations at a time.
+
+    Parameters
+    ----------
+    engine : SolarEngine
+        The engine searching for the transitions.
+    day : date
+        The date of the raster.
+    latitudes : numpy.ndarray
+        The latitude (decimal degrees) of each row, North first.
+    longitudes : numpy.ndarray
+        The longitude (decimal degrees) of each column, West first.
+
+    Returns
+    -------
+    numpy.ndarray
+        The bands by row and column. The sunrise and sunset are seconds from
+        midnight UTC of the date, NaN if the Sun does not rise or set. The
+        day length is in seconds.
+    """
+    grid_latitudes, grid_longitudes = np.meshgrid(latitudes, longitudes, indexing="ij")
+    latitude = grid_latitudes.ravel()
+    longitude = grid_longitudes.ravel()
+    midnight = datetime.combine(day, time(), tzinfo=UTC).timestamp()
+    start = midnight - longitude * 240.0
+    end = start + 86400.0
+
+    if isinstance(engine, AnalyticEngine):
+        events = engine.find_events(latitude, longitude, start, end)
+    else:
+        events = _search_events(engine, latitude, longitude, start, end)
+    bands = _reduce_events(events, start, end)
+    bands[:2] -= midnight
+    return bands.astype(np.float32).reshape(len(RASTER_BANDS), len(latitudes), len(longitudes))
+
+
+def to_npy(raster: npt.NDArray[np.float32]) -> bytes:
+    """Serialize a raster in the NumPy file format.
+
+    Parameters
+    ----------
+    raster : numpy.ndarray
+        The raster bands.
+
+    Returns
+    -------
+    bytes
+        The NPY file contents.
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, raster, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _search_events(
+    engine: SolarEngine,
+    latitude: npt.NDArray[np.float64],
+    longitude: npt.NDArray[np.float64],
+    start: npt.NDArray[np.float64],
+    end: npt.NDArray[np.float64],
+) -> Events:
+    """Search for the changes with an engine a chunk of locations at a time.
+
+    Parameters
+    ----------
+    engine : SolarEngine
+        The engine searching for the transitions.
+    latitude : numpy.ndarray
+        The latitude (decimal degrees) of each location.
+    longitude : numpy.ndarray
+        The longitude (decimal degrees) of each location.
+    start : numpy.ndarray
+        The UNIX timestamp starting each search window.
+    end : numpy.ndarray
+        The UNIX timestamp ending each search window.
+
+    Returns
+    -------
+    Events
+        The changes in every window.
+    """
+    initial: list[int] = []
+    windows: list[int] = []
+    times: list[float] = []
+    values: list[int] = []
+    for offset in range(0, len(latitude), SEARCH_CHUNK):
+        chunk = slice(offset, offset + SEARCH_CHUNK)
+        transitions = engine.search(
+            latitude[chunk].tolist(),
+            longitude[chunk].tolist(),
+            [datetime.fromtimestamp(t, UTC) for t in start[chunk].tolist()],
+            [datetime.fromtimestamp(t, UTC) for t in end[chunk].tolist()],
+        )
+        for window, (previous_e, window_times, window_values) in enumerate(transitions, offset):
+            initial.append(previous_e)
+            windows.extend([window] * len(window_times))
+            times.extend(t.timestamp() for t in window_times)
+            values.extend(window_values)
+    return (
+        np.array(initial, dtype=int),
+        np.array(windows, dtype=int),
+        np.array(times, dtype=float),
+        np.array(values, dtype=int),
+    )
+
+
+def _reduce_events(
+    events: Events, start: npt.NDArray[np.float64], end: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """Find the sunrise, sunset and day length of each window.
+
+    Parameters
+    ----------
+    events : Events
+        The changes in every window, sorted by window and time.
+    start : numpy.ndarray
+        The UNIX timestamp starting each search window.
+    end : numpy.ndarray
+        The UNIX timestamp ending each search window.
+
+    Returns
+    -------
+    numpy.ndarray
+        The first sunrise and sunset (UNIX timestamps, NaN if none) and the
+        time spent in daylight of each window.
+    """
+    initial, windows, times, values = events
+    count = len(start)
+    first = np.ones(len(windows), dtype=bool)
+    first[1:] = windows[1:] != windows[:-1]
+    previous = np.empty_like(values)
+    previous[1:] = values[:-1]
+    previous[first] = initial[windows[first]]
+
+    bands = np.full((len(RASTER_BANDS), count), np.inf)
+    for band, changes in enumerate(((previous < DAY) & (values == DAY), (previous == DAY) & (values < DAY))):
+        np.minimum.at(bands[band], windows[changes], times[changes])
+    bands[bands == np.inf] = np.nan
+
+    # Each change lasts until the next one in its window or the window end.
+    last = np.ones(len(windows), dtype=bool)
+    last[:-1] = windows[:-1] != windows[1:]
+    until = np.empty_like(times)
+    until[:-1] = times[1:]
+    until[last] = end[windows[last]]
+    day_length = np.zeros(count)
+    np.add.at(day_length, windows[values == DAY], (until - times)[values == DAY])
+
+    # The time before the first change, or the whole window without any.
+    initial_until = end.copy()
+    initial_until[windows[first]] = times[first]
+    day_length += np.where(initial == DAY, initial_until - start, 0.0)
+    bands[2] = day_length
+    return bands
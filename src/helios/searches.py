@@ -0,0 +1,256 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for searching many locations at once."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from skyfield.api import wgs84
+from skyfield.nutationlib import iau2000b_radians
+from skyfield.searchlib import EPSILON
+from skyfield.timelib import Time, Timescale
+
+__all__ = ["dark_twilight_day_sites", "find_discrete_sites", "refine_dark_twilight_day"]
+
+TWILIGHT_DEGREES = np.array([-18.0, -12.0, -6.0, -0.8333])
+"""Sun altitudes (degrees) separating the dark, twilight and day values."""
+
+SiteFunction = Callable[[Time, npt.NDArray[np.intp]], npt.NDArray[np.int_]]
+"""Discrete function of time evaluated for an array of site indexes."""
+
+
+def dark_twilight_day_sites(
+    ephemeris: Any, latitudes: npt.ArrayLike, longitudes: npt.ArrayLike
+) -> SiteFunction:
+    """Build a function returning dark, twilight or day for many sites.
+
+    This mirrors ``skyfield.almanac.dark_twilight_day``, but the returned
+    function pairs each time with a site index so that many locations are
+    evaluated in a single vectorized call.
+
+    Parameters
+    ----------
+    ephemeris : SpiceKernel
+        The ephemeris containing the Sun and Earth.
+    latitudes : array_like
+        The latitudes (decimal degrees) of the sites.
+    longitudes : array_like
+        The longitudes (decimal degrees) of the sites.
+
+    Returns
+    -------
+    Callable
+        The function taking times and matching site indexes and returning
+        0 (dark) through 4 (Sun is up) for each pair.
+    """
+    sun = ephemeris["sun"]
+    earth = ephemeris["earth"]
+    site_latitudes = np.asarray(latitudes, dtype=float)
+    site_longitudes = np.asarray(longitudes, dtype=float)
+
+    def is_it_dark_twilight_day_at(t: Time, sites: npt.NDArray[np.intp]) -> npt.NDArray[np.int_]:
+        t._nutation_angles_radians = iau2000b_radians(t)
+        topos = wgs84.latlon(site_latitudes[sites], site_longitudes[sites])
+        degrees = (earth + topos).at(t).observe(sun).apparent().altaz()[0].degrees
+        r = np.zeros_like(degrees, int)
+        r[degrees >= -18.0] = 1
+        r[degrees >= -12.0] = 2
+        r[degrees >= -6.0] = 3
+        r[degrees >= -0.8333] = 4
+        return r
+
+    return is_it_dark_twilight_day_at
+
+
+def find_discrete_sites(
+    timescale: Timescale,
+    jd0: npt.ArrayLike,
+    jd1: npt.ArrayLike,
+    f: SiteFunction,
+    step_days: float = 0.04,
+    epsilon: float = EPSILON,
+    num: int = 12,
+) -> tuple[npt.NDArray[np.int_], list[tuple[npt.NDArray[np.float64], npt.NDArray[np.int_]]]]:
+    """Find where a discrete function changes value for many sites.
+
+    This follows ``skyfield.searchlib.find_discrete``, with every site having
+    its own search window. All sites are sampled and refined together, so
+    each refinement step is a single call to ``f``.
+
+    Parameters
+    ----------
+    timescale : Timescale
+        The timescale for building times.
+    jd0 : array_like
+        The TT Julian dates starting the search window of each site.
+    jd1 : array_like
+        The TT Julian dates ending the search window of each site.
+    f : Callable
+        The discrete function of time and site index.
+    step_days : float
+        The coarse sampling step in days.
+    epsilon : float
+        The precision in days the changes are refined to.
+    num : int
+        The number of samples taken across each bracket when refining.
+
+    Returns
+    -------
+    tuple
+        The value of ``f`` at the start of each window and, for each site,
+        the TT Julian dates of the changes along with the new values.
+    """
+    starts_jd = np.atleast_1d(np.asarray(jd0, dtype=float))
+    ends_jd = np.atleast_1d(np.asarray(jd1, dtype=float))
+    counts = ((ends_jd - starts_jd) / step_days).astype(int) + 2
+    sites = np.repeat(np.arange(len(starts_jd)), counts)
+    offsets = np.arange(len(sites)) - np.repeat(np.cumsum(counts) - counts, counts)
+    jd = starts_jd[sites] + (ends_jd - starts_jd)[sites] * offsets / (counts - 1)[sites]
+
+    y = f(timescale.tt_jd(jd), sites)
+    initial = y[np.cumsum(counts) - counts]
+    indices = np.flatnonzero((np.diff(y) != 0) & (sites[:-1] == sites[1:]))
+    bracket_sites = sites[indices]
+    starts = jd[indices]
+    ends = jd[indices + 1]
+    values = y[indices + 1]
+
+    end_mask = np.linspace(0.0, 1.0, num)
+    start_mask = end_mask[::-1]
+    while len(starts) and (ends - starts).max() > epsilon:
+        jd = np.multiply.outer(starts, start_mask) + np.multiply.outer(ends, end_mask)
+        y = f(timescale.tt_jd(jd.ravel()), np.repeat(bracket_sites, num)).reshape(jd.shape)
+        brackets, positions = np.nonzero(np.diff(y, axis=1))
+        bracket_sites = bracket_sites[brackets]
+        starts = jd[brackets, positions]
+        ends = jd[brackets, positions + 1]
+        values = y[brackets, positions + 1]
+
+    order = np.lexsort((ends, bracket_sites))
+    bracket_sites = bracket_sites[order]
+    ends = ends[order]
+    values = values[order]
+    splits = np.searchsorted(bracket_sites, np.arange(1, len(starts_jd)))
+    changes = list(zip(np.split(ends, splits), np.split(values, splits), strict=True))
+    return initial, changes
+
+
+def refine_dark_twilight_day(
+    timescale: Timescale,
+    ephemeris: Any,
+    latitude: float,
+    longitude: float,
+    jd0: float,
+    jd1: float,
+    guesses: npt.NDArray[np.float64],
+    values: npt.NDArray[np.int_],
+    initial: int,
+    step_days: float = 0.04,
+    half_width: float = 600.0 / 86400.0,
+    epsilon: float = EPSILON,
+    max_iterations: int = 12,
+) -> npt.NDArray[np.float64] | None:
+    """Refine guessed changes of the dark/twilight/day function.
+
+    Each change is bracketed by ``half_width`` around its guess. The window
+    is sampled at the same ``step_days`` as a full search, in the same call
+    as the bracket ends, and the guesses are only accepted if they explain
+    every sample. The Sun's altitude is then solved for the twilight
+    altitude of each change with the Illinois method, all changes at once,
+    which converges in a few calls instead of the bisection steps of a full
+    search.
+
+    Parameters
+    ----------
+    timescale : Timescale
+        The timescale for building times.
+    ephemeris : SpiceKernel
+        The ephemeris containing the Sun and Earth.
+    latitude : float
+        The latitude (decimal degrees) of the location.
+    longitude : float
+        The longitude (decimal degrees) of the location.
+    jd0 : float
+        The TT Julian date starting the search window.
+    jd1 : float
+        The TT Julian date ending the search window.
+    guesses : numpy.ndarray
+        The guessed TT Julian dates of the changes in increasing order.
+    values : numpy.ndarray
+        The value of the function after each change.
+    initial : int
+        The value of the function at the start of the window.
+    step_days : float
+        The sampling step in days checking the guesses.
+    half_width : float
+        Half of the bracket around each guess in days.
+    epsilon : float
+        The precision in days the changes are refined to.
+    max_iterations : int
+        The number of refinement calls allowed.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        The TT Julian dates of the changes, None if the guesses do not
+        match the function, e.g. when a change appears or disappears.
+    """
+    sun = ephemeris["sun"]
+    observer = ephemeris["earth"] + wgs84.latlon(latitude, longitude)
+
+    def altitude(jd: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        t = timescale.tt_jd(jd)
+        t._nutation_angles_radians = iau2000b_radians(t)
+        degrees: npt.NDArray[np.float64] = observer.at(t).observe(sun).apparent().altaz()[0].degrees
+        return degrees
+
+    chain = np.concatenate(([initial], values))
+    before = chain[:-1]
+    starts = guesses - half_width
+    ends = guesses + half_width
+    if (
+        not len(guesses)
+        or (np.abs(values - before) != 1).any()
+        or starts[0] <= jd0
+        or ends[-1] >= jd1
+        or (starts[1:] <= ends[:-1]).any()
+    ):
+        return None
+
+    samples = np.linspace(jd0, jd1, int((jd1 - jd0) / step_days) + 2)
+    positions = np.searchsorted(guesses, samples)
+    outside = np.ones(len(samples), dtype=bool)
+    for side in (positions - 1, positions):
+        nearest = guesses[np.clip(side, 0, len(guesses) - 1)]
+        outside &= np.abs(samples - nearest) > half_width
+    degrees = altitude(np.concatenate((samples[outside], starts, ends)))
+    found = np.searchsorted(TWILIGHT_DEGREES, degrees, side="right")
+    expected = np.concatenate((chain[positions[outside]], before, values))
+    if (found != expected).any():
+        return None
+
+    # The twilight altitude crossed by each change.
+    target = TWILIGHT_DEGREES[np.maximum(before, values) - 1]
+    count = np.count_nonzero(outside)
+    # The latest estimate and the end point keeping the crossing bracketed.
+    latest, other = ends, starts
+    f_latest = degrees[count + len(guesses) :] - target
+    f_other = degrees[count : count + len(guesses)] - target
+    for _ in range(max_iterations):
+        estimate = latest - f_latest * (latest - other) / (f_latest - f_other)
+        f_estimate = altitude(estimate) - target
+        crossed = np.sign(f_estimate) != np.sign(f_latest)
+        # Illinois step: halve the value of an end point kept twice.
+        other = np.where(crossed, latest, other)
+        f_other = np.where(crossed, f_latest, f_other / 2.0)
+        step = np.abs(estimate - latest)
+        latest, f_latest = estimate, f_estimate
+        if (step <= epsilon).all():
+            return np.asarray(latest, dtype=np.float64)
+    return None
@@ -6,26 +6,152 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
-from importlib.resources import files
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime, time, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
 import zoneinfo
 
-from skyfield import almanac
-from skyfield.api import load, load_file, wgs84
+import numpy as np
+import numpy.typing as npt
 
-from .exceptions import BadTimezone
+from .cache import TransitionCache
+from .engines import AnalyticEngine, EngineName, SkyfieldEngine, SolarEngine, Transitions
+from .ephemeris import load_ephemeris
+from .exceptions import BadTimezone, DateOutOfRange, EngineUnavailable
+from .grid import GridEngine, TransitionGrid
+from .metrics import metrics
+from .raster import day_raster, raster_axis
+from .store import TransitionStore
 
-__all__ = ["SolarCalculator"]
+if TYPE_CHECKING:
+    from .config import Config
 
-DATA_PATH = files("helios.data.skyfield").joinpath("de421.bsp")
+__all__ = ["TRANSITION_NAMES", "SolarCalculator"]
+
+TRANSITION_NAMES = (
+    "Astronomical Dawn",
+    "Nautical Dawn",
+    "Civil Dawn",
+    "Sunrise",
+    "Sunset",
+    "Civil Dusk",
+    "Nautical Dusk",
+    "Astronomical Dusk",
+)
+"""The names of the eight sky transitions in daily order."""
+
+TRANSITION_CHANGES = dict(
+    zip(TRANSITION_NAMES, ((0, 1), (1, 2), (2, 3), (3, 4), (4, 3), (3, 2), (2, 1), (1, 0)), strict=True)
+)
+"""The dark/twilight/day values before and after each sky transition."""
+
+WARM_UP_LOCATION = (40.8939, -83.8917)
+"""Location (latitude, longitude) used to warm up a calculator."""
+
+SECONDS_PER_DAY = 86400.0
+"""Number of seconds in a day."""
+
+LocationDay = tuple[float, float, date, str]
+"""Latitude, longitude, local date and timezone of a location's day."""
 
 
 class SolarCalculator:
-    """Class for calculating solar information."""
+    """Class for calculating solar information.
+
+    The calculator only reads from its timescale and ephemeris, so a single
+    instance can be shared across threads and requests. The sky transition
+    searches are done by an engine, which can be chosen per call.
+
+    Parameters
+    ----------
+    cache : TransitionCache, optional
+        A cache consulted before calculating sky transitions.
+    engine : EngineName
+        The engine used when a call does not ask for one.
+    grid : TransitionGrid, optional
+        A precomputed grid enabling the grid engine. Lookups the grid cannot
+        answer fall back to the engine the grid was built with.
+    ephemeris_path : Path, optional
+        The SPK file to load, the packaged DE421 ephemeris if not given.
+    store : TransitionStore, optional
+        A persistent store consulted after the cache and before calculating
+        sky transitions.
+    incremental : bool
+        Whether to refine the sky transitions of a day near those of a
+        neighboring day held in the cache, rather than searching the whole
+        day, when the engine supports it. The refined transitions can differ
+        from searched ones by a fraction of a second, so results then depend
+        on what the cache holds.
+    """
+
+    def __init__(
+        self,
+        cache: TransitionCache | None = None,
+        engine: EngineName = EngineName.skyfield,
+        grid: TransitionGrid | None = None,
+        ephemeris_path: Path | None = None,
+        store: TransitionStore | None = None,
+        incremental: bool = False,
+    ) -> None:
+        # Skyfield is loaded with the first calculator, keeping it out of
+        # the application import.
+        from skyfield.api import load
 
-    def __init__(self) -> None:
         self.timescale = load.timescale()
-        self.ephemeris = load_file(DATA_PATH)
+        self.ephemeris = load_ephemeris(ephemeris_path)
+        self.cache = cache
+        self.store = store
+        self.incremental = incremental
+        self.engine = EngineName(engine)
+        self.engines: dict[EngineName, SolarEngine] = {
+            EngineName.skyfield: SkyfieldEngine(self.timescale, self.ephemeris),
+            EngineName.analytic: AnalyticEngine(),
+        }
+        if grid is not None:
+            fallback = self.engines[EngineName(grid.metadata.engine)]
+            self.engines[EngineName.grid] = GridEngine(grid, fallback)
+        self.get_engine()
+
+    @classmethod
+    def from_config(cls, config: Config) -> SolarCalculator:
+        """Create a calculator from the application configuration.
+
+        Parameters
+        ----------
+        config : Config
+            The application configuration.
+
+        Returns
+        -------
+        SolarCalculator
+            The configured calculator.
+        """
+        cache = None
+        if config.cache_size:
+            cache = TransitionCache(config.cache_size, config.cache_ttl, config.cache_precision)
+        grid = TransitionGrid.load(config.grid_path) if config.grid_path is not None else None
+        store = None
+        if config.store_path is not None:
+            store = TransitionStore(config.store_path, config.store_max_entries, config.cache_precision)
+        return cls(
+            cache=cache,
+            engine=config.engine,
+            grid=grid,
+            ephemeris_path=config.ephemeris_path,
+            store=store,
+            incremental=config.incremental,
+        )
+
+    def warm_up(self) -> None:
+        """Run a throwaway calculation with each engine.
+
+        The ephemeris segments are memory mapped lazily, so this pulls in the
+        data the calculation needs before the first real request arrives.
+        """
+        latitude, longitude = WARM_UP_LOCATION
+        for engine in self.engines:
+            self.sky_transitions(latitude, longitude, self.get_utc().timestamp(), "UTC", engine)
 
     @classmethod
     def get_utc(cls) -> datetime:
@@ -58,17 +184,99 @@ class SolarCalculator:
         zone = zoneinfo.ZoneInfo(tz_name)
         return utcnow.astimezone(zone)
 
+    @classmethod
+    def local_date(cls, current_datetime: float, location_timezone: str) -> date:
+        """Find the local date of a timestamp.
+
+        Parameters
+        ----------
+        current_datetime : float
+            The date and time as a UNIX timestamp in UTC.
+        location_timezone : str
+            The timezone for the location.
+
+        Returns
+        -------
+        date
+            The calendar date at the location.
+
+        Raises
+        ------
+        BadTimezone
+            Raised if the timezone is unknown.
+        """
+        return cls._local_midnight(current_datetime, cls._zone(location_timezone)).date()
+
+    def get_engine(self, engine: EngineName | str | None = None) -> SolarEngine:
+        """Get a sky transitions engine.
+
+        Parameters
+        ----------
+        engine : EngineName or str, optional
+            The name of the engine, the calculator's default if not given.
+
+        Returns
+        -------
+        SolarEngine
+            The engine.
+
+        Raises
+        ------
+        EngineUnavailable
+            Raised if the calculator was not set up with the engine.
+        """
+        name = EngineName(engine) if engine is not None else self.engine
+        if name not in self.engines:
+            raise EngineUnavailable(name.value)
+        return self.engines[name]
+
+    def engine_version(self, engine: EngineName | str | None = None) -> str:
+        """Name an engine along with the version of its algorithm.
+
+        Parameters
+        ----------
+        engine : EngineName or str, optional
+            The engine to name, the calculator's default if not given.
+
+        Returns
+        -------
+        str
+            The engine name and version, e.g. ``skyfield:1``.
+        """
+        return _engine_version(self.get_engine(engine))
+
+    def date_coverage(self, engine: EngineName | str | None = None) -> tuple[date, date] | None:
+        """Find the local dates an engine can calculate anywhere.
+
+        A local day starts up to 14 hours away from its UTC midnight, so the
+        local dates leave a day out at each end of the engine's UTC ones.
+
+        Parameters
+        ----------
+        engine : EngineName or str, optional
+            The engine, the calculator's default if not given.
+
+        Returns
+        -------
+        tuple or None
+            The first and last local dates covered, None if the engine is
+            not limited.
+        """
+        return _local_coverage(self.get_engine(engine))
+
     def sky_transitions(
         self,
         latitude: float,
         longitude: float,
         current_datetime: float,
         location_timezone: str,
+        engine: EngineName | str | None = None,
     ) -> dict[str, datetime]:
         """Calculate sky transitions.
 
         This function calculates the eight sky transitions from astronomical
-        dawn to astonomical dusk.
+        dawn to astonomical dusk. If the calculator has a cache or a store,
+        they are consulted first.
 
         Parameters
         ----------
@@ -83,6 +291,9 @@ class SolarCalculator:
             the sky transitions for. Only date is used.
         location_timezone : str
             The timezone for the location.
+        engine : EngineName or str, optional
+            The engine searching for the transitions, the calculator's
+            default if not given.
 
         Returns
         -------
@@ -90,36 +301,662 @@ class SolarCalculator:
             The object containing the name of the sky transition as the key
             and the sky transition date/time.
         """
+        with metrics.stage("setup"):
+            solar_engine = self.get_engine(engine)
+            zone = self._zone(location_timezone)
+            midnight = self._local_midnight(current_datetime, zone)
+            _check_dates(solar_engine, midnight.date(), midnight.date())
+
+        day = (latitude, longitude, midnight.date(), location_timezone)
+        sky_transitions = self._recall(solar_engine, *day)
+        if sky_transitions is None:
+            seed = self._seed(solar_engine, *day)
+            sky_transitions = self._days_transitions(
+                solar_engine, [latitude], [longitude], [midnight], [zone], [seed]
+            )[0]
+            self._remember(solar_engine, [(day, sky_transitions)])
+        return sky_transitions
+
+    def sky_transitions_batch(
+        self,
+        requests: Sequence[tuple[float, float, float, str]],
+        engine: EngineName | str | None = None,
+    ) -> list[dict[str, datetime] | BadTimezone | DateOutOfRange]:
+        """Calculate sky transitions for many locations and dates.
+
+        The days missing from the cache and store are searched together,
+        which lets the engine evaluate all of the locations in a single
+        vectorized call per search step.
+
+        Parameters
+        ----------
+        requests : Sequence
+            The latitude, longitude, current date and time (UNIX timestamp in
+            UTC) and timezone of each request. See `sky_transitions` for
+            details.
+        engine : EngineName or str, optional
+            The engine searching for the transitions, the calculator's
+            default if not given.
+
+        Returns
+        -------
+        list
+            The sky transitions for each request in order, or a `BadTimezone`
+            instance if the request's timezone is unknown, or a
+            `DateOutOfRange` instance if its date is outside the engine's
+            coverage.
+        """
+        solar_engine = self.get_engine(engine)
+        results: list[dict[str, datetime] | BadTimezone | DateOutOfRange | None] = [None] * len(requests)
+        pending: list[tuple[int, float, float, datetime, zoneinfo.ZoneInfo, LocationDay]] = []
+        for index, (latitude, longitude, current_datetime, location_timezone) in enumerate(requests):
+            try:
+                zone = self._zone(location_timezone)
+            except BadTimezone as error:
+                results[index] = error
+                continue
+            midnight = self._local_midnight(current_datetime, zone)
+            try:
+                _check_dates(solar_engine, midnight.date(), midnight.date())
+            except DateOutOfRange as error:
+                results[index] = error
+                continue
+            day = (latitude, longitude, midnight.date(), location_timezone)
+            results[index] = self._recall(solar_engine, *day)
+            if results[index] is None:
+                pending.append((index, latitude, longitude, midnight, zone, day))
+
+        if pending:
+            indexes, latitudes, longitudes, midnights, zones, days = zip(*pending, strict=True)
+            seeds = [self._seed(solar_engine, *day) for day in days]
+            computed = self._days_transitions(solar_engine, latitudes, longitudes, midnights, zones, seeds)
+            self._remember(solar_engine, zip(days, computed, strict=True))
+            for index, sky_transitions in zip(indexes, computed, strict=True):
+                results[index] = sky_transitions
+        return [result for result in results if result is not None]
+
+    def sky_transitions_range(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        end_date: date,
+        location_timezone: str,
+        engine: EngineName | str | None = None,
+    ) -> dict[date, dict[str, datetime | None]]:
+        """Calculate sky transitions for every day in a date range.
+
+        A single search covers the whole range, and the transitions found are
+        split into local days. Every day carries all eight transitions, with
+        None for the ones that do not happen that day (e.g. polar summer and
+        winter).
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location. Negative is South,
+            Positive is North.
+        longitude : float
+            The longitude (decimal degrees) of the location. Negative is West,
+            Positive is East.
+        start_date : date
+            The first local date of the range.
+        end_date : date
+            The last local date of the range, included in the results.
+        location_timezone : str
+            The timezone for the location.
+        engine : EngineName or str, optional
+            The engine searching for the transitions, the calculator's
+            default if not given.
+
+        Returns
+        -------
+        dict
+            The sky transitions for each local date in order.
+        """
+        solar_engine = self.get_engine(engine)
+        zone = self._zone(location_timezone)
+        _check_dates(solar_engine, start_date, end_date)
+        midnight = datetime.combine(start_date, time(), tzinfo=zone)
+        end_midnight = datetime.combine(end_date + timedelta(days=1), time(), tzinfo=zone)
+        with metrics.stage("search"):
+            previous_e, times, events = solar_engine.search(
+                [latitude], [longitude], [midnight], [end_midnight]
+            )[0]
+
+        with metrics.stage("labelling"):
+            days: dict[date, list[tuple[datetime, int]]] = {
+                start_date + timedelta(days=i): [] for i in range((end_date - start_date).days + 1)
+            }
+            for t, e in zip(times, events, strict=True):
+                local = t.astimezone(zone)
+                days[local.date()].append((local, e))
+
+            sky_transitions_range = {}
+            for day, changes in days.items():
+                day_transitions = _label_transitions(
+                    previous_e, (t for t, _ in changes), (e for _, e in changes)
+                )
+                sky_transitions_range[day] = {name: day_transitions.get(name) for name in TRANSITION_NAMES}
+                if changes:
+                    previous_e = changes[-1][1]
+        return sky_transitions_range
+
+    def recall(
+        self,
+        latitude: float,
+        longitude: float,
+        local_date: date,
+        location_timezone: str,
+        engine: EngineName | str | None = None,
+    ) -> dict[str, datetime] | None:
+        """Look up a location's day without calculating it.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        local_date : date
+            The calendar date at the location.
+        location_timezone : str
+            The timezone for the location.
+        engine : EngineName or str, optional
+            The engine searching for the transitions, the calculator's
+            default if not given.
+
+        Returns
+        -------
+        dict or None
+            The sky transitions, None if neither the cache nor the store
+            holds the day.
+        """
+        return self._recall(self.get_engine(engine), latitude, longitude, local_date, location_timezone)
+
+    def check_positions(self, start: float, end: float) -> None:
+        """Check that the ephemeris covers a span of Sun positions.
+
+        Parameters
+        ----------
+        start : float
+            The UNIX timestamp of the first sample.
+        end : float
+            The UNIX timestamp of the last sample.
+
+        Raises
+        ------
+        DateOutOfRange
+            Raised if a sample is outside the ephemeris.
+        """
+        coverage = self.engines[EngineName.skyfield].coverage()
+        first = datetime.fromtimestamp(start, UTC).date()
+        last = datetime.fromtimestamp(end, UTC).date()
+        if coverage is not None and not coverage[0] <= first <= last <= coverage[1]:
+            raise DateOutOfRange(
+                f"Sun positions must be from {coverage[0].isoformat()} to {coverage[1].isoformat()}"
+            )
+
+    def sun_positions(
+        self, latitude: float, longitude: float, start: float, count: int, step: float
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Calculate the Sun's altitude and azimuth at evenly spaced times.
+
+        All of the times are evaluated in one vectorized call. The positions
+        are apparent, without atmospheric refraction.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        start : float
+            The UNIX timestamp of the first sample.
+        count : int
+            The number of samples.
+        step : float
+            The time between samples in seconds.
+
+        Returns
+        -------
+        tuple
+            The altitude and azimuth (degrees) of each sample.
+
+        Raises
+        ------
+        DateOutOfRange
+            Raised if a sample is outside the ephemeris.
+        """
+        from skyfield.api import wgs84
+
+        self.check_positions(start, start + (count - 1) * step)
+        with metrics.stage("setup"):
+            t0 = self.timescale.from_datetime(datetime.fromtimestamp(start, UTC))
+            times = self.timescale.tt_jd(t0.tt + np.arange(count) * (step / SECONDS_PER_DAY))
+            observer = self.ephemeris["earth"] + wgs84.latlon(latitude, longitude)
+        with metrics.stage("positions"):
+            altitude, azimuth, _ = observer.at(times).observe(self.ephemeris["sun"]).apparent().altaz()
+        return altitude.degrees, azimuth.degrees
+
+    def day_raster(
+        self,
+        day: date,
+        min_latitude: float,
+        max_latitude: float,
+        min_longitude: float,
+        max_longitude: float,
+        resolution: float,
+        engine: EngineName | str | None = None,
+    ) -> npt.NDArray[np.float32]:
+        """Calculate sunrise, sunset and day length over a region.
+
+        Parameters
+        ----------
+        day : date
+            The date of the raster.
+        min_latitude : float
+            The southern edge (decimal degrees) of the region.
+        max_latitude : float
+            The northern edge (decimal degrees) of the region.
+        min_longitude : float
+            The western edge (decimal degrees) of the region.
+        max_longitude : float
+            The eastern edge (decimal degrees) of the region.
+        resolution : float
+            The pixel size in degrees.
+        engine : EngineName or str, optional
+            The engine searching for the transitions, the calculator's
+            default if not given.
+
+        Returns
+        -------
+        numpy.ndarray
+            The sunrise, sunset and day length bands by row (North first) and
+            column (West first), as described by ``raster.day_raster``.
+
+        Raises
+        ------
+        DateOutOfRange
+            Raised if the date is outside the engine's coverage.
+        """
+        solar_engine = self.get_engine(engine)
+        _check_dates(solar_engine, day, day)
+        latitudes = raster_axis(min_latitude, max_latitude, resolution)[::-1]
+        longitudes = raster_axis(min_longitude, max_longitude, resolution)
+        with metrics.stage("raster"):
+            return day_raster(solar_engine, day, latitudes, longitudes)
+
+    def precompute_range(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        end_date: date,
+        location_timezone: str,
+        engine: EngineName | str | None = None,
+    ) -> dict[date, dict[str, datetime]]:
+        """Calculate sky transitions for a date range and remember each day.
+
+        Unlike the range calculation, every day is added to the cache and the
+        store, so later single day lookups do not calculate again.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        start_date : date
+            The first local date of the range.
+        end_date : date
+            The last local date of the range, included in the results.
+        location_timezone : str
+            The timezone for the location.
+        engine : EngineName or str, optional
+            The engine searching for the transitions, the calculator's
+            default if not given.
+
+        Returns
+        -------
+        dict
+            The sky transitions happening on each local date in order.
+        """
+        solar_engine = self.get_engine(engine)
+        days = {
+            day: {name: t for name, t in sky_transitions.items() if t is not None}
+            for day, sky_transitions in self.sky_transitions_range(
+                latitude, longitude, start_date, end_date, location_timezone, engine
+            ).items()
+        }
+        self._remember(
+            solar_engine,
+            (((latitude, longitude, day, location_timezone), st) for day, st in days.items()),
+        )
+        return days
+
+    def _recall(
+        self,
+        solar_engine: SolarEngine,
+        latitude: float,
+        longitude: float,
+        local_date: date,
+        location_timezone: str,
+    ) -> dict[str, datetime] | None:
+        """Look up a location's day in the cache, then in the store.
+
+        Days found in the store are added to the cache.
+
+        Parameters
+        ----------
+        solar_engine : SolarEngine
+            The engine searching for the transitions.
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        local_date : date
+            The calendar date at the location.
+        location_timezone : str
+            The timezone for the location.
+
+        Returns
+        -------
+        dict or None
+            The sky transitions, None if neither holds the day.
+        """
+        sky_transitions = None
+        if self.cache is not None:
+            cache_key = self.cache.key(latitude, longitude, local_date, location_timezone, solar_engine.name)
+            sky_transitions = self.cache.get(cache_key)
+        if sky_transitions is None and self.store is not None:
+            store_key = self.store.key(
+                latitude, longitude, local_date, location_timezone, _engine_version(solar_engine)
+            )
+            sky_transitions = self.store.get(store_key)
+            if sky_transitions is not None and self.cache is not None:
+                self.cache.put(cache_key, sky_transitions)
+        return sky_transitions
+
+    def _seed(
+        self,
+        solar_engine: SolarEngine,
+        latitude: float,
+        longitude: float,
+        local_date: date,
+        location_timezone: str,
+    ) -> Transitions | None:
+        """Guess a location's day from a neighboring day in the cache.
+
+        The transitions of the day before, or else after, are shifted by a
+        day. Only the cache is consulted, as the guesses just narrow the
+        search and are not worth a store lookup.
+
+        Parameters
+        ----------
+        solar_engine : SolarEngine
+            The engine searching for the transitions.
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        local_date : date
+            The calendar date at the location.
+        location_timezone : str
+            The timezone for the location.
+
+        Returns
+        -------
+        Transitions or None
+            The guessed transitions, None if incremental searches are off or
+            neither neighboring day is cached.
+        """
+        if not self.incremental or self.cache is None:
+            return None
+        for days in (1, -1):
+            neighbor = local_date - timedelta(days=days)
+            key = self.cache.key(latitude, longitude, neighbor, location_timezone, solar_engine.name)
+            sky_transitions = self.cache.peek(key)
+            if sky_transitions:
+                shift = timedelta(days=days)
+                changes = sorted(
+                    (t.astimezone(UTC) + shift, TRANSITION_CHANGES[name])
+                    for name, t in sky_transitions.items()
+                )
+                return (changes[0][1][0], [t for t, _ in changes], [after for _, (_, after) in changes])
+        return None
+
+    def _remember(
+        self,
+        solar_engine: SolarEngine,
+        days: Iterable[tuple[LocationDay, dict[str, datetime]]],
+    ) -> None:
+        """Add calculated days to the cache and the store.
+
+        Parameters
+        ----------
+        solar_engine : SolarEngine
+            The engine that searched for the transitions.
+        days : Iterable
+            The location day and sky transitions of each calculated day.
+        """
+        if self.cache is None and self.store is None:
+            return
+        stored = []
+        for day, sky_transitions in days:
+            if self.cache is not None:
+                self.cache.put(self.cache.key(*day, solar_engine.name), sky_transitions)
+            if self.store is not None:
+                stored.append((self.store.key(*day, _engine_version(solar_engine)), sky_transitions))
+        if self.store is not None:
+            self.store.put_many(stored)
+
+    @staticmethod
+    def _zone(location_timezone: str) -> zoneinfo.ZoneInfo:
+        """Look up a timezone.
+
+        Parameters
+        ----------
+        location_timezone : str
+            The timezone name.
+
+        Returns
+        -------
+        zoneinfo.ZoneInfo
+            The timezone.
+
+        Raises
+        ------
+        BadTimezone
+            Raised if the timezone is unknown.
+        """
         try:
-            zone = zoneinfo.ZoneInfo(location_timezone)
-        except zoneinfo.ZoneInfoNotFoundError:
-            raise BadTimezone from None
+            return zoneinfo.ZoneInfo(location_timezone)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise BadTimezone(location_timezone) from None
+
+    @staticmethod
+    def _local_midnight(current_datetime: float, zone: zoneinfo.ZoneInfo) -> datetime:
+        """Find the local midnight starting the day of a timestamp.
+
+        Parameters
+        ----------
+        current_datetime : float
+            The date and time as a UNIX timestamp in UTC.
+        zone : zoneinfo.ZoneInfo
+            The timezone for the location.
+
+        Returns
+        -------
+        datetime
+            The local midnight.
+        """
         now = datetime.fromtimestamp(current_datetime).astimezone(zone)
-        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        next_midnight = midnight + timedelta(days=1)
-
-        t0 = self.timescale.from_datetime(midnight)
-        t1 = self.timescale.from_datetime(next_midnight)
-
-        location = wgs84.latlon(latitude, longitude)
-        f = almanac.dark_twilight_day(self.ephemeris, location)
-        times, events = almanac.find_discrete(t0, t1, f)
-
-        previous_e = f(t0).item()
-        sky_transitions = {}
-        for t, e in zip(times, events, strict=False):
-            if previous_e < e:
-                key = f"{almanac.TWILIGHTS[e]} starts"
-                if "twilight starts" in key:
-                    key = key.replace("twilight starts", "Dawn")
-                if "Day starts" in key:
-                    key = "Sunrise"
-            else:
-                key = f"{almanac.TWILIGHTS[previous_e]} ends"
-                if "twilight ends" in key:
-                    key = key.replace("twilight ends", "Dusk")
-                if "Day ends" in key:
-                    key = "Sunset"
-            sky_transitions[key] = t.astimezone(zone)
-            previous_e = e
-        return sky_transitions
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _days_transitions(
+        solar_engine: SolarEngine,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        midnights: Sequence[datetime],
+        zones: Sequence[zoneinfo.ZoneInfo],
+        seeds: Sequence[Transitions | None] | None = None,
+    ) -> list[dict[str, datetime]]:
+        """Search for the sky transitions of local days.
+
+        Days with guessed transitions are refined first, the others and the
+        ones the engine could not refine are searched together.
+
+        Parameters
+        ----------
+        solar_engine : SolarEngine
+            The engine searching for the transitions.
+        latitudes : Sequence
+            The latitude (decimal degrees) of each location.
+        longitudes : Sequence
+            The longitude (decimal degrees) of each location.
+        midnights : Sequence
+            The local midnight starting each day.
+        zones : Sequence
+            The timezone for each location.
+        seeds : Sequence, optional
+            The guessed transitions for each day, None for days without.
+
+        Returns
+        -------
+        list
+            The sky transitions for each day.
+        """
+        next_midnights = [midnight + timedelta(days=1) for midnight in midnights]
+        transitions: list[Transitions | None] = [None] * len(midnights)
+        if seeds is not None and any(seed is not None for seed in seeds):
+            with metrics.stage("refine"):
+                for i, seed in enumerate(seeds):
+                    if seed is not None:
+                        transitions[i] = solar_engine.refine(
+                            latitudes[i], longitudes[i], midnights[i], next_midnights[i], seed
+                        )
+        pending = [i for i, found in enumerate(transitions) if found is None]
+        if pending:
+            with metrics.stage("search"):
+                searched = solar_engine.search(
+                    [latitudes[i] for i in pending],
+                    [longitudes[i] for i in pending],
+                    [midnights[i] for i in pending],
+                    [next_midnights[i] for i in pending],
+                )
+            for i, found in zip(pending, searched, strict=True):
+                transitions[i] = found
+        with metrics.stage("labelling"):
+            return [
+                _localize(day, zone) for day, zone in zip(transitions, zones, strict=True) if day is not None
+            ]
+
+
+def _engine_version(solar_engine: SolarEngine) -> str:
+    """Name an engine along with the version of its algorithm."""
+    return f"{solar_engine.name.value}:{solar_engine.version}"
+
+
+def _localize(transitions: Transitions, zone: zoneinfo.ZoneInfo) -> dict[str, datetime]:
+    """Name a day's transitions and convert them to local date/times.
+
+    Parameters
+    ----------
+    transitions : Transitions
+        The transitions found by an engine for the day.
+    zone : zoneinfo.ZoneInfo
+        The timezone for the location.
+
+    Returns
+    -------
+    dict
+        The object containing the name of the sky transition as the key
+        and the sky transition date/time.
+    """
+    previous_e, times, events = transitions
+    return _label_transitions(previous_e, (t.astimezone(zone) for t in times), events)
+
+
+def _label_transitions(
+    previous_e: int, times: Iterable[datetime], events: Iterable[int]
+) -> dict[str, datetime]:
+    """Name the changes of the dark, twilight and day function.
+
+    Parameters
+    ----------
+    previous_e : int
+        The value of the function before the first change.
+    times : Iterable
+        The local date/times of the changes.
+    events : Iterable
+        The values of the function after each change.
+
+    Returns
+    -------
+    dict
+        The object containing the name of the sky transition as the key
+        and the sky transition date/time.
+    """
+    from skyfield import almanac
+
+    sky_transitions = {}
+    for t, e in zip(times, events, strict=False):
+        if previous_e < e:
+            key = f"{almanac.TWILIGHTS[e]} starts"
+            if "twilight starts" in key:
+                key = key.replace("twilight starts", "Dawn")
+            if "Day starts" in key:
+                key = "Sunrise"
+        else:
+            key = f"{almanac.TWILIGHTS[previous_e]} ends"
+            if "twilight ends" in key:
+                key = key.replace("twilight ends", "Dusk")
+            if "Day ends" in key:
+                key = "Sunset"
+        sky_transitions[key] = t
+        previous_e = e
+    return sky_transitions
+
+
+def _local_coverage(solar_engine: SolarEngine) -> tuple[date, date] | None:
+    """Find the local dates an engine can calculate anywhere.
+
+    Parameters
+    ----------
+    solar_engine : SolarEngine
+        The engine.
+
+    Returns
+    -------
+    tuple or None
+        The first and last local dates covered, None if the engine is not
+        limited.
+    """
+    coverage = solar_engine.coverage()
+    if coverage is None:
+        return None
+    return coverage[0] + timedelta(days=1), coverage[1] - timedelta(days=1)
+
+
+def _check_dates(solar_engine: SolarEngine, first: date, last: date) -> None:
+    """Check that an engine can calculate a span of local dates.
+
+    Parameters
+    ----------
+    solar_engine : SolarEngine
+        The engine.
+    first : date
+        The first local date of the span.
+    last : date
+        The last local date of the span.
+
+    Raises
+    ------
+    DateOutOfRange
+        Raised if a date is outside the engine's coverage.
+    """
+    coverage = _local_coverage(solar_engine)
+    if coverage is not None and not coverage[0] <= first <= last <= coverage[1]:
+        raise DateOutOfRange(f"Dates must be from {coverage[0].isoformat()} to {coverage[1].isoformat()}")
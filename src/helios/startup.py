@@ -0,0 +1,191 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for measuring the application startup.
+
+The measurement needs a fresh interpreter, so it is run with
+``python -m helios.startup`` or ``helios startup``.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+from datetime import UTC, datetime
+import importlib
+import importlib.util
+import json
+import subprocess
+import sys
+import time
+from typing import Any
+from urllib.parse import urlencode
+
+__all__ = ["STARTUP_STAGES", "measure_startup", "run_startup_report"]
+
+STARTUP_STAGES = ("import", "app", "ephemeris", "warm_up", "executor", "first_request")
+"""The stages of a startup in order."""
+
+APPLICATION = "helios.main"
+"""The module defining the application."""
+
+
+def measure_startup() -> dict[str, float]:
+    """Time each stage of starting the application in this interpreter.
+
+    The stages are importing the modules the application is built from,
+    creating the application, creating the calculator (which loads skyfield,
+    the timescale and the ephemeris), warming up the calculator, starting
+    the executor and serving the first ``/sky_transitions`` request.
+
+    Returns
+    -------
+    dict
+        The seconds spent in each stage, in order.
+
+    Raises
+    ------
+    RuntimeError
+        Raised if the application is already imported.
+    """
+    if APPLICATION in sys.modules:
+        raise RuntimeError(f"{APPLICATION} is already imported, measure in a fresh interpreter.")
+    timings: dict[str, float] = {}
+
+    begin = time.perf_counter()
+    for name in _imported_modules(APPLICATION):
+        importlib.import_module(name)
+    timings["import"] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    main = importlib.import_module(APPLICATION)
+    timings["app"] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    main.calculator_dependency.initialize(warm_up=False)
+    timings["ephemeris"] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    main.calculator_dependency.calculator.warm_up()
+    timings["warm_up"] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    main.executor_dependency.initialize()
+    timings["executor"] = time.perf_counter() - begin
+
+    try:
+        query = urlencode(
+            {"cdatetime": datetime.now(UTC).timestamp(), "tz": "UTC", "lat": 40.8939, "lon": -83.8917}
+        )
+        begin = time.perf_counter()
+        status_code = asyncio.run(_get(main.app, "/sky_transitions", query))
+        timings["first_request"] = time.perf_counter() - begin
+    finally:
+        main.executor_dependency.close()
+        main.calculator_dependency.close()
+    if status_code != 200:
+        raise RuntimeError(f"The first request failed with status {status_code}.")
+    return timings
+
+
+def run_startup_report() -> dict[str, float]:
+    """Measure the application startup in a fresh interpreter.
+
+    Returns
+    -------
+    dict
+        The seconds spent in each stage, in order.
+
+    Raises
+    ------
+    RuntimeError
+        Raised if the measurement fails.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "helios.startup"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip() or "The startup measurement failed.")
+    timings: dict[str, float] = json.loads(result.stdout)
+    return timings
+
+
+def _imported_modules(name: str) -> list[str]:
+    """List the modules imported at the top of a module.
+
+    Parameters
+    ----------
+    name : str
+        The module name.
+
+    Returns
+    -------
+    list
+        The absolute names of the imported modules.
+    """
+    spec = importlib.util.find_spec(name)
+    assert spec is not None and spec.origin is not None
+    with open(spec.origin) as ifile:
+        tree = ast.parse(ifile.read())
+    package = name.rpartition(".")[0]
+    modules: list[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module != "__future__":
+            module = "." * node.level + (node.module or "")
+            modules.append(importlib.util.resolve_name(module, package) if node.level else module)
+    return modules
+
+
+async def _get(app: Any, path: str, query: str) -> int:
+    """Send a GET request straight to an ASGI application.
+
+    Parameters
+    ----------
+    app : ASGI application
+        The application.
+    path : str
+        The request path.
+    query : str
+        The encoded query string.
+
+    Returns
+    -------
+    int
+        The response status code.
+    """
+    status_code = 0
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    await app(scope, receive, send)
+    return status_code
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure_startup()))
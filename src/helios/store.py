@@ -0,0 +1,250 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Module for the persistent sky transitions store."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, datetime
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+import zoneinfo
+
+from .models import StoreStatus
+
+__all__ = ["StoreKey", "TransitionStore"]
+
+StoreKey = tuple[float, float, str, str, str]
+"""Store key of rounded latitude, rounded longitude, local date (ISO format),
+zone and engine (name and version)."""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    local_date TEXT NOT NULL,
+    timezone TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    transitions TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (latitude, longitude, local_date, timezone, engine)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transitions_created ON transitions (created);
+"""
+"""Schema of the store database."""
+
+
+class TransitionStore:
+    """Persistent store of sky transitions shared across processes.
+
+    The store is a SQLite database in WAL mode, so any number of worker
+    processes can read while one writes. Every thread gets its own
+    connection. The store is compacted every ``compact_interval`` writes by
+    a process: the oldest entries beyond ``max_entries`` are deleted and the
+    freed pages returned to the file system.
+
+    Parameters
+    ----------
+    path : Path
+        The database file. It is created if needed.
+    max_entries : int
+        The number of location days kept.
+    precision : int
+        The number of decimal places latitude and longitude are rounded to
+        when building a key.
+    compact_interval : int
+        The number of writes between compactions.
+    """
+
+    def __init__(
+        self, path: Path, max_entries: int = 1_000_000, precision: int = 4, compact_interval: int = 1000
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.precision = precision
+        self.compact_interval = compact_interval
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it if needed.
+
+        Returns
+        -------
+        sqlite3.Connection
+            The connection of the calling thread.
+        """
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            # Incremental vacuuming only takes effect on a new database.
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def key(
+        self, latitude: float, longitude: float, local_date: date, location_timezone: str, engine: str
+    ) -> StoreKey:
+        """Build the key for a location's day.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude (decimal degrees) of the location.
+        longitude : float
+            The longitude (decimal degrees) of the location.
+        local_date : date
+            The calendar date at the location.
+        location_timezone : str
+            The timezone for the location.
+        engine : str
+            The name and version of the engine calculating the sky
+            transitions, so results of an older algorithm are not reused.
+
+        Returns
+        -------
+        StoreKey
+            The key for the location's day.
+        """
+        return (
+            round(latitude, self.precision),
+            round(longitude, self.precision),
+            local_date.isoformat(),
+            location_timezone,
+            engine,
+        )
+
+    def get(self, key: StoreKey) -> dict[str, datetime] | None:
+        """Look up the sky transitions for a key.
+
+        Parameters
+        ----------
+        key : StoreKey
+            The key for the location's day.
+
+        Returns
+        -------
+        dict or None
+            The stored sky transitions in the key's timezone, None if
+            missing.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT transitions FROM transitions WHERE latitude = ? AND longitude = ? "
+                "AND local_date = ? AND timezone = ? AND engine = ?",
+                key,
+            )
+            .fetchone()
+        )
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        zone = zoneinfo.ZoneInfo(key[3])
+        return {name: datetime.fromtimestamp(timestamp, zone) for name, timestamp in json.loads(row[0])}
+
+    def put(self, key: StoreKey, sky_transitions: dict[str, datetime]) -> None:
+        """Store the sky transitions for a key.
+
+        Parameters
+        ----------
+        key : StoreKey
+            The key for the location's day.
+        sky_transitions : dict
+            The sky transitions to store.
+        """
+        self.put_many([(key, sky_transitions)])
+
+    def put_many(self, items: Iterable[tuple[StoreKey, dict[str, datetime]]]) -> None:
+        """Store the sky transitions for many keys in one transaction.
+
+        Parameters
+        ----------
+        items : Iterable
+            The key and sky transitions of each location day.
+        """
+        created = time.time()
+        rows = [
+            (*key, json.dumps([[name, t.timestamp()] for name, t in sky_transitions.items()]), created)
+            for key, sky_transitions in items
+        ]
+        connection = self._connection()
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO transitions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        with self._lock:
+            previous = self.writes
+            self.writes += len(rows)
+            due = self.writes // self.compact_interval > previous // self.compact_interval
+        if due:
+            self.compact()
+
+    def compact(self) -> int:
+        """Delete the oldest entries beyond the limit and free their pages.
+
+        Returns
+        -------
+        int
+            The number of entries deleted.
+        """
+        connection = self._connection()
+        with connection:
+            deleted = connection.execute(
+                "DELETE FROM transitions WHERE created <= ("
+                "SELECT created FROM transitions ORDER BY created DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        connection.execute("PRAGMA incremental_vacuum")
+        with self._lock:
+            self.evictions += deleted
+        return deleted
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM transitions")
+
+    def __len__(self) -> int:
+        """Return the number of entries held."""
+        count: int = self._connection().execute("SELECT COUNT(*) FROM transitions").fetchone()[0]
+        return count
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def status(self) -> StoreStatus:
+        """Report the store usage.
+
+        Returns
+        -------
+        StoreStatus
+            The current store usage of this process.
+        """
+        return StoreStatus(
+            size=len(self),
+            max_size=self.max_entries,
+            hits=self.hits,
+            misses=self.misses,
+            writes=self.writes,
+            evictions=self.evictions,
+        )
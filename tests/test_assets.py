@@ -0,0 +1,76 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the static assets."""
+
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+import random
+
+from helios.assets import StaticAssets, build_variants, choose_encoding
+
+
+def test_choose_encoding() -> None:
+    assert choose_encoding(None, ["br", "gzip"]) is None
+    assert choose_encoding("gzip, deflate", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("*;q=0", ["gzip"]) is None
+    assert choose_encoding("identity", ["gzip"]) is None
+    assert choose_encoding("gzip", []) is None
+
+
+def test_build_variants(tmp_path: Path) -> None:
+    (tmp_path / "css").mkdir()
+    style = tmp_path / "css" / "site.css"
+    style.write_text("body { margin: 0; }\n" * 200)
+    noise = tmp_path / "noise.bin"
+    noise.write_bytes(random.Random(0).randbytes(512))
+    (tmp_path / "noise.bin.gz").write_bytes(b"stale")
+
+    written = build_variants(tmp_path)
+    assert tmp_path / "css" / "site.css.gz" in written
+    assert gzip.decompress((tmp_path / "css" / "site.css.gz").read_bytes()) == style.read_bytes()
+    assert not (tmp_path / "noise.bin.gz").exists()
+    assert build_variants(tmp_path) == written
+    assert (tmp_path / "css" / "site.css.gz").read_bytes() == gzip.compress(
+        style.read_bytes(), compresslevel=9, mtime=0
+    )
+
+
+def test_static_assets(tmp_path: Path) -> None:
+    (tmp_path / "css").mkdir()
+    style = tmp_path / "css" / "site.css"
+    style.write_text("body { margin: 0; }\n" * 200)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG")
+    build_variants(tmp_path)
+
+    assets = StaticAssets(tmp_path)
+    assert len(assets) == 2
+    hashed = assets.hashed_path("css/site.css")
+    assert hashed.startswith("css/site.") and hashed.endswith(".css")
+    assert hashed != "css/site.css"
+
+    found = assets.get(hashed)
+    assert found is not None
+    asset, is_hashed = found
+    assert is_hashed
+    assert asset.media_type == "text/css; charset=utf-8"
+    assert asset.body == style.read_bytes()
+    assert list(asset.variants) == ["gzip"]
+    assert asset.etag == f'"{hashed.split(".")[1]}"'
+
+    found = assets.get("/css/site.css")
+    assert found is not None and found[0] is asset and not found[1]
+    assert assets.get("css/site.css.gz") is None
+    assert assets.get("css/other.css") is None
+
+    style.write_text("body { margin: 1em; }\n" * 200)
+    assets = StaticAssets(tmp_path)
+    assert assets.hashed_path("css/site.css") != hashed
+    found = assets.get("css/site.css")
+    assert found is not None and found[0].variants == {}
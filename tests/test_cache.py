@@ -0,0 +1,74 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for sky transitions cache."""
+
+from __future__ import annotations
+
+import datetime
+from unittest.mock import patch
+
+from helios.cache import TransitionCache
+
+SKY_TRANSITIONS = {"Sunrise": datetime.datetime(2023, 3, 3, 12, 6, 49, tzinfo=datetime.UTC)}
+
+
+def test_key() -> None:
+    cache = TransitionCache(precision=2)
+    key = cache.key(40.8939, -83.8917, datetime.date(2023, 3, 3), "US/Eastern", "skyfield")
+    assert key == (40.89, -83.89, datetime.date(2023, 3, 3), "US/Eastern", "skyfield")
+
+
+def test_get_and_put() -> None:
+    cache = TransitionCache()
+    key = cache.key(40.8939, -83.8917, datetime.date(2023, 3, 3), "US/Eastern", "skyfield")
+    assert cache.get(key) is None
+    cache.put(key, SKY_TRANSITIONS)
+    value = cache.get(key)
+    assert value == SKY_TRANSITIONS
+    assert value is not SKY_TRANSITIONS
+    status = cache.status()
+    assert status.size == 1
+    assert status.hits == 1
+    assert status.misses == 1
+    assert status.evictions == 0
+
+
+def test_size_limit() -> None:
+    cache = TransitionCache(max_size=2)
+    keys = [
+        cache.key(40.0, -83.0, datetime.date(2023, 3, day), "US/Eastern", "skyfield") for day in range(1, 4)
+    ]
+    cache.put(keys[0], SKY_TRANSITIONS)
+    cache.put(keys[1], SKY_TRANSITIONS)
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], SKY_TRANSITIONS)
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.status().evictions == 1
+
+
+def test_ttl() -> None:
+    cache = TransitionCache(ttl=10.0)
+    key = cache.key(40.0, -83.0, datetime.date(2023, 3, 3), "US/Eastern", "skyfield")
+    with patch("helios.cache.time.monotonic", return_value=100.0):
+        cache.put(key, SKY_TRANSITIONS)
+    with patch("helios.cache.time.monotonic", return_value=105.0):
+        assert cache.get(key) is not None
+    with patch("helios.cache.time.monotonic", return_value=110.0):
+        assert cache.get(key) is None
+    assert len(cache) == 0
+    assert cache.status().evictions == 1
+
+
+def test_peek() -> None:
+    cache = TransitionCache()
+    key = cache.key(40.8939, -83.8917, datetime.date(2023, 3, 3), "US/Eastern", "skyfield")
+    assert cache.peek(key) is None
+    cache.put(key, SKY_TRANSITIONS)
+    assert cache.peek(key) == SKY_TRANSITIONS
+    status = cache.status()
+    assert status.hits == 0
+    assert status.misses == 0
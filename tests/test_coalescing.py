@@ -0,0 +1,75 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for sharing identical concurrent calculations."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Any
+
+import pytest
+
+from helios.coalescing import SingleFlight
+
+
+def test_single_flight() -> None:
+    single_flight = SingleFlight()
+    calls: list[str] = []
+
+    async def calculate(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return key.upper()
+
+    async def run() -> list[str]:
+        tasks = [single_flight.run(key, functools.partial(calculate, key)) for key in "aaab"]
+        results = list(await asyncio.gather(*tasks))
+        assert len(single_flight) == 0
+        results.append(await single_flight.run("a", lambda: calculate("a")))
+        return results
+
+    assert asyncio.run(run()) == ["A", "A", "A", "B", "A"]
+    assert calls == ["a", "b", "a"]
+    assert single_flight.leaders == 3
+    assert single_flight.coalesced == 2
+
+
+def test_single_flight_error() -> None:
+    single_flight = SingleFlight()
+
+    async def calculate() -> None:
+        await asyncio.sleep(0.05)
+        raise ValueError("bad")
+
+    async def run() -> list[Any]:
+        tasks = [single_flight.run("key", calculate) for _ in range(3)]
+        return list(await asyncio.gather(*tasks, return_exceptions=True))
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert single_flight.coalesced == 2
+
+
+def test_single_flight_cancelled_leader() -> None:
+    single_flight = SingleFlight()
+
+    async def calculate() -> int:
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run() -> int:
+        leader = asyncio.create_task(single_flight.run("key", calculate))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.run("key", calculate))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        result: int = await follower
+        return result
+
+    assert asyncio.run(run()) == 42
+    assert single_flight.leaders == 1
@@ -0,0 +1,42 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for HTTP caching of location day responses."""
+
+from __future__ import annotations
+
+import datetime
+
+from helios.conditional import cache_headers, day_etag, none_match
+
+
+def test_day_etag() -> None:
+    day = datetime.date(2023, 3, 3)
+    etag = day_etag(40.8939, -83.8917, day, "US/Eastern", "skyfield:1")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == day_etag(40.8939, -83.8917, day, "US/Eastern", "skyfield:1")
+    assert etag != day_etag(40.8939, -83.8917, day, "US/Eastern", "skyfield:2")
+    assert etag != day_etag(40.8939, -83.8917, day + datetime.timedelta(days=1), "US/Eastern", "skyfield:1")
+
+    # Locations sharing a cache key share the tag.
+    rounded = day_etag(40.89391, -83.89168, day, "US/Eastern", "skyfield:1", precision=4)
+    assert rounded == day_etag(40.8939, -83.8917, day, "US/Eastern", "skyfield:1", precision=4)
+    assert rounded != day_etag(40.89391, -83.89168, day, "US/Eastern", "skyfield:1")
+
+
+def test_cache_headers() -> None:
+    now = datetime.datetime(2023, 3, 3, 19, 56, 0, tzinfo=datetime.UTC)
+    headers = cache_headers('"abc"', "US/Eastern", now)
+    assert headers == {"ETag": '"abc"', "Cache-Control": "public, max-age=32640"}
+    # The spring forward day is an hour shorter.
+    now = datetime.datetime(2023, 3, 12, 5, 0, 0, tzinfo=datetime.UTC)
+    assert cache_headers('"abc"', "US/Eastern", now)["Cache-Control"] == "public, max-age=82800"
+
+
+def test_none_match() -> None:
+    assert not none_match(None, '"abc"')
+    assert none_match('"abc"', '"abc"')
+    assert none_match('"xyz", W/"abc"', '"abc"')
+    assert none_match("*", '"abc"')
+    assert not none_match('"xyz"', '"abc"')
@@ -0,0 +1,38 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for application dependencies."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from helios.dependencies import CalculatorDependency
+from helios.solar_calculator import SolarCalculator
+
+
+def test_calculator_is_shared() -> None:
+    dependency = CalculatorDependency()
+    first = asyncio.run(dependency())
+    second = asyncio.run(dependency())
+    assert isinstance(first, SolarCalculator)
+    assert first is second
+
+
+def test_initialize_warms_up() -> None:
+    dependency = CalculatorDependency()
+    with patch("helios.solar_calculator.SolarCalculator.warm_up") as warm_up:
+        dependency.initialize()
+        warm_up.assert_called_once()
+        dependency.close()
+        dependency.initialize(warm_up=False)
+        warm_up.assert_called_once()
+
+
+def test_close() -> None:
+    dependency = CalculatorDependency()
+    first = dependency.calculator
+    dependency.close()
+    assert dependency.calculator is not first
@@ -0,0 +1,97 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for sky transition engines."""
+
+from __future__ import annotations
+
+import datetime
+import itertools
+
+import pytest
+
+from helios.engines import AnalyticEngine, EngineName, SkyfieldEngine
+from helios.solar_calculator import SolarCalculator
+
+LONGITUDE_ZONES = [(-75.0, "Etc/GMT+5"), (0.0, "UTC"), (135.0, "Etc/GMT-9")]
+SEASONS = [
+    datetime.date(2024, 3, 20),
+    datetime.date(2024, 6, 21),
+    datetime.date(2024, 9, 22),
+    datetime.date(2024, 12, 21),
+]
+
+
+def analytic_deviations(latitudes: list[float], names: tuple[str, ...] | None = None) -> tuple[int, float]:
+    h = SolarCalculator()
+    requests = []
+    for latitude, (longitude, timezone), day in itertools.product(latitudes, LONGITUDE_ZONES, SEASONS):
+        current_datetime = datetime.datetime.combine(day, datetime.time(12), tzinfo=datetime.UTC).timestamp()
+        requests.append((latitude, longitude, current_datetime, timezone))
+    analytic = h.sky_transitions_batch(requests, EngineName.analytic)
+    skyfield = h.sky_transitions_batch(requests, EngineName.skyfield)
+    mismatches = 0
+    deviation = 0.0
+    for expected, result in zip(skyfield, analytic, strict=True):
+        assert isinstance(expected, dict)
+        assert isinstance(result, dict)
+        if expected.keys() != result.keys():
+            mismatches += 1
+        for name in expected.keys() & result.keys():
+            if names is None or name in names:
+                deviation = max(deviation, abs((expected[name] - result[name]).total_seconds()))
+    return mismatches, deviation
+
+
+def test_engine_names() -> None:
+    h = SolarCalculator()
+    assert isinstance(h.get_engine(), SkyfieldEngine)
+    assert isinstance(h.get_engine("analytic"), AnalyticEngine)
+    assert h.get_engine(EngineName.skyfield).name == EngineName.skyfield
+    with pytest.raises(ValueError):
+        h.get_engine("ptolemy")
+
+
+def test_engine_coverage() -> None:
+    h = SolarCalculator()
+    assert h.get_engine().coverage() == (datetime.date(1899, 7, 29), datetime.date(2053, 10, 8))
+    assert h.date_coverage() == (datetime.date(1899, 7, 30), datetime.date(2053, 10, 7))
+    assert h.get_engine("analytic").coverage() is None
+    assert h.date_coverage("analytic") is None
+
+
+def test_analytic_mid_latitudes() -> None:
+    mismatches, deviation = analytic_deviations([-60.0, -45.0, -30.0, -15.0, 0.0, 15.0, 30.0, 45.0, 60.0])
+    assert mismatches == 0
+    assert deviation < 30.0
+
+
+def test_analytic_high_latitudes() -> None:
+    mismatches, deviation = analytic_deviations([-66.0, 64.0, 66.0], ("Sunrise", "Sunset"))
+    assert mismatches == 0
+    assert deviation < 60.0
+
+
+def test_analytic_polar() -> None:
+    h = SolarCalculator()
+    current_datetime = datetime.datetime(2024, 6, 21, 12, tzinfo=datetime.UTC).timestamp()
+    assert h.sky_transitions(78.2232, 15.6267, current_datetime, "Arctic/Longyearbyen", "analytic") == {}
+    st = h.sky_transitions(-78.2232, 15.6267, current_datetime, "UTC", "analytic")
+    expected = h.sky_transitions(-78.2232, 15.6267, current_datetime, "UTC")
+    assert list(st.keys()) == ["Astronomical Dawn", "Nautical Dawn", "Nautical Dusk", "Astronomical Dusk"]
+    assert st.keys() == expected.keys()
+
+
+def test_analytic_range() -> None:
+    h = SolarCalculator()
+    start = datetime.date(2024, 1, 1)
+    end = datetime.date(2024, 12, 31)
+    analytic = h.sky_transitions_range(40.8939, -83.8917, start, end, "US/Eastern", "analytic")
+    assert len(analytic) == 366
+    for day in (start, datetime.date(2024, 3, 10), datetime.date(2024, 11, 3), end):
+        current_datetime = datetime.datetime.combine(day, datetime.time(12)).timestamp()
+        expected = h.sky_transitions(40.8939, -83.8917, current_datetime, "US/Eastern")
+        for name, value in analytic[day].items():
+            assert value is not None
+            assert abs((value - expected[name]).total_seconds()) < 30.0
@@ -0,0 +1,72 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for loading and trimming the ephemeris."""
+
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from jplephem.spk import SPK
+
+from helios.cli import main
+from helios.dependencies import calculator_dependency
+from helios.ephemeris import DATA_PATH, EPHEMERIS_TARGETS, trim_ephemeris
+from helios.main import app
+from helios.solar_calculator import SolarCalculator
+
+
+def test_trim_ephemeris(tmp_path: Path) -> None:
+    output = tmp_path / "sun.bsp"
+    trim_ephemeris(Path(str(DATA_PATH)), output, 2020, 2040)
+    assert output.stat().st_size < Path(str(DATA_PATH)).stat().st_size / 10
+    spk = SPK.open(str(output))
+    try:
+        assert sorted(segment.target for segment in spk.segments) == sorted(EPHEMERIS_TARGETS)
+        for segment in spk.segments:
+            assert segment.start_jd == 2458849.5
+            assert segment.end_jd == 2466520.5
+    finally:
+        spk.close()
+
+
+def test_trimmed_sky_transitions(tmp_path: Path) -> None:
+    output = tmp_path / "sun.bsp"
+    trim_ephemeris(Path(str(DATA_PATH)), output, 2025, 2026)
+    current_datetime = datetime.datetime(2026, 6, 21, 12, tzinfo=datetime.UTC).timestamp()
+    expected = SolarCalculator().sky_transitions(40.8939, -83.8917, current_datetime, "America/New_York")
+    h = SolarCalculator(ephemeris_path=output)
+    assert h.sky_transitions(40.8939, -83.8917, current_datetime, "America/New_York") == expected
+
+
+def test_trimmed_routes(tmp_path: Path) -> None:
+    output = tmp_path / "sun.bsp"
+    trim_ephemeris(Path(str(DATA_PATH)), output, 2025, 2026)
+    h = SolarCalculator(ephemeris_path=output)
+    assert h.date_coverage() == (datetime.date(2025, 1, 2), datetime.date(2026, 12, 30))
+    client = TestClient(app)
+    inside = datetime.datetime(2026, 6, 21, 12, tzinfo=datetime.UTC).timestamp()
+    outside = datetime.datetime(2027, 6, 21, 12, tzinfo=datetime.UTC).timestamp()
+    params = {"lat": 40.8939, "lon": -83.8917, "tz": "America/New_York"}
+    timer = {"checktime": "15:00:00", "offtime": "23:00:00", "onrange": "00:15:00", "offrange": "00:15:00"}
+    with patch.object(calculator_dependency, "_calculator", h):
+        for route, extra in (("/sky_transitions", {}), ("/timer_information", timer)):
+            assert client.get(route, params={**params, **extra, "cdatetime": inside}).status_code == 200
+            response = client.get(route, params={**params, **extra, "cdatetime": outside})
+            assert response.status_code == 422
+            assert response.json()["detail"] == "Dates must be from 2025-01-02 to 2026-12-30"
+        utc = datetime.datetime.fromtimestamp(outside, datetime.UTC)
+        with patch("helios.solar_calculator.SolarCalculator.get_utc", return_value=utc):
+            assert client.get("/day_information", params=params).status_code == 422
+
+
+def test_cli_ephemeris(tmp_path: Path) -> None:
+    output = tmp_path / "sun.bsp"
+    assert main(["ephemeris", str(output), "--start-year", "2030", "--end-year", "2020"]) == 1
+    assert not output.exists()
+    assert main(["ephemeris", str(output), "--start-year", "2020", "--end-year", "2030"]) == 0
+    assert output.exists()
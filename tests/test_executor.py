@@ -0,0 +1,121 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for calculation executor."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from helios.config import EngineName, ExecutorType
+from helios.exceptions import ExecutorBusy
+from helios.executor import CalculationExecutor
+from helios.metrics import metrics
+from helios.solar_calculator import SolarCalculator
+
+
+class BlockingCalculator:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def sky_transitions(self, *args: Any) -> tuple[Any, ...]:
+        self.release.wait(timeout=10)
+        return args
+
+
+class CountingCalculator:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def sky_transitions(self, *args: Any) -> dict[str, Any]:
+        self.calls += 1
+        time.sleep(0.1)
+        return {"args": args}
+
+
+def test_thread_executor() -> None:
+    h = SolarCalculator()
+    executor = CalculationExecutor(lambda: h, workers=2, backlog=2)
+    current_datetime = datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp()
+    st = asyncio.run(executor.run("sky_transitions", 40.8939, -83.8917, current_datetime, "US/Eastern"))
+    executor.shutdown()
+    assert st == h.sky_transitions(40.8939, -83.8917, current_datetime, "US/Eastern")
+    status = executor.status()
+    assert status.executor_type == "thread"
+    assert status.running == 0
+    assert status.queued == 0
+
+
+def test_process_executor() -> None:
+    executor = CalculationExecutor(SolarCalculator, executor_type=ExecutorType.process, workers=1)
+    current_datetime = datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp()
+    st = asyncio.run(executor.run("sky_transitions", 40.8939, -83.8917, current_datetime, "US/Eastern"))
+    executor.shutdown()
+    assert st["Sunrise"].timestamp() == pytest.approx(1677845209.722515, rel=1e-1)
+
+
+def test_process_executor_stage_metrics() -> None:
+    executor = CalculationExecutor(SolarCalculator, executor_type=ExecutorType.process, workers=1)
+    current_datetime = datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp()
+    before = metrics.stage_duration.count(("setup",))
+    metrics.enabled = True
+    try:
+        asyncio.run(executor.run("sky_transitions", 40.8939, -83.8917, current_datetime, "US/Eastern"))
+    finally:
+        metrics.enabled = False
+        executor.shutdown()
+    assert metrics.stage_duration.count(("setup",)) == before + 1
+
+
+def test_backlog_limit() -> None:
+    calculator = BlockingCalculator()
+    executor = CalculationExecutor(lambda: calculator, workers=1, backlog=1)  # type: ignore[arg-type, return-value]
+
+    async def run() -> None:
+        first = asyncio.create_task(executor.run("sky_transitions", 1))
+        second = asyncio.create_task(executor.run("sky_transitions", 2))
+        await asyncio.sleep(0.1)
+        status = executor.status()
+        assert status.running == 1
+        assert status.queued == 1
+        assert status.saturation == 1.0
+        with pytest.raises(ExecutorBusy):
+            await executor.run("sky_transitions", 3)
+        calculator.release.set()
+        assert await first == (1,)
+        assert await second == (2,)
+
+    asyncio.run(run())
+    executor.shutdown()
+    assert executor.status().rejected == 1
+
+
+def test_coalesced_sky_transitions() -> None:
+    calculator = CountingCalculator()
+    executor = CalculationExecutor(lambda: calculator, workers=2)  # type: ignore[arg-type, return-value]
+    morning = datetime.datetime(2023, 3, 3, 8, tzinfo=datetime.UTC).timestamp()
+    evening = datetime.datetime(2023, 3, 3, 20, tzinfo=datetime.UTC).timestamp()
+
+    async def run() -> list[dict[str, Any]]:
+        results = await asyncio.gather(
+            executor.sky_transitions(40.8939, -83.8917, morning, "UTC"),
+            executor.sky_transitions(40.8939, -83.8917, evening, "UTC"),
+            executor.sky_transitions(40.8939, -83.8917, morning, "UTC"),
+            executor.sky_transitions(40.8939, -83.8917, morning, "UTC", EngineName.analytic),
+        )
+        return list(results)
+
+    results = asyncio.run(run())
+    executor.shutdown()
+    assert calculator.calls == 2
+    assert results[0] == results[1] == results[2]
+    assert results[0] is not results[1]
+    assert results[3]["args"][-1] == EngineName.analytic
+    assert executor.status().coalesced == 2
@@ -0,0 +1,120 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for streaming exports."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import csv
+import datetime
+import json
+from typing import Any
+
+import pytest
+
+from helios.exceptions import ExecutorBusy
+from helios.executor import CalculationExecutor
+from helios.exporters import EXPORT_BUSY, EXPORT_FIELDS, ExportFormat, export_lines, export_records
+from helios.models import Site
+from helios.solar_calculator import SolarCalculator
+
+SITES = [
+    Site(lat=40.8939, lon=-83.8917, tz="US/Eastern"),
+    Site(lat=78.2232, lon=15.6267, tz="Arctic/Longyearbyen"),
+]
+
+
+async def collect(lines: AsyncIterator[str]) -> list[str]:
+    return [line async for line in lines]
+
+
+async def no_records() -> AsyncIterator[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    for record in records:
+        yield record
+
+
+def test_export_format() -> None:
+    assert ExportFormat.from_accept("text/csv") == ExportFormat.csv
+    assert ExportFormat.from_accept("application/x-ndjson") == ExportFormat.ndjson
+    assert ExportFormat.from_accept("*/*") == ExportFormat.ndjson
+    assert ExportFormat.csv.media_type == "text/csv"
+
+
+def test_export_records() -> None:
+    h = SolarCalculator()
+    executor = CalculationExecutor(lambda: h, workers=1)
+    start = datetime.date(2023, 6, 19)
+    end = datetime.date(2023, 6, 23)
+
+    async def run() -> list[dict[str, Any]]:
+        return [record async for record in export_records(executor, SITES, start, end, chunk_days=2)]
+
+    records = asyncio.run(run())
+    executor.shutdown()
+    assert len(records) == 10
+    assert [record["date"] for record in records[:5]] == [
+        (start + datetime.timedelta(days=i)).isoformat() for i in range(5)
+    ]
+    assert all(tuple(record.keys()) == EXPORT_FIELDS for record in records)
+    st = h.sky_transitions(
+        SITES[0].lat, SITES[0].lon, datetime.datetime(2023, 6, 21, 12).timestamp(), SITES[0].tz
+    )
+    assert abs(records[2]["sunrise"] - st["Sunrise"].timestamp()) < 0.01
+    assert records[7]["tz"] == "Arctic/Longyearbyen"
+    assert records[7]["sunrise"] is None
+
+
+def test_export_lines() -> None:
+    record = dict.fromkeys(EXPORT_FIELDS, None) | {
+        "lat": 40.0,
+        "lon": -83.0,
+        "tz": "UTC",
+        "date": "2023-03-03",
+    }
+
+    async def records() -> AsyncIterator[dict[str, Any]]:
+        yield record
+        yield record
+
+    lines = asyncio.run(collect(export_lines(records(), ExportFormat.ndjson)))
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == record
+
+    lines = asyncio.run(collect(export_lines(records(), ExportFormat.csv)))
+    assert len(lines) == 3
+    rows = list(csv.DictReader("".join(lines).splitlines()))
+    assert rows[0]["date"] == "2023-03-03"
+    assert rows[0]["sunrise"] == ""
+
+    lines = asyncio.run(collect(export_lines(no_records(), ExportFormat.csv)))
+    assert lines == [",".join(EXPORT_FIELDS) + "\n"]
+
+
+def test_export_lines_failure() -> None:
+    record = dict.fromkeys(EXPORT_FIELDS, None)
+
+    async def records(error: Exception) -> AsyncIterator[dict[str, Any]]:
+        yield record
+        raise error
+
+    lines = asyncio.run(collect(export_lines(records(ExecutorBusy()), ExportFormat.ndjson)))
+    assert len(lines) == 2
+    assert json.loads(lines[1]) == {"error": EXPORT_BUSY}
+
+    lines = asyncio.run(collect(export_lines(records(ExecutorBusy()), ExportFormat.csv)))
+    assert len(lines) == 3
+    assert next(csv.reader([lines[2]])) == ["error", EXPORT_BUSY]
+
+    received: list[str] = []
+
+    async def receive() -> None:
+        async for line in export_lines(records(RuntimeError("boom")), ExportFormat.ndjson):
+            received.append(line)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(receive())
+    assert json.loads(received[-1]) == {"error": "Export failed: RuntimeError('boom')"}
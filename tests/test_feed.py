@@ -0,0 +1,80 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the sky transitions feed."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from helios.feed import KEEP_ALIVE, FeedFull, Message, TransitionFeed, sse_event
+
+
+def test_schedule() -> None:
+    async def run() -> list[Message]:
+        feed = TransitionFeed(heartbeat=60.0)
+        subscription = feed.subscribe()
+        now = time.time()
+        feed.schedule(subscription, now + 0.05, ("transition", "b"))
+        feed.schedule(subscription, now + 0.02, ("transition", "a"))
+        feed.schedule(subscription, now - 1.0, ("transition", "late"))
+        messages = [await asyncio.wait_for(subscription.get(), 1.0) for _ in range(3)]
+        assert feed.status().delivered == 3
+        assert feed.status().scheduled == 0
+        feed.unsubscribe(subscription)
+        return messages
+
+    assert [data for _, data in asyncio.run(run())] == ["late", "a", "b"]
+
+
+def test_unsubscribe() -> None:
+    async def run() -> None:
+        feed = TransitionFeed(heartbeat=60.0)
+        leaving = feed.subscribe()
+        staying = feed.subscribe()
+        now = time.time()
+        for subscription in (leaving, staying, leaving):
+            feed.schedule(subscription, now + 0.02, ("transition", None))
+        feed.unsubscribe(leaving)
+        assert len(feed) == 1
+        assert feed.status().scheduled == 1
+        assert await asyncio.wait_for(staying.get(), 1.0) == ("transition", None)
+        await asyncio.sleep(0.02)
+        assert leaving.queue.empty()
+        assert feed.status().delivered == 1
+        feed.unsubscribe(staying)
+        assert feed.status().scheduled == 0
+
+    asyncio.run(run())
+
+
+def test_heartbeat() -> None:
+    async def run() -> None:
+        feed = TransitionFeed(heartbeat=0.01)
+        subscription = feed.subscribe()
+        assert await asyncio.wait_for(subscription.get(), 1.0) == KEEP_ALIVE
+        feed.unsubscribe(subscription)
+
+    asyncio.run(run())
+
+
+def test_max_subscribers() -> None:
+    async def run() -> None:
+        feed = TransitionFeed(max_subscribers=1)
+        subscription = feed.subscribe()
+        assert feed.full()
+        with pytest.raises(FeedFull):
+            feed.subscribe()
+        feed.unsubscribe(subscription)
+        assert not feed.full()
+
+    asyncio.run(run())
+
+
+def test_sse_event() -> None:
+    assert sse_event("transition", {"time": 1.5}) == 'event: transition\ndata: {"time": 1.5}\n\n'
+    assert sse_event(None) == ": keep-alive\n\n"
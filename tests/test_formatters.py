@@ -9,7 +9,7 @@ from __future__ import annotations
 import datetime
 import zoneinfo
 
-from helios.formatters import date_format, day_length_format, time_format
+from helios.formatters import date_format, day_length_format, key_format, time_format
 
 
 def test_date_format() -> None:
@@ -27,6 +27,11 @@ def test_time_format() -> None:
     assert time_string == "14:57"
 
 
+def test_key_format() -> None:
+    assert key_format("Astronomical Dawn") == "astronomical_dawn"
+    assert key_format("Sunrise") == "sunrise"
+
+
 def test_day_length_format() -> None:
     day_length = datetime.timedelta(seconds=44526)
     day_length_string = day_length_format(day_length)
@@ -0,0 +1,128 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the precomputed sky transitions grid."""
+
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from helios.cli import main
+from helios.engines import AnalyticEngine, EngineName
+from helios.exceptions import EngineUnavailable
+from helios.grid import GridEngine, TransitionGrid
+from helios.solar_calculator import SolarCalculator
+
+
+@pytest.fixture(scope="module")
+def grid() -> TransitionGrid:
+    return TransitionGrid.build(
+        AnalyticEngine(),
+        min_latitude=35.0,
+        max_latitude=45.0,
+        min_longitude=-90.0,
+        max_longitude=-60.0,
+    )
+
+
+def search_windows(
+    latitudes: list[float], longitude: float, days: int
+) -> tuple[list[float], list[float], list[datetime.datetime], list[datetime.datetime]]:
+    zone = datetime.timezone(datetime.timedelta(hours=-5))
+    starts = [
+        datetime.datetime(2026, 1, 1, tzinfo=zone) + datetime.timedelta(days=day)
+        for day in range(0, 3 * days, 3)
+    ]
+    lats = [latitude for latitude in latitudes for _ in starts]
+    lons = [longitude] * len(lats)
+    all_starts = starts * len(latitudes)
+    ends = [start + datetime.timedelta(days=1) for start in all_starts]
+    return lats, lons, all_starts, ends
+
+
+def test_grid_axes(grid: TransitionGrid) -> None:
+    assert grid.offsets.shape == (11, 2, 366, 8)
+    assert grid.offsets.dtype == np.float32
+    assert grid.latitudes[0] == 35.0
+    assert grid.longitudes.tolist() == [-90.0, -60.0]
+    assert grid.covers(40.0, -75.0)
+    assert not grid.covers(50.0, -75.0)
+    assert not grid.covers(40.0, 0.0)
+
+
+def test_grid_engine(grid: TransitionGrid) -> None:
+    analytic = AnalyticEngine()
+    engine = GridEngine(grid, analytic)
+    windows = search_windows([35.5, 38.25, 40.8939, 44.9], -83.8917, 120)
+    expected = analytic.search(*windows)
+    results = engine.search(*windows)
+    assert engine.lookups > engine.fallbacks
+    deviation = 0.0
+    for (expected_e, expected_times, expected_events), (result_e, result_times, result_events) in zip(
+        expected, results, strict=True
+    ):
+        assert result_e == expected_e
+        assert result_events == expected_events
+        for expected_time, result_time in zip(expected_times, result_times, strict=True):
+            deviation = max(deviation, abs((expected_time - result_time).total_seconds()))
+    assert deviation < 10.0
+
+
+def test_grid_engine_fallback(grid: TransitionGrid) -> None:
+    analytic = AnalyticEngine()
+    engine = GridEngine(grid, analytic)
+    windows = search_windows([70.0], -83.8917, 10)
+    assert engine.search(*windows) == analytic.search(*windows)
+    assert engine.lookups == 0
+    assert engine.fallbacks == 10
+
+
+def test_save_load(grid: TransitionGrid, tmp_path: Path) -> None:
+    grid.save(tmp_path)
+    loaded = TransitionGrid.load(tmp_path)
+    assert loaded.metadata == grid.metadata
+    assert isinstance(loaded.offsets, np.memmap)
+    np.testing.assert_array_equal(loaded.offsets, grid.offsets)
+
+
+def test_calculator_grid(grid: TransitionGrid) -> None:
+    with pytest.raises(EngineUnavailable):
+        SolarCalculator().get_engine(EngineName.grid)
+    with pytest.raises(EngineUnavailable):
+        SolarCalculator(engine=EngineName.grid)
+
+    h = SolarCalculator(engine=EngineName.grid, grid=grid)
+    engine = h.get_engine()
+    assert isinstance(engine, GridEngine)
+    assert isinstance(engine.fallback, AnalyticEngine)
+    current_datetime = datetime.datetime(2026, 6, 21, 12, tzinfo=datetime.UTC).timestamp()
+    st = h.sky_transitions(40.8939, -83.8917, current_datetime, "America/New_York")
+    expected = h.sky_transitions(40.8939, -83.8917, current_datetime, "America/New_York", "analytic")
+    assert st.keys() == expected.keys()
+    for name in st:
+        assert abs((st[name] - expected[name]).total_seconds()) < 10.0
+
+
+def test_cli_grid(tmp_path: Path) -> None:
+    assert (
+        main(
+            [
+                "grid",
+                str(tmp_path),
+                "--max-latitude",
+                "1",
+                "--longitude-step",
+                "180",
+                "--quiet",
+            ]
+        )
+        == 0
+    )
+    grid = TransitionGrid.load(tmp_path)
+    assert grid.offsets.shape == (3, 3, 366, 8)
+    assert grid.metadata.engine == "analytic"
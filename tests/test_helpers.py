@@ -7,6 +7,7 @@
 from __future__ import annotations
 
 from datetime import timedelta
+import random
 from unittest.mock import patch
 
 from helios.helpers import get_time_variation
@@ -17,3 +18,9 @@ def test_get_time_variation() -> None:
     with patch("helios.helpers.random.randrange", return_value=variation.seconds):
         value = get_time_variation("0:06:00")
         assert value.seconds == variation.seconds
+
+
+def test_get_time_variation_seeded() -> None:
+    first = [get_time_variation("0:06:00", random.Random(42)) for _ in range(3)]
+    assert first == [get_time_variation("0:06:00", random.Random(42)) for _ in range(3)]
+    assert all(abs(value) < timedelta(minutes=6) for value in first)
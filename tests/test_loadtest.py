@@ -0,0 +1,67 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for load testing the application."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+import zoneinfo
+
+import pytest
+
+from helios.cli import main
+from helios.loadtest import LoadTest, build_requests, generate_sites, local_server, run_load
+
+
+def test_generate_sites() -> None:
+    sites = generate_sites(100, seed=1)
+    assert sites == generate_sites(100, seed=1)
+    assert sites != generate_sites(100, seed=2)
+    for site in sites:
+        assert -60.0 <= site.lat <= 60.0
+        offset = zoneinfo.ZoneInfo(site.tz).utcoffset(None)
+        assert offset is not None
+        assert abs(offset.total_seconds() / 3600.0 - site.lon / 15.0) <= 0.5
+
+
+def test_build_requests() -> None:
+    sites = generate_sites(10)
+    requests = build_requests(sites, 1000, {"sky_transitions": 3.0, "timer_information": 1.0}, seed=3)
+    assert requests == build_requests(sites, 1000, {"sky_transitions": 3.0, "timer_information": 1.0}, seed=3)
+    routes = [route for route, _ in requests]
+    assert 650 < routes.count("sky_transitions") < 850
+    assert "day_information" not in routes
+    route, path = next(request for request in requests if request[0] == "timer_information")
+    url = urlsplit(path)
+    assert url.path == "/timer_information"
+    assert parse_qs(url.query)["checktime"] == ["15:00:00"]
+    with pytest.raises(ValueError):
+        build_requests(sites, 10, {"raster": 1.0})
+
+
+def test_run_load() -> None:
+    settings = LoadTest(concurrency=2, requests=20, warmup=4, sites=5)
+    requests = build_requests(generate_sites(settings.sites), settings.warmup + settings.requests)
+    with local_server() as url:
+        report = run_load(url, requests, settings)
+        errors = run_load(url, [("missing", "/missing")] * 2, LoadTest(concurrency=1, warmup=0))
+    assert report["requests"] == 20
+    assert report["errors"] == 0
+    assert report["throughput"] > 0.0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"] <= report["latency_ms"]["max"]
+    assert sum(route["requests"] for route in report["routes"].values()) == 20
+    assert errors["error_rate"] == 1.0
+
+
+def test_cli_loadtest(tmp_path: Path) -> None:
+    assert main(["loadtest", "--mix", "raster=1"]) == 1
+    output = tmp_path / "report.json"
+    arguments = ["--requests", "6", "--warmup", "0", "--concurrency", "2", "--sites", "3"]
+    assert main(["loadtest", *arguments, "--mix", "sky_transitions=1", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["workers"] == 1
+    assert list(report["routes"]) == ["sky_transitions"]
@@ -6,13 +6,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import csv
 import datetime
+import io
+import json
+import time
+from typing import Any
 from unittest.mock import patch
+import zoneinfo
 
 from fastapi.testclient import TestClient
+import numpy as np
 import pytest
+from starlette.requests import ClientDisconnect
 
-from helios.main import app
+from helios.dependencies import calculator_dependency, executor_dependency
+from helios.exceptions import ExecutorBusy
+from helios.feed import FeedFull, TransitionFeed
+from helios.formatters import key_format
+from helios.main import _feed_events, _FeedResponse, app, get_assets
+from helios.pages import PageCache
 
 client = TestClient(app)
 
@@ -23,6 +37,50 @@ def test_root() -> None:
     assert response.json() == {"msg": "This is a web service, nothing to see here."}
 
 
+def test_status() -> None:
+    response = client.get("/status")
+    assert response.status_code == 200
+    executor = response.json()["executor"]
+    assert executor["executor_type"] == "thread"
+    assert executor["queued"] == 0
+    assert "hits" in response.json()["cache"]
+
+
+def test_executor_busy() -> None:
+    with patch.object(executor_dependency.executor, "run", side_effect=ExecutorBusy):
+        response = client.get(
+            "/sky_transitions",
+            params={
+                "lat": 40.8939,
+                "lon": -83.8917,
+                "cdatetime": 1677880560.0,
+                "tz": "US/Eastern",
+            },
+        )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_lifespan() -> None:
+    with (
+        patch("helios.solar_calculator.SolarCalculator.warm_up") as warm_up,
+        TestClient(app) as lifespan_client,
+    ):
+        warm_up.assert_called_once()
+        calculator = calculator_dependency.calculator
+        response = lifespan_client.get(
+            "/sky_transitions",
+            params={
+                "lat": 40.8939,
+                "lon": -83.8917,
+                "cdatetime": 1677880560.0,
+                "tz": "US/Eastern",
+            },
+        )
+        assert response.status_code == 200
+        assert calculator_dependency.calculator is calculator
+
+
 def test_sky_transitions() -> None:
     response = client.get(
         "/sky_transitions",
@@ -37,6 +95,147 @@ def test_sky_transitions() -> None:
     assert response.json()["astronomical_dawn"] == pytest.approx(1677839749.146742, rel=1e-1)
 
 
+def test_sky_transitions_batch() -> None:
+    item = {"lat": 40.8939, "lon": -83.8917, "cdatetime": 1677880560.0, "tz": "US/Eastern"}
+    response = client.post(
+        "/sky_transitions/batch",
+        json=[
+            item,
+            {**item, "tz": "USA/Santiago"},
+            {**item, "cdatetime": 1687370400.0},
+            {**item, "cdatetime": 4e9},
+        ],
+    )
+    assert response.status_code == 200
+    output = response.json()
+    assert len(output) == 4
+    assert output[0] == client.get("/sky_transitions", params=item).json()
+    assert output[1] == {"detail": "Bad time zone given: USA/Santiago"}
+    assert output[2]["sunset"] > output[0]["sunset"]
+    assert output[3] == {"detail": "Dates must be from 1899-07-30 to 2053-10-07"}
+
+
+def test_sky_transitions_batch_too_large() -> None:
+    item = {"lat": 40.8939, "lon": -83.8917, "cdatetime": 1677880560.0, "tz": "US/Eastern"}
+    with patch("helios.main.config.batch_max_items", 1):
+        response = client.post("/sky_transitions/batch", json=[item, item])
+    assert response.status_code == 422
+
+
+def test_sky_transitions_range() -> None:
+    params = {"lat": 40.8939, "lon": -83.8917, "tz": "US/Eastern"}
+    response = client.get(
+        "/sky_transitions/range", params={**params, "start": "2023-03-01", "end": "2023-03-07"}
+    )
+    assert response.status_code == 200
+    output = response.json()
+    assert len(output) == 7
+    assert output[2]["date"] == "2023-03-03"
+    assert output[2]["astronomical_dawn"] == pytest.approx(1677839749.146742, rel=1e-1)
+
+    response = client.get(
+        "/sky_transitions/range", params={**params, "start": "2023-03-07", "end": "2023-03-01"}
+    )
+    assert response.status_code == 422
+    response = client.get(
+        "/sky_transitions/range", params={**params, "start": "2023-01-01", "end": "2025-01-01"}
+    )
+    assert response.status_code == 422
+    future = {**params, "start": "2100-01-01", "end": "2100-01-02"}
+    response = client.get("/sky_transitions/range", params=future)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Dates must be from 1899-07-30 to 2053-10-07"
+    response = client.get("/sky_transitions/range", params={**future, "engine": "analytic"})
+    assert response.status_code == 200
+    response = client.get(
+        "/sky_transitions/range",
+        params={**params, "tz": "USA/Santiago", "start": "2023-03-01", "end": "2023-03-07"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Bad time zone given: USA/Santiago"
+
+
+def test_sky_transitions_export() -> None:
+    export = {
+        "sites": [
+            {"lat": 40.8939, "lon": -83.8917, "tz": "US/Eastern"},
+            {"lat": -33.8688, "lon": 151.2093, "tz": "Australia/Sydney"},
+        ],
+        "start": "2023-03-01",
+        "end": "2023-03-03",
+    }
+    response = client.post("/sky_transitions/export", json=export)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 6
+    assert records[2]["date"] == "2023-03-03"
+    assert records[2]["astronomical_dawn"] == pytest.approx(1677839749.146742, rel=1e-1)
+
+    response = client.post("/sky_transitions/export", json=export, headers={"Accept": "text/csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert len(rows) == 6
+    assert rows[3]["tz"] == "Australia/Sydney"
+
+    response = client.post("/sky_transitions/export", params={"format": "csv"}, json=export)
+    assert response.headers["content-type"].startswith("text/csv")
+
+    response = client.post("/sky_transitions/export", json={**export, "end": "2023-02-01"})
+    assert response.status_code == 422
+    bad_site = {"lat": 40.8939, "lon": -83.8917, "tz": "USA/Santiago"}
+    response = client.post("/sky_transitions/export", json={**export, "sites": [bad_site]})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Bad time zone given: USA/Santiago"
+
+    response = client.post("/sky_transitions/export", json={**export, "end": "2024-03-01"})
+    assert response.status_code == 422
+    with patch("helios.main.config.export_max_sites", 1):
+        response = client.post("/sky_transitions/export", json=export)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Too many export sites given: 2 > 1"
+    future = {**export, "start": "2100-01-01", "end": "2100-01-02"}
+    response = client.post("/sky_transitions/export", json=future)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Export dates must be from 1899-07-30 to 2053-10-07"
+    response = client.post("/sky_transitions/export", params={"engine": "analytic"}, json=future)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 4
+
+    with patch("helios.main.config.export_chunk_days", 1):
+        run = executor_dependency.executor.run
+        calls = 0
+
+        async def busy(*args: Any) -> Any:
+            nonlocal calls
+            calls += 1
+            if calls > 2:
+                raise ExecutorBusy()
+            return await run(*args)
+
+        with patch.object(executor_dependency.executor, "run", side_effect=busy):
+            response = client.post("/sky_transitions/export", json=export)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 3
+    assert "error" in lines[-1]
+
+
+def test_sky_transitions_engine() -> None:
+    params = {"lat": 40.8939, "lon": -83.8917, "cdatetime": 1677880560.0, "tz": "US/Eastern"}
+    skyfield = client.get("/sky_transitions", params=params).json()
+    analytic = client.get("/sky_transitions", params={**params, "engine": "analytic"}).json()
+    assert analytic.keys() == skyfield.keys()
+    for key, value in analytic.items():
+        assert value != skyfield[key]
+        assert value == pytest.approx(skyfield[key], abs=30.0)
+    response = client.get("/sky_transitions", params={**params, "engine": "ptolemy"})
+    assert response.status_code == 422
+    response = client.get("/sky_transitions", params={**params, "engine": "grid"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Engine not available: grid"
+
+
 def test_bad_location() -> None:
     response = client.get(
         "/sky_transitions",
@@ -70,6 +269,89 @@ def test_bad_timezone() -> None:
     assert response.json()["detail"] == "Bad time zone given: USA/Santiago"
 
 
+def test_sky_transitions_events() -> None:
+    params = {"tz": "US/Eastern", "lat": 40.8939, "lon": -83.8917}
+    response = client.get("/sky_transitions/events", params={**params, "tz": "Mars/Olympus_Mons"})
+    assert response.status_code == 422
+    with patch("helios.main.feed", TransitionFeed(max_subscribers=0)):
+        response = client.get("/sky_transitions/events", params=params)
+    assert response.status_code == 503
+    # The feed filling up during the calculation is caught on subscribing.
+    with patch("helios.main.feed.subscribe", side_effect=FeedFull):
+        response = client.get("/sky_transitions/events", params=params)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+
+
+def test_feed_events() -> None:
+    # The test client waits for a whole response, so the endless stream is
+    # read straight from its generator.
+    latitude, longitude, timezone = 40.8939, -83.8917, "US/Eastern"
+    calculator = calculator_dependency.calculator
+    day = calculator.sky_transitions(
+        latitude, longitude, datetime.datetime(2023, 3, 3, 12).timestamp(), timezone
+    )
+    sunset = day["Sunset"].timestamp()
+    midnight = datetime.datetime(2023, 3, 4, tzinfo=zoneinfo.ZoneInfo(timezone)).timestamp()
+
+    async def read(start: float, count: int) -> list[tuple[str, Any]]:
+        # The feed clock starts shortly before the given time.
+        begin = time.time()
+        feed = TransitionFeed(heartbeat=60.0, clock=lambda: start - 0.2 + time.time() - begin)
+        with patch("helios.main.feed", feed):
+            executor = executor_dependency.executor
+            subscription = feed.subscribe()
+            events = _feed_events(
+                latitude, longitude, timezone, None, executor, subscription, feed.clock(), day
+            )
+            received = []
+            for _ in range(count):
+                event, data, _ = (await asyncio.wait_for(anext(events), 5.0)).split("\n", 2)
+                received.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+            assert feed.status().subscribers == 1
+            await events.aclose()
+            assert feed.status().subscribers == 0
+        return received
+
+    (schedule, first), (transition, data) = asyncio.run(read(sunset, 2))
+    assert schedule == "schedule"
+    assert first == {
+        "date": "2023-03-03",
+        "transitions": {key_format(k): v.timestamp() for k, v in day.items()},
+    }
+    assert (transition, data) == ("transition", {"transition": "sunset", "time": sunset})
+
+    # The next day's schedule follows the local midnight.
+    (_, first), (schedule, second) = asyncio.run(read(midnight, 2))
+    assert first["date"] == "2023-03-03"
+    assert schedule == "schedule"
+    assert second["date"] == "2023-03-04"
+    assert second["transitions"]["sunrise"] > midnight
+
+
+def test_feed_response_unsubscribes() -> None:
+    async def leave() -> int:
+        feed = TransitionFeed()
+        with patch("helios.main.feed", feed):
+            subscription = feed.subscribe()
+            events = _feed_events(0.0, 0.0, "UTC", None, executor_dependency.executor, subscription, 0.0, {})
+            response = _FeedResponse(subscription, events, media_type="text/event-stream")
+
+            async def receive() -> dict[str, Any]:
+                return {"type": "http.disconnect"}
+
+            async def send(message: Any) -> None:
+                raise OSError()
+
+            # The client leaves before the stream starts.
+            with pytest.raises(ClientDisconnect):
+                await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+            await events.aclose()
+            return len(feed)
+
+    assert asyncio.run(leave()) == 0
+
+
 def test_day_information() -> None:
     utc = datetime.datetime(2023, 3, 3, 19, 56, 0, tzinfo=datetime.UTC)
     with patch("helios.solar_calculator.SolarCalculator.get_utc", return_value=utc):
@@ -81,12 +363,14 @@ def test_day_information() -> None:
                 "cdatetime": 1677880560.0,
                 "tz": "US/Eastern",
             },
+            headers={"Accept-Encoding": "identity"},
         )
         assert response.status_code == 200
         assert response.template.name == "day_information.html"
         assert "request" in response.context
         assert "Sun Information for March 3, 2023" in response.text
         assert "Astronomical Dawn" in response.text
+        assert get_assets().hashed_path("css/bulma.min.css") in response.text
 
 
 def test_timer_information() -> None:
@@ -119,3 +403,205 @@ def test_timer_information() -> None:
         assert output["on_time"] == "18:25:23"
         assert output["off_time_utc"] == 1677899310
         assert output["off_time"] == "22:08:30"
+
+
+def test_timer_schedule() -> None:
+    params: dict[str, Any] = {
+        "lat": 40.8939,
+        "lon": -83.8917,
+        "cdatetime": 1677880560.0,
+        "tz": "US/Eastern",
+        "checktime": "00:10:00",
+        "offtime": "22:00:00",
+        "onrange": "0:05:00",
+        "offrange": "0:10:00",
+        "seed": 7,
+    }
+    response = client.get("/timer_schedule", params=params)
+    assert response.status_code == 200
+    schedule = response.json()
+    assert len(schedule) == 7
+    assert [entry["date"] for entry in schedule[:2]] == ["March 3, 2023", "March 4, 2023"]
+    assert schedule[0]["sunrise_usno"] == "07:07"
+    assert schedule[0]["sunset_usno"] == "18:29"
+    assert schedule[0]["check_time_utc"] == 1677906600
+    assert schedule[1]["check_time_utc"] == schedule[0]["check_time_utc"] + 86400
+
+    # The same seed gives each day the same variations, whatever the start.
+    response = client.get("/timer_schedule", params={**params, "cdatetime": 1677880560.0 + 86400, "days": 3})
+    assert response.json() == schedule[1:4]
+    response = client.get("/timer_schedule", params={**params, "seed": 8})
+    assert response.json() != schedule
+
+    response = client.get("/timer_schedule", params={**params, "days": 400})
+    assert response.status_code == 422
+    response = client.get("/timer_schedule", params={**params, "lat": 85.0})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "The sun does not rise and set on 2023-03-03"
+    # A schedule reaching past the ephemeris is refused rather than failing.
+    last_days = datetime.datetime(2053, 10, 5, 12, tzinfo=datetime.UTC).timestamp()
+    response = client.get("/timer_schedule", params={**params, "cdatetime": last_days})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Dates must be from 1899-07-30 to 2053-10-07"
+
+
+def test_conditional_requests() -> None:
+    utc = datetime.datetime(2023, 3, 3, 19, 56, 0, tzinfo=datetime.UTC)
+    params = {"lat": 40.8939, "lon": -83.8917, "cdatetime": 1677880560.0, "tz": "US/Eastern"}
+    with patch("helios.solar_calculator.SolarCalculator.get_utc", return_value=utc):
+        for route in ("/sky_transitions", "/day_information"):
+            response = client.get(route, params=params)
+            assert response.status_code == 200
+            etag = response.headers["etag"]
+            assert response.headers["cache-control"].startswith("public, max-age=")
+
+            with patch("helios.executor.CalculationExecutor.sky_transitions", side_effect=AssertionError):
+                response = client.get(route, params=params, headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+            assert response.content == b""
+
+            response = client.get(route, params={**params, "engine": "analytic"})
+            assert response.headers["etag"] != etag
+            response = client.get(route, params={**params, "lat": 40.89391})
+            assert response.headers["etag"] == etag
+            response = client.get(route, params=params, headers={"If-None-Match": '"stale"'})
+            assert response.status_code == 200
+
+
+def test_day_information_pages() -> None:
+    utc = datetime.datetime(2023, 3, 3, 19, 56, 0, tzinfo=datetime.UTC)
+    params = {"lat": 23.4567, "lon": -83.8917, "tz": "US/Eastern"}
+    pages = PageCache()
+    with (
+        patch("helios.solar_calculator.SolarCalculator.get_utc", return_value=utc),
+        patch("helios.main.pages", pages),
+    ):
+        plain = client.get("/day_information", params=params, headers={"Accept-Encoding": "identity"})
+        assert plain.status_code == 200
+        assert "content-encoding" not in plain.headers
+        assert plain.headers["vary"] == "Accept-Encoding"
+        assert len(pages) == 1
+
+        with patch("helios.executor.CalculationExecutor.sky_transitions", side_effect=AssertionError):
+            response = client.get("/day_information", params=params, headers={"Accept-Encoding": "identity"})
+            assert response.content == plain.content
+            response = client.get("/day_information", params=params, headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["etag"] != plain.headers["etag"]
+            assert response.text == plain.text
+        assert pages.status().hits == 2
+
+    # A new local day renders a new page.
+    tomorrow = datetime.datetime(2023, 3, 4, 5, 0, 0, tzinfo=datetime.UTC)
+    with (
+        patch("helios.solar_calculator.SolarCalculator.get_utc", return_value=tomorrow),
+        patch("helios.main.pages", pages),
+    ):
+        response = client.get("/day_information", params=params)
+        assert "March 4, 2023" in response.text
+        assert len(pages) == 2
+
+
+def test_sun_positions() -> None:
+    params: dict[str, Any] = {
+        "lat": 40.8939,
+        "lon": -83.8917,
+        "start": 1677880560.0,
+        "end": 1677880560.0 + 3600.0,
+        "step": 600.0,
+    }
+    response = client.get("/sun_positions", params=params)
+    assert response.status_code == 200
+    positions = response.json()
+    assert positions["start"] == 1677880560.0
+    assert positions["step"] == 600.0
+    assert len(positions["altitude"]) == len(positions["azimuth"]) == 7
+    assert positions["altitude"][0] > positions["altitude"][-1]
+
+    with patch("helios.main.config.positions_chunk_samples", 3):
+        response = client.get("/sun_positions", params={**params, "stream": True})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    chunks = [json.loads(line) for line in response.text.splitlines()]
+    assert [len(chunk["altitude"]) for chunk in chunks] == [3, 3, 1]
+    assert chunks[1]["start"] == 1677880560.0 + 1800.0
+    assert sum((chunk["altitude"] for chunk in chunks), []) == positions["altitude"]
+
+    response = client.get("/sun_positions", params={**params, "end": 0.0})
+    assert response.status_code == 422
+    response = client.get("/sun_positions", params={**params, "step": 0.1})
+    assert response.status_code == 422
+    response = client.get("/sun_positions", params={**params, "step": 1.0, "end": 1e10, "stream": True})
+    assert response.status_code == 422
+    response = client.get("/sun_positions", params={**params, "start": 4e9, "end": 4e9 + 3600.0})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Sun positions must be from 1899-07-29 to 2053-10-08"
+    response = client.get(
+        "/sun_positions", params={**params, "start": 4e9, "end": 4e9 + 3600.0, "stream": True}
+    )
+    assert response.status_code == 422
+    with patch("helios.main.export_positions", side_effect=AssertionError):
+        response = client.get(
+            "/sun_positions",
+            params={**params, "step": 0.0001, "end": params["start"] + 86400.0, "stream": True},
+        )
+    assert response.status_code == 422
+    assert "Too many sun positions" in response.json()["detail"]
+
+
+def test_raster() -> None:
+    params: dict[str, Any] = {"date": "2023-06-21", "resolution": 2.0, "min_lat": 30.0, "max_lat": 50.0}
+    response = client.get("/raster", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-npy"
+    assert response.headers["x-helios-raster-bands"] == "sunrise,sunset,day_length"
+    bands = np.load(io.BytesIO(response.content))
+    assert bands.shape == (3, 10, 180)
+    assert bands.dtype == np.float32
+
+    response = client.get("/raster", params={**params, "resolution": 0.01})
+    assert response.status_code == 422
+    response = client.get("/raster", params={**params, "min_lat": 60.0})
+    assert response.status_code == 422
+
+
+def test_static_assets() -> None:
+    hashed = get_assets().hashed_path("css/bulma.min.css")
+    response = client.get(f"/static/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "text/css; charset=utf-8"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content.startswith(b"/*! bulma.io")
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    response = client.get(f"/static/{hashed}", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get("/static/css/bulma.min.css", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, no-cache"
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] != etag
+    found = get_assets().get("css/bulma.min.css")
+    assert found is not None
+    assert response.content == found[0].body
+
+    response = client.get("/static/css/missing.css")
+    assert response.status_code == 404
+
+
+def test_favicon() -> None:
+    response = client.get("/favicon.ico", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == "public, max-age=86400"
+    assert "content-disposition" not in response.headers
+    assert response.content.startswith(b"\x89PNG")
+
+    with patch.object(get_assets(), "get", return_value=None):
+        response = client.get("/favicon.ico")
+    assert response.status_code == 404
@@ -0,0 +1,104 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the service metrics."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from fastapi.testclient import TestClient
+import pytest
+
+from helios.main import app
+from helios.metrics import Counter, Histogram, Metrics, metrics
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def enabled_metrics() -> Iterator[Metrics]:
+    metrics.enabled = True
+    yield metrics
+    metrics.enabled = False
+
+
+def test_counter() -> None:
+    counter = Counter("requests_total", "Requests.", ("route",))
+    counter.inc(("/a",))
+    counter.inc(("/a",), 2.0)
+    counter.inc(('/"b"',))
+    assert counter.get(("/a",)) == 3.0
+    assert counter.render() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/\\"b\\""} 1',
+        'requests_total{route="/a"} 3',
+    ]
+
+
+def test_histogram() -> None:
+    histogram = Histogram("duration_seconds", "Durations.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(("search",), value)
+    assert histogram.count(("search",)) == 4
+    assert histogram.count(("setup",)) == 0
+    assert histogram.render()[2:] == [
+        'duration_seconds_bucket{stage="search",le="0.1"} 1',
+        'duration_seconds_bucket{stage="search",le="1"} 3',
+        'duration_seconds_bucket{stage="search",le="+Inf"} 4',
+        'duration_seconds_sum{stage="search"} 6.05',
+        'duration_seconds_count{stage="search"} 4',
+    ]
+
+
+def test_disabled_stage() -> None:
+    m = Metrics()
+    with m.stage("setup"):
+        pass
+    m.observe_stage("search", 1.0)
+    assert m.stage_duration.count(("setup",)) == 0
+    assert m.stage_duration.count(("search",)) == 0
+    m.enabled = True
+    with m.stage("setup"):
+        pass
+    assert m.stage_duration.count(("setup",)) == 1
+
+
+def test_collect_stages() -> None:
+    m = Metrics()
+    m.enabled = True
+    with m.collect_stages() as stages:
+        with m.stage("setup"):
+            pass
+        m.observe_stage("search", 1.0)
+    m.observe_stage("search", 2.0)
+    assert [name for name, _ in stages] == ["setup", "search"]
+    assert stages[1][1] == 1.0
+    assert m.stage_duration.count(("search",)) == 2
+
+
+def test_metrics_disabled() -> None:
+    response = client.get("/metrics")
+    assert response.status_code == 404
+
+
+def test_metrics(enabled_metrics: Metrics) -> None:
+    # A location no other test uses, so the calculation misses the cache.
+    params = {"lat": 12.3456, "lon": -83.8917, "cdatetime": 1677880560.0, "tz": "US/Eastern"}
+    assert client.get("/sky_transitions", params=params).status_code == 200
+    assert client.get("/sky_transitions", params={**params, "tz": "Mars/Olympus"}).status_code == 422
+    assert client.get("/no_such_route").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'helios_requests_total{route="/sky_transitions",method="GET",status="200"}' in text
+    assert 'helios_requests_total{route="/sky_transitions",method="GET",status="422"}' in text
+    assert 'helios_requests_total{route="unmatched",method="GET",status="404"}' in text
+    assert 'helios_request_duration_seconds_count{route="/sky_transitions"}' in text
+    for stage in ("setup", "search", "dark_twilight_day", "find_discrete", "labelling"):
+        assert enabled_metrics.stage_duration.count((stage,)) > 0
+        assert f'helios_stage_duration_seconds_count{{stage="{stage}"}}' in text
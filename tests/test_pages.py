@@ -0,0 +1,42 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the rendered page cache."""
+
+from __future__ import annotations
+
+import datetime
+import gzip
+
+from helios.pages import PageCache, accepts_gzip
+
+
+def test_page_cache() -> None:
+    cache = PageCache(max_size=2, precision=2)
+    day = datetime.date(2023, 3, 3)
+    key = cache.key("http://testserver/", 40.8939, -83.8917, day, "US/Eastern", "skyfield:1")
+    assert key == ("http://testserver/", 40.89, -83.89, day, "US/Eastern", "skyfield:1")
+    assert cache.get(key, 100.0) is None
+
+    page = cache.put(key, b"<html></html>", 200.0)
+    assert page.gzipped is not None
+    assert gzip.decompress(page.gzipped) == b"<html></html>"
+    assert cache.get(key, 100.0) == page
+    assert cache.get(key, 200.0) is None
+
+    for i in range(3):
+        cache.put(cache.key("http://testserver/", i, 0.0, day, "UTC", "skyfield:1"), b"", 200.0)
+    assert len(cache) == 2
+    status = cache.status()
+    assert (status.hits, status.misses, status.evictions) == (1, 2, 2)
+
+    assert PageCache(compress=False).put(key, b"", 200.0).gzipped is None
+
+
+def test_accepts_gzip() -> None:
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, GZIP;q=0.5")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip(None)
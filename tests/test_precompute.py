@@ -0,0 +1,114 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for precomputing sky transitions offline."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+import json
+from pathlib import Path
+import sqlite3
+
+import numpy as np
+import pytest
+
+from helios.cli import main
+from helios.engines import EngineName
+from helios.models import Site
+from helios.precompute import PrecomputeJob, load_parts, precompute, read_sites
+from helios.solar_calculator import SolarCalculator
+from helios.store import TransitionStore
+
+SITES = [
+    Site(lat=40.8939, lon=-83.8917, tz="America/New_York"),
+    Site(lat=51.4779, lon=-0.0015, tz="Europe/London"),
+    Site(lat=78.2232, lon=15.6267, tz="Arctic/Longyearbyen"),
+]
+
+
+def test_read_sites(tmp_path: Path) -> None:
+    csv_path = tmp_path / "sites.csv"
+    csv_path.write_text("lat,lon,tz\n" + "".join(f"{s.lat},{s.lon},{s.tz}\n" for s in SITES))
+    json_path = tmp_path / "sites.json"
+    json_path.write_text(json.dumps([site.model_dump() for site in SITES]))
+    assert read_sites(csv_path) == SITES
+    assert read_sites(json_path) == SITES
+
+
+def test_precompute_parts(tmp_path: Path) -> None:
+    job = PrecomputeJob(date(2023, 6, 1), date(2023, 6, 10), EngineName.skyfield, output=tmp_path)
+    assert precompute(job, SITES, workers=2, chunk_size=2) == 2
+    columns = load_parts(tmp_path)
+    assert len(columns["date"]) == 30
+    assert columns["date"][0] == np.datetime64("2023-06-01")
+    assert list(columns["tz"][:11]) == ["America/New_York"] * 10 + ["Europe/London"]
+
+    h = SolarCalculator()
+    expected = h.sky_transitions(40.8939, -83.8917, datetime(2023, 6, 1, 12).timestamp(), "America/New_York")
+    assert abs(columns["sunrise"][0] - expected["Sunrise"].timestamp()) < 1.0
+    # The sun does not set in the Arctic summer.
+    assert np.isnan(columns["sunset"][20:]).all()
+
+    # A resumed run skips the parts already written.
+    (tmp_path / "part-00001.npz").unlink()
+    assert precompute(job, SITES, workers=2, chunk_size=2) == 1
+    assert len(load_parts(tmp_path)["date"]) == 30
+
+
+def test_precompute_store(tmp_path: Path) -> None:
+    path = tmp_path / "store.sqlite"
+    job = PrecomputeJob(date(2023, 6, 1), date(2023, 6, 10), EngineName.analytic, store_path=path)
+    assert precompute(job, SITES, workers=2, chunk_size=2) == 2
+    assert len(TransitionStore(path)) == 30
+    assert precompute(job, SITES, workers=2, chunk_size=2) == 0
+
+    h = SolarCalculator(store=TransitionStore(path))
+    stored = h.recall(51.4779, -0.0015, date(2023, 6, 5), "Europe/London", "analytic")
+    assert stored is not None
+    current_datetime = datetime(2023, 6, 5, 12).timestamp()
+    assert stored == SolarCalculator().sky_transitions(
+        51.4779, -0.0015, current_datetime, "Europe/London", "analytic"
+    )
+
+
+def test_precompute_store_settings(tmp_path: Path) -> None:
+    path = tmp_path / "store.sqlite"
+    job = PrecomputeJob(
+        date(2023, 6, 1),
+        date(2023, 6, 10),
+        EngineName.analytic,
+        store_path=path,
+        store_max_entries=29,
+    )
+    with pytest.raises(ValueError, match="30 location days"):
+        precompute(job, SITES, workers=1)
+    assert not path.exists()
+
+    job = PrecomputeJob(
+        date(2023, 6, 1), date(2023, 6, 10), EngineName.analytic, store_path=path, store_precision=2
+    )
+    assert precompute(job, SITES[:1], workers=1) == 1
+    h = SolarCalculator(store=TransitionStore(path, precision=2))
+    assert h.recall(40.89, -83.89, date(2023, 6, 1), "America/New_York", "analytic") is not None
+
+    # A chunk missing its first day, e.g. evicted by the service, is redone.
+    with sqlite3.connect(path) as connection:
+        connection.execute("DELETE FROM transitions WHERE local_date = '2023-06-01'")
+    assert precompute(job, SITES[:1], workers=1) == 1
+    assert len(TransitionStore(path)) == 10
+
+
+def test_cli_precompute(tmp_path: Path) -> None:
+    sites = tmp_path / "sites.json"
+    sites.write_text(json.dumps([SITES[0].model_dump()]))
+    arguments = ["precompute", str(sites), "--output", str(tmp_path / "parts"), "--quiet"]
+    assert main([*arguments, "--start-date", "2023-06-10", "--end-date", "2023-06-01"]) == 1
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps([SITES[0].model_dump(), {**SITES[1].model_dump(), "tz": "USA/Santiago"}]))
+    bad_arguments = ["precompute", str(bad), "--output", str(tmp_path / "bad"), "--quiet"]
+    assert main([*bad_arguments, "--start-date", "2023-06-01", "--end-date", "2023-06-01"]) == 1
+    assert not list((tmp_path / "bad").glob("part-*"))
+    assert main([*arguments, "--start-date", "2023-06-01", "--end-date", "2023-06-01", "--workers", "1"]) == 0
+    assert len(load_parts(tmp_path / "parts")["date"]) == 1
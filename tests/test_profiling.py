@@ -0,0 +1,101 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the request profiling."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from pathlib import Path
+import pstats
+
+from fastapi.testclient import TestClient
+import pytest
+from starlette.types import Message, Receive, Scope, Send
+
+import helios.main
+from helios.main import app
+from helios.profiling import RequestProfiler
+
+client = TestClient(app)
+
+
+def scope(headers: list[tuple[bytes, bytes]]) -> dict[str, object]:
+    return {"type": "http", "method": "GET", "path": "/", "headers": headers}
+
+
+def test_wants(tmp_path: Path) -> None:
+    profiler = RequestProfiler(tmp_path / "profiles", header="X-Profile-Me")
+    assert (tmp_path / "profiles").is_dir()
+    assert not profiler.wants(scope([]))
+    assert profiler.wants(scope([(b"x-profile-me", b"1")]))
+    profiler.sample_rate = 1.0
+    assert profiler.wants(scope([]))
+
+
+def test_bounded_ring(tmp_path: Path) -> None:
+    profiler = RequestProfiler(tmp_path, max_files=3)
+    profile = cProfile.Profile()
+    profile.runcall(sum, range(10))
+    saved = [profiler.save(pstats.Stats(profile), "GET", f"/route/{i}") for i in range(5)]
+    assert profiler.profiles() == saved[2:]
+    assert saved[-1].name.endswith("-GET-route_4.prof")
+    summary = profiler.summary(limit=5)
+    assert summary.profiles == 3
+    assert any("sum" in entry.function for entry in summary.functions)
+
+
+def test_profiling_disabled() -> None:
+    assert client.get("/profiles/summary").status_code == 404
+
+
+def test_profiled_request(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    profiler = RequestProfiler(tmp_path, max_files=3)
+    monkeypatch.setattr(helios.main, "profiler", profiler)
+
+    # A location no other test uses, so the calculation misses the cache.
+    params = {"lat": -23.4567, "lon": 133.8807, "cdatetime": 1677880560.0, "tz": "Australia/Darwin"}
+    assert client.get("/sky_transitions", params=params).status_code == 200
+    assert profiler.profiles() == []
+
+    response = client.get("/sky_transitions", params=params, headers={"X-Helios-Profile": "1"})
+    assert response.status_code == 200
+    assert len(profiler.profiles()) == 1
+
+    # The calculation made on the worker thread is part of the profile.
+    stats = pstats.Stats(str(profiler.profiles()[0]))
+    functions = {(Path(file).name, name) for file, _, name in stats.stats}  # type: ignore[attr-defined]
+    assert ("solar_calculator.py", "sky_transitions") in functions
+
+    summary = client.get("/profiles/summary", params={"limit": 5}).json()
+    assert summary["profiles"] == 1
+    assert len(summary["functions"]) == 5
+    assert summary["functions"][0]["total_time"] >= summary["functions"][-1]["total_time"]
+
+
+def test_event_stream_releases_profiler(tmp_path: Path) -> None:
+    profiler = RequestProfiler(tmp_path)
+    during: list[bool] = []
+
+    async def stream(scope: Scope, receive: Receive, send: Send) -> None:
+        headers = [(b"content-type", b"text/event-stream; charset=utf-8")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        # Other requests can be profiled while the stream is open.
+        during.append(profiler.wants(scope))
+        during.append(len(profiler.profiles()) == 1)
+        await send({"type": "http.response.body", "body": b": keep-alive\n\n", "more_body": False})
+
+    async def receive() -> Message:
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        pass
+
+    request = scope([(b"x-helios-profile", b"1")])
+    assert profiler.wants(request)
+    asyncio.run(profiler(stream, request, receive, send))
+    assert during == [True, True]
+    assert len(profiler.profiles()) == 1
+    assert profiler.wants(request)
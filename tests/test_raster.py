@@ -0,0 +1,81 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for sunrise, sunset and day length rasters."""
+
+from __future__ import annotations
+
+import datetime
+import io
+
+from fastapi.testclient import TestClient
+import numpy as np
+import pytest
+
+from helios.engines import AnalyticEngine
+from helios.exceptions import DateOutOfRange
+from helios.main import app
+from helios.raster import RASTER_BANDS, day_raster, raster_axis, to_npy
+from helios.solar_calculator import SolarCalculator
+
+
+def test_raster_axis() -> None:
+    assert raster_axis(-90.0, 90.0, 1.0).tolist()[:2] == [-89.5, -88.5]
+    assert len(raster_axis(-180.0, 180.0, 0.5)) == 720
+    assert len(raster_axis(0.0, 1.0, 0.3)) == 3
+    assert len(raster_axis(1.0, 0.0, 0.5)) == 0
+
+
+def test_day_raster() -> None:
+    day = datetime.date(2023, 6, 21)
+    latitudes = np.array([85.0, 40.8939, 0.0, -85.0])
+    longitudes = np.array([-83.8917, 0.0, 120.0])
+    bands = day_raster(AnalyticEngine(), day, latitudes, longitudes)
+    assert bands.shape == (len(RASTER_BANDS), 4, 3)
+    assert bands.dtype == np.float32
+    sunrise, sunset, day_length = bands
+
+    # Polar day and polar night.
+    assert np.isnan(sunrise[[0, 3]]).all() and np.isnan(sunset[[0, 3]]).all()
+    assert (day_length[0] == 86400.0).all()
+    assert (day_length[3] == 0.0).all()
+    # The equator gets about twelve hours at every longitude.
+    assert day_length[2] == pytest.approx(12.1 * 3600.0, abs=600.0)
+    assert day_length[1] == pytest.approx(sunset[1] - sunrise[1])
+
+    h = SolarCalculator()
+    noon = datetime.datetime(2023, 6, 21, 17, 30, tzinfo=datetime.UTC).timestamp()
+    st = h.sky_transitions(40.8939, -83.8917, noon, "US/Eastern")
+    midnight = datetime.datetime(2023, 6, 21, tzinfo=datetime.UTC).timestamp()
+    assert sunrise[1, 0] == pytest.approx(st["Sunrise"].timestamp() - midnight, abs=30.0)
+    assert sunset[1, 0] == pytest.approx(st["Sunset"].timestamp() - midnight, abs=30.0)
+
+    # Engines without an array search are searched a chunk at a time.
+    skyfield = day_raster(h.get_engine("skyfield"), day, latitudes[1:3], longitudes)
+    np.testing.assert_allclose(skyfield, bands[:, 1:3], atol=30.0)
+
+
+def test_day_raster_calculator() -> None:
+    h = SolarCalculator()
+    bands = h.day_raster(datetime.date(2023, 3, 20), -90.0, 90.0, -180.0, 180.0, 10.0, "analytic")
+    assert bands.shape == (3, 18, 36)
+    # North first, so the Arctic has the longer day after the equinox.
+    assert bands[2, 0, 0] > bands[2, -1, 0]
+    loaded = np.load(io.BytesIO(to_npy(bands)))
+    np.testing.assert_array_equal(loaded, bands)
+
+
+def test_day_raster_out_of_range() -> None:
+    h = SolarCalculator()
+    with pytest.raises(DateOutOfRange):
+        h.day_raster(datetime.date(2100, 6, 21), 30.0, 50.0, -180.0, 180.0, 10.0, "skyfield")
+    bands = h.day_raster(datetime.date(2100, 6, 21), 30.0, 50.0, -180.0, 180.0, 10.0, "analytic")
+    assert bands.shape == (3, 2, 36)
+
+    client = TestClient(app)
+    params = {"date": "2100-06-21", "resolution": 10.0, "min_lat": 30.0, "max_lat": 50.0}
+    response = client.get("/raster", params={**params, "engine": "skyfield"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Dates must be from 1899-07-30 to 2053-10-07"
+    assert client.get("/raster", params=params).status_code == 200
@@ -0,0 +1,82 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for multi-site searches."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from skyfield import almanac
+from skyfield.api import wgs84
+
+from helios.searches import dark_twilight_day_sites, find_discrete_sites, refine_dark_twilight_day
+from helios.solar_calculator import SolarCalculator
+
+SITES = [(40.8939, -83.8917), (-33.8688, 151.2093), (78.2232, 15.6267), (0.0, 0.0)]
+
+
+def test_dark_twilight_day_sites() -> None:
+    h = SolarCalculator()
+    latitudes, longitudes = zip(*SITES, strict=True)
+    f = dark_twilight_day_sites(h.ephemeris, latitudes, longitudes)
+    t = h.timescale.tt_jd(2460007.0 + np.arange(len(SITES)) * 0.1)
+    values = f(t, np.arange(len(SITES)))
+    for i, (latitude, longitude) in enumerate(SITES):
+        expected = almanac.dark_twilight_day(h.ephemeris, wgs84.latlon(latitude, longitude))(t[i])
+        assert values[i] == expected
+
+
+def test_find_discrete_sites() -> None:
+    h = SolarCalculator()
+    latitudes, longitudes = zip(*SITES, strict=True)
+    jd0 = 2460007.0 + np.arange(len(SITES)) * 30.0
+    jd1 = jd0 + 1.0
+    f = dark_twilight_day_sites(h.ephemeris, latitudes, longitudes)
+    initial, changes = find_discrete_sites(h.timescale, jd0, jd1, f)
+    assert len(changes) == len(SITES)
+    for i, (latitude, longitude) in enumerate(SITES):
+        g = almanac.dark_twilight_day(h.ephemeris, wgs84.latlon(latitude, longitude))
+        t0 = h.timescale.tt_jd(jd0[i])
+        times, events = almanac.find_discrete(t0, h.timescale.tt_jd(jd1[i]), g)
+        assert initial[i] == g(t0)
+        assert list(changes[i][1]) == list(events)
+        assert changes[i][0] == pytest.approx(times.tt, abs=1e-6)
+
+
+def test_find_discrete_sites_no_changes() -> None:
+    h = SolarCalculator()
+    f = dark_twilight_day_sites(h.ephemeris, [89.0], [0.0])
+    initial, changes = find_discrete_sites(h.timescale, [2460116.5], [2460117.5], f)
+    assert initial[0] == 4
+    assert len(changes[0][0]) == 0
+
+
+def test_refine_dark_twilight_day() -> None:
+    h = SolarCalculator()
+    latitude, longitude = SITES[0]
+    g = almanac.dark_twilight_day(h.ephemeris, wgs84.latlon(latitude, longitude))
+    jd0 = 2460007.2
+    times, events = almanac.find_discrete(h.timescale.tt_jd(jd0), h.timescale.tt_jd(jd0 + 1.0), g)
+    initial = int(g(h.timescale.tt_jd(jd0)))
+    # The changes a day later are within a few minutes of these.
+    guesses = times.tt - 1.0
+    jd = refine_dark_twilight_day(
+        h.timescale, h.ephemeris, latitude, longitude, jd0 - 1.0, jd0, guesses, events, initial
+    )
+    _, expected = find_discrete_sites(
+        h.timescale, [jd0 - 1.0], [jd0], dark_twilight_day_sites(h.ephemeris, [latitude], [longitude])
+    )
+    assert jd == pytest.approx(expected[0][0], abs=1e-6)
+
+    # A missing change does not explain the samples.
+    missing = refine_dark_twilight_day(
+        h.timescale, h.ephemeris, latitude, longitude, jd0 - 1.0, jd0, guesses[1:], events[1:], events[0]
+    )
+    assert missing is None
+    # Nor does a guess far from its change.
+    shifted = refine_dark_twilight_day(
+        h.timescale, h.ephemeris, latitude, longitude, jd0 - 1.0, jd0, guesses + 0.1, events, initial
+    )
+    assert shifted is None
@@ -12,8 +12,11 @@ import zoneinfo
 
 import pytest
 
+from helios.cache import TransitionCache
+from helios.config import Config
+from helios.engines import SkyfieldEngine
 from helios.exceptions import BadTimezone
-from helios.solar_calculator import SolarCalculator
+from helios.solar_calculator import TRANSITION_NAMES, SolarCalculator
 
 
 def test_internal_parameters() -> None:
@@ -22,6 +25,13 @@ def test_internal_parameters() -> None:
     assert h.timescale is not None
 
 
+def test_warm_up() -> None:
+    h = SolarCalculator()
+    with patch.object(h, "sky_transitions", wraps=h.sky_transitions) as sky_transitions:
+        h.warm_up()
+        assert sky_transitions.call_count == len(h.engines)
+
+
 def test_sky_transitions() -> None:
     h = SolarCalculator()
     current_datetime = datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp()
@@ -41,6 +51,145 @@ def test_sky_transitions() -> None:
     assert sky_transitions["Astronomical Dusk"].timestamp() == pytest.approx(1677891594.401842, rel=1e-1)
 
 
+def test_from_config() -> None:
+    h = SolarCalculator.from_config(Config(cache_size=10, cache_precision=2, engine="analytic"))
+    assert h.engine == "analytic"
+    assert h.cache is not None
+    assert h.cache.max_size == 10
+    assert h.cache.precision == 2
+    h = SolarCalculator.from_config(Config(cache_size=0))
+    assert h.cache is None
+
+
+def test_cached_sky_transitions() -> None:
+    h = SolarCalculator()
+    cached = SolarCalculator(cache=TransitionCache())
+    timezone = "US/Eastern"
+    latitude = 40.8939
+    longitude = -83.8917
+
+    morning = datetime.datetime(2023, 3, 3, 8, 0, 0).timestamp()
+    evening = datetime.datetime(2023, 3, 3, 20, 0, 0).timestamp()
+    expected = h.sky_transitions(latitude, longitude, morning, timezone)
+    assert cached.sky_transitions(latitude, longitude, morning, timezone) == expected
+    assert cached.sky_transitions(latitude, longitude, evening, timezone) == expected
+    assert cached.cache is not None
+    status = cached.cache.status()
+    assert status.hits == 1
+    assert status.misses == 1
+
+
+def test_cached_neighboring_days() -> None:
+    # Without incremental searches, cached neighbors do not change results.
+    h = SolarCalculator()
+    cached = SolarCalculator(cache=TransitionCache())
+    engine = cached.get_engine()
+    assert isinstance(engine, SkyfieldEngine)
+    for day in range(1, 5):
+        current_datetime = datetime.datetime(2023, 3, day, 12, 0, 0).timestamp()
+        expected = h.sky_transitions(40.8939, -83.8917, current_datetime, "US/Eastern")
+        assert cached.sky_transitions(40.8939, -83.8917, current_datetime, "US/Eastern") == expected
+    assert engine.refined == 0
+
+
+def test_incremental_sky_transitions() -> None:
+    h = SolarCalculator()
+    cached = SolarCalculator(cache=TransitionCache(), incremental=True)
+    engine = cached.get_engine()
+    assert isinstance(engine, SkyfieldEngine)
+    timezone = "US/Eastern"
+    for day in range(1, 5):
+        current_datetime = datetime.datetime(2023, 3, day, 12, 0, 0).timestamp()
+        expected = h.sky_transitions(40.8939, -83.8917, current_datetime, timezone)
+        sky_transitions = cached.sky_transitions(40.8939, -83.8917, current_datetime, timezone)
+        assert sky_transitions.keys() == expected.keys()
+        for name, t in sky_transitions.items():
+            assert abs((t - expected[name]).total_seconds()) < 0.1
+    assert engine.refined == 3
+
+    # A day losing a twilight is searched in full.
+    polar = SolarCalculator(cache=TransitionCache(), incremental=True)
+    polar_engine = polar.get_engine()
+    assert isinstance(polar_engine, SkyfieldEngine)
+    for day in (9, 10):
+        current_datetime = datetime.datetime(2023, 4, day, 12, 0, 0).timestamp()
+        sky_transitions = polar.sky_transitions(64.1466, -21.9426, current_datetime, "Atlantic/Reykjavik")
+    assert len(sky_transitions) == 6
+    assert polar_engine.refined == 0
+    assert polar_engine.refine_fallbacks == 1
+
+
+def test_sky_transitions_batch() -> None:
+    h = SolarCalculator(cache=TransitionCache())
+    uncached = SolarCalculator()
+    requests = [
+        (40.8939, -83.8917, datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp(), "US/Eastern"),
+        (-33.8688, 151.2093, datetime.datetime(2023, 6, 21, 12, 0, 0).timestamp(), "Australia/Sydney"),
+        (78.2232, 15.6267, datetime.datetime(2023, 6, 21, 12, 0, 0).timestamp(), "Arctic/Longyearbyen"),
+        (40.8939, -83.8917, datetime.datetime(2023, 3, 12, 12, 0, 0).timestamp(), "US/Eastern"),
+        (40.8939, -83.8917, datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp(), "USA/Santiago"),
+    ]
+    h.sky_transitions(*requests[0])
+    results = h.sky_transitions_batch(requests)
+    assert len(results) == len(requests)
+    for request, result in zip(requests[:-1], results[:-1], strict=True):
+        assert result == uncached.sky_transitions(*request)
+    assert results[2] == {}
+    assert isinstance(results[-1], BadTimezone)
+    assert h.cache is not None
+    assert h.cache.status().hits == 1
+    assert len(h.cache) == 4
+
+
+def test_sky_transitions_range() -> None:
+    h = SolarCalculator()
+    timezone = "US/Eastern"
+    latitude = 40.8939
+    longitude = -83.8917
+
+    st_range = h.sky_transitions_range(
+        latitude, longitude, datetime.date(2023, 3, 1), datetime.date(2023, 3, 14), timezone
+    )
+    assert list(st_range.keys()) == [
+        datetime.date(2023, 3, 1) + datetime.timedelta(days=i) for i in range(14)
+    ]
+    for day, st in st_range.items():
+        current_datetime = datetime.datetime.combine(day, datetime.time(12, 0, 0)).timestamp()
+        expected = h.sky_transitions(latitude, longitude, current_datetime, timezone)
+        assert list(st.keys()) == list(TRANSITION_NAMES)
+        for name, value in st.items():
+            assert value is not None
+            assert value.date() == day
+            assert value.timestamp() == pytest.approx(expected[name].timestamp(), abs=0.01)
+
+
+def test_sky_transitions_range_polar() -> None:
+    h = SolarCalculator()
+    st_range = h.sky_transitions_range(
+        78.2232, 15.6267, datetime.date(2023, 6, 20), datetime.date(2023, 6, 21), "Arctic/Longyearbyen"
+    )
+    assert len(st_range) == 2
+    for st in st_range.values():
+        assert list(st.keys()) == list(TRANSITION_NAMES)
+        assert all(value is None for value in st.values())
+
+
+def test_sun_positions() -> None:
+    h = SolarCalculator()
+    st = h.sky_transitions(
+        40.8939, -83.8917, datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp(), "US/Eastern"
+    )
+    altitude, azimuth = h.sun_positions(40.8939, -83.8917, st["Sunrise"].timestamp(), 721, 60.0)
+    assert altitude.shape == azimuth.shape == (721,)
+    # Sunrise is when the top of the refracted disk touches the horizon.
+    assert altitude[0] == pytest.approx(-0.8333, abs=0.01)
+    assert 90.0 < azimuth[0] < 180.0
+    assert altitude[360] > 40.0
+    at_noon = h.sun_positions(40.8939, -83.8917, st["Sunrise"].timestamp() + 360 * 60.0, 1, 60.0)
+    assert at_noon[0][0] == pytest.approx(altitude[360])
+    assert at_noon[1][0] == pytest.approx(azimuth[360])
+
+
 def test_bad_timezone() -> None:
     h = SolarCalculator()
     current_datetime = datetime.datetime(2023, 3, 3, 14, 56, 0).timestamp()
@@ -50,6 +199,10 @@ def test_bad_timezone() -> None:
 
     with pytest.raises(BadTimezone):
         h.sky_transitions(latitude, longitude, current_datetime, timezone)
+    with pytest.raises(BadTimezone):
+        h.sky_transitions_range(
+            latitude, longitude, datetime.date(2023, 3, 3), datetime.date(2023, 3, 3), timezone
+        )
 
 
 def test_get_localtime() -> None:
@@ -0,0 +1,83 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the application startup."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from helios import __version__
+from helios.cli import main
+from helios.main import app, build_schema, set_schema
+from helios.startup import STARTUP_STAGES, measure_startup, run_startup_report
+
+IMPORT_BUDGET = 2.0
+"""Seconds allowed for importing the application in a fresh interpreter."""
+
+DEFERRED_MODULES = ("skyfield", "jinja2", "jplephem")
+"""Packages the application import must not load."""
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+begin = time.perf_counter()
+import helios.main
+seconds = time.perf_counter() - begin
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set({DEFERRED_MODULES!r}))
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+def test_import_budget() -> None:
+    # The best of a few runs keeps a busy machine from failing the budget.
+    runs = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(result.stdout))
+    assert min(run["seconds"] for run in runs) < IMPORT_BUDGET
+    assert runs[0]["loaded"] == []
+
+
+def test_startup_report() -> None:
+    timings = run_startup_report()
+    assert tuple(timings) == STARTUP_STAGES
+    assert all(seconds >= 0.0 for seconds in timings.values())
+    with pytest.raises(RuntimeError):
+        measure_startup()
+
+
+def test_prebuilt_schema(tmp_path: Path) -> None:
+    path = tmp_path / "openapi.json"
+    assert main(["openapi", str(path)]) == 0
+    schema = json.loads(path.read_text())
+    assert schema == build_schema()
+
+    schema["info"]["title"] = "Prebuilt"
+    path.write_text(json.dumps(schema))
+    with patch("helios.main.config.openapi_path", path), patch.object(app, "openapi_schema", None):
+        assert set_schema()["info"]["title"] == "Prebuilt"
+
+    # A schema from another release is rebuilt.
+    schema["info"]["version"] = f"{__version__}.old"
+    path.write_text(json.dumps(schema))
+    with patch("helios.main.config.openapi_path", path), patch.object(app, "openapi_schema", None):
+        assert set_schema()["info"]["title"] == "Helios Web Service API"
+
+
+def test_cli_startup(capsys: pytest.CaptureFixture[str]) -> None:
+    with patch("helios.cli.run_startup_report", return_value=dict.fromkeys(STARTUP_STAGES, 0.001)):
+        assert main(["startup"]) == 0
+        assert "total" in capsys.readouterr().out
+        assert main(["startup", "--json"]) == 0
+        assert tuple(json.loads(capsys.readouterr().out)) == STARTUP_STAGES
+    with patch("helios.cli.run_startup_report", side_effect=RuntimeError("failed")):
+        assert main(["startup"]) == 1
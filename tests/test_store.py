@@ -0,0 +1,108 @@
+# Copyright 2023-2025 Michael Reuter. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for the persistent sky transitions store."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+from pathlib import Path
+import zoneinfo
+
+from helios.cache import TransitionCache
+from helios.solar_calculator import SolarCalculator
+from helios.store import StoreKey, TransitionStore
+
+ZONE = zoneinfo.ZoneInfo("US/Eastern")
+
+
+def sky_transitions(hour: int) -> dict[str, datetime.datetime]:
+    return {
+        "Sunrise": datetime.datetime(2023, 3, 3, hour, 1, 2, 345678, tzinfo=ZONE),
+        "Sunset": datetime.datetime(2023, 3, 3, hour + 11, 3, 4, tzinfo=ZONE),
+    }
+
+
+def day_key(store: TransitionStore, day: int) -> StoreKey:
+    local_date = datetime.date(2023, 1, 1) + datetime.timedelta(days=day)
+    return store.key(40.0, -83.0, local_date, "US/Eastern", "skyfield:1")
+
+
+def write_days(path: Path, start: int) -> None:
+    store = TransitionStore(path)
+    store.put_many((day_key(store, day), sky_transitions(6)) for day in range(start, start + 50))
+
+
+def test_key(tmp_path: Path) -> None:
+    store = TransitionStore(tmp_path / "store.sqlite", precision=2)
+    key = store.key(40.89391, -83.89171, datetime.date(2023, 3, 3), "US/Eastern", "skyfield:1")
+    assert key == (40.89, -83.89, "2023-03-03", "US/Eastern", "skyfield:1")
+
+
+def test_put_get(tmp_path: Path) -> None:
+    path = tmp_path / "store.sqlite"
+    store = TransitionStore(path)
+    key = store.key(40.8939, -83.8917, datetime.date(2023, 3, 3), "US/Eastern", "skyfield:1")
+    assert store.get(key) is None
+    store.put(key, sky_transitions(6))
+    assert store.get(key) == sky_transitions(6)
+    result = store.get(key)
+    assert result is not None
+    assert result["Sunrise"].tzinfo == ZONE
+    status = store.status()
+    assert (status.size, status.hits, status.misses, status.writes) == (1, 2, 1, 1)
+
+    # Another connection sees the stored day.
+    assert TransitionStore(path).get(key) == sky_transitions(6)
+    store.clear()
+    assert len(store) == 0
+
+
+def test_compact(tmp_path: Path) -> None:
+    store = TransitionStore(tmp_path / "store.sqlite", max_entries=10, compact_interval=25)
+    keys = [day_key(store, day) for day in range(30)]
+    for key in keys[:20]:
+        store.put(key, sky_transitions(6))
+    assert len(store) == 20
+    store.put_many((key, sky_transitions(6)) for key in keys[20:])
+    assert len(store) == 10
+    assert store.status().evictions == 20
+    assert store.get(keys[-1]) is not None
+    assert store.compact() == 0
+
+
+def test_shared_across_processes(tmp_path: Path) -> None:
+    path = tmp_path / "store.sqlite"
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        list(pool.map(write_days, [path] * 4, [0, 25, 50, 75]))
+    assert len(TransitionStore(path)) == 125
+
+
+def test_calculator_store(tmp_path: Path) -> None:
+    store = TransitionStore(tmp_path / "store.sqlite")
+    h = SolarCalculator(store=store)
+    morning = datetime.datetime(2023, 3, 3, 8, 0, 0).timestamp()
+    evening = datetime.datetime(2023, 3, 3, 20, 0, 0).timestamp()
+    expected = h.sky_transitions(40.8939, -83.8917, morning, "US/Eastern")
+    assert len(store) == 1
+
+    # A new calculator, e.g. in another worker, reads the stored day.
+    restarted = SolarCalculator(cache=TransitionCache(), store=TransitionStore(tmp_path / "store.sqlite"))
+    assert restarted.sky_transitions(40.8939, -83.8917, evening, "US/Eastern") == expected
+    assert restarted.sky_transitions(40.8939, -83.8917, evening, "US/Eastern") == expected
+    assert restarted.store is not None
+    assert restarted.cache is not None
+    assert restarted.store.status().hits == 1
+    assert restarted.cache.status().hits == 1
+
+    # Each engine has its own entries.
+    restarted.sky_transitions(40.8939, -83.8917, evening, "US/Eastern", "analytic")
+    assert len(store) == 2
+
+    results = restarted.sky_transitions_batch(
+        [(40.8939, -83.8917, morning, "US/Eastern"), (35.0, -83.8917, morning, "US/Eastern")]
+    )
+    assert results[0] == expected
+    assert len(store) == 3